@@ -0,0 +1,9 @@
+# Command line entry point of ContactHub, see main.main for the available commands.
+# Importing main as a module lets Python reuse its cached bytecode instead of compiling the whole file on every run.
+
+import sys
+
+from main import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,26 @@
 # ------------------------------------------------- IMPORTS --------------------------------------------------- #
 
+import os
+import re
+import sys
+import time
+import zlib
+import bisect
+import struct
 import pickle
+import threading
+import itertools
+import contextlib
+import collections
 from datetime import date
-from colorama import Fore, Style, init
 
 # ------------------------------------------------- CLASSES --------------------------------------------------- #
 
 class Contact:
-    def __init__(self, nickname: str, phone: str, firstName: str, lastName: str, email: str, notes: str, birthday: str, adress: str, createdAt: str, updatedAt: str, directory: str):
+    # No per-instance __dict__: at hundreds of thousands of contacts the dictionaries dominate the memory used
+    __slots__ = ("contactNickname", "contactPhone", "contactFirstName", "contactLastName", "contactEmail", "contactNotes", "contactBirthday", "contactAddress", "contactCreatedAt", "contactUpdatedAt", "contactDirectory", "contactId", "contactDirectories", "contactVersion")
+
+    def __init__(self, nickname: str, phone: str, firstName: str, lastName: str, email: str, notes: str, birthday: str, adress: str, createdAt: str, updatedAt: str, directory: str, contactId: int = None):
         """
         Initializes a new instance of the Contact class with the given parameters.
 
@@ -23,6 +36,7 @@ class Contact:
             createdAt (str): The date and time when the contact was created.
             updatedAt (str): The date and time when the contact was last updated.
             directory (str): The directory where the contact is stored.
+            contactId (int, optional): The stable id of the contact. Defaults to a new random id, see newContactId.
 
         Returns:
             None
@@ -32,25 +46,205 @@ class Contact:
         self.contactFirstName = firstName
         self.contactLastName = lastName
         self.contactEmail = email
-        self.contactNotes = notes
-        self.contactBirthday = birthday
+        self.contactNotes = internValue(notes)
+        self.contactBirthday = internValue(birthday)
         self.contactAddress = adress
-        self.contactCreatedAt = createdAt
-        self.contactUpdatedAt = updatedAt
+        self.contactCreatedAt = internValue(createdAt)
+        self.contactUpdatedAt = internValue(updatedAt)
         self.contactDirectory = directory
+        self.contactId = contactId if contactId is not None else newContactId()
+        # The directories sharing the contact, its own first, or None while it is in a single one, see Contact.join
+        self.contactDirectories = None
+        # Bumped on every change made in place, so its rendered card is known to be stale, see Contact.touch
+        self.contactVersion = 0
+
+    def __getstate__(self):
+        """
+        Returns the state of the contact for pickle, as a tuple ordered like __slots__, without the directories sharing
+        it and the version which only mean something within the process.
+        """
+        return tuple(getattr(self, name) for name in Contact.__slots__[:-2])
+
+    def __setstate__(self, state):
+        """
+        Restores the state of a contact unpickled from a tuple, or from a dictionary when it was saved before __slots__.
+        Contacts saved before they had an id get one when loaded, see loadSnapshot.
+        """
+        if isinstance(state, dict):
+            state = tuple(state.get(name) for name in Contact.__slots__[:-2])
+        self.contactId = self.contactDirectories = None
+        self.contactVersion = 0
+        for name, value in zip(Contact.__slots__, state):
+            setattr(self, name, value)
+        for name in ("contactNotes", "contactBirthday", "contactCreatedAt", "contactUpdatedAt"):
+            setattr(self, name, internValue(getattr(self, name)))
     
     def __str__(self):
         """
         Returns a string representation of the object.
         
+        The string is kept in renderCache until the contact or the names of its directories change.
+
         :return: A string containing the details of the object.
         :rtype: str
         """
-        return f"\nNickname: {self.contactNickname}\nPhone: {self.contactPhone}\nFirst Name: {self.contactFirstName}\nLast Name: {self.contactLastName}\nEmail: {self.contactEmail}\nNotes: {self.contactNotes}\nBirthday: {self.contactBirthday}\nAddress: {self.contactAddress}\nCreated At: {self.contactCreatedAt}\nUpdated At: {self.contactUpdatedAt}\nDirectory: {self.contactDirectory.directoryName}"
+        directoryNames = Contact.directoryNames(self)
+        return renderCache.get(self, (self.contactVersion, directoryNames), lambda: f"\nNickname: {self.contactNickname}\nPhone: {self.contactPhone}\nFirst Name: {self.contactFirstName}\nLast Name: {self.contactLastName}\nEmail: {self.contactEmail}\nNotes: {self.contactNotes}\nBirthday: {self.contactBirthday}\nAddress: {self.contactAddress}\nCreated At: {self.contactCreatedAt}\nUpdated At: {self.contactUpdatedAt}\nDirectory: {directoryNames}")
+
+    def indented(contact: object):
+        """
+        Returns the card of a contact indented under its number in a directory, see Directory.render.
+
+        Args:
+            contact (Contact): The contact.
+
+        Returns:
+            str: The card, each line indented.
+        """
+        return renderCache.get((contact, "indented"), (contact.contactVersion, Contact.directoryNames(contact)), lambda: "      " + str(contact).replace("\n", "\n      "))
+
+    def touch(contact: object):
+        """
+        Marks a contact as changed in place, and every directory holding it with it.
+
+        Args:
+            contact (Contact): The changed contact.
+
+        Returns:
+            None
+        """
+        contact.contactVersion += 1
+        for directory in Contact.directories(contact):
+            Directory.touch(directory)
+
+    def directories(contact: object):
+        """
+        Returns the directories holding a contact, the one it was created in first.
+
+        Args:
+            contact (Contact): The contact.
+
+        Returns:
+            iterable: The directories.
+        """
+        return contact.contactDirectories or (contact.contactDirectory,)
+
+    def directoryNames(contact: object):
+        """
+        Returns the names of the directories holding a contact, separated by commas.
+        """
+        if contact.contactDirectories is None:
+            return contact.contactDirectory.directoryName
+        return ", ".join(directory.directoryName for directory in contact.contactDirectories)
+
+    def isIn(contact: object, directory: object):
+        """
+        Tells whether a directory holds a contact, in constant time.
+
+        Args:
+            contact (Contact): The contact.
+            directory (Directory): The directory.
+
+        Returns:
+            bool: Whether the contact is one of the contacts of the directory.
+        """
+        if contact.contactDirectories is None:
+            return contact.contactDirectory is directory
+        return directory in contact.contactDirectories
+
+    def join(contact: object, directory: object):
+        """
+        Records that a directory now holds a contact too, the contact being shared rather than copied.
+
+        The caller puts the contact in the contacts of the directory and touches the directories.
+
+        Args:
+            contact (Contact): The contact.
+            directory (Directory): The directory it was added to.
+
+        Returns:
+            None
+        """
+        if contact.contactDirectories is None:
+            contact.contactDirectories = {contact.contactDirectory: None}
+        contact.contactDirectories[directory] = None
+
+    def leave(contact: object, directory: object):
+        """
+        Records that a directory no longer holds a contact, which goes on living in the other directories sharing it.
+
+        The caller removes the contact from the contacts of the directory. The directories still holding it are touched,
+        since the one storing it may change, see saveData. A contact left in a single directory is no longer shared,
+        and one removed from its last directory keeps it as contactDirectory.
+
+        Args:
+            contact (Contact): The contact.
+            directory (Directory): The directory it was removed from.
+
+        Returns:
+            None
+        """
+        if contact.contactDirectories is None or directory not in contact.contactDirectories:
+            return
+        del contact.contactDirectories[directory]
+        if contact.contactDirectory is directory:
+            contact.contactDirectory = next(iter(contact.contactDirectories))
+        if len(contact.contactDirectories) == 1:
+            contact.contactDirectories = None
+        Contact.touch(contact)
+
+    def replace(previous: object, contact: object, directory: object, position: int):
+        """
+        Puts a new version of a contact in place of the previous one, in every directory holding it.
+
+        Args:
+            previous (Contact): The contact replaced.
+            contact (Contact): The new version, taking the directories of the previous one.
+            directory (Directory): A directory holding the previous contact.
+            position (int): The position of the previous contact in this directory.
+
+        Returns:
+            None
+        """
+        contact.contactDirectory = previous.contactDirectory
+        contact.contactDirectories = previous.contactDirectories
+        directory.contacts[position] = contact
+        for other in Contact.directories(contact):
+            if other is not directory:
+                # Shared contacts are few, looking for them by identity is done in C
+                other.contacts[other.contacts.index(previous)] = contact
+            Directory.touch(other)
+
+    def uncache(contact: object):
+        """
+        Drops the rendered cards of a contact removed or replaced, so they do not hold memory until evicted.
+
+        Args:
+            contact (Contact): The removed contact.
+
+        Returns:
+            None
+        """
+        renderCache.discard(contact)
+        renderCache.discard((contact, "indented"))
     
+    def render(contacts: object, start: int = 0):
+        """
+        Lazily yields the formatted block of each contact, numbered from the given position.
+
+        Parameters:
+            contacts (iterable): The contacts to render.
+            start (int, optional): The position of the first contact. Defaults to 0.
+
+        Yields:
+            str: The formatted block of one contact.
+        """
+        for index, contact in enumerate(contacts, start=start + 1):
+            yield f"\n{separator}\n{index}:\n\n{contact}\n{separator}\n"
+
     def showAllContacts(myPhone: list):
         """
-        Generates a list of all contacts from the given phone directory and prints them.
+        Prints all contacts from the given phone directory, one page at a time.
         
         Parameters:
             myPhone (list): A list of phone directories.
@@ -58,20 +252,55 @@ class Contact:
         Returns:
             None
         """
-        contacts = []
+        count = sum(map(Directory.contactCount, myPhone))
         print("\n")
 
-        for directory in myPhone:
-            for contact in directory.contacts:
-                contacts.append(contact)
-
-        for index, contact in enumerate(contacts):
-            print(f"\n{separator}\n{index + 1}:\n\n{contact}\n{separator}")
+        Paginate(count, lambda start, stop: Contact.render(sliceContacts(myPhone, start, stop), start))
         
-        if contacts == []:
+        if count == 0:
             Error("You don't have any contacts yet")
         print("\n")
 
+    def showSearchResults(contacts: list):
+        """
+        Prints the contacts found by a search, one page at a time.
+
+        Parameters:
+            contacts (list): The matching contacts.
+
+        Returns:
+            None
+        """
+        print("\n")
+
+        Paginate(len(contacts), lambda start, stop: Contact.render(contacts[start:stop], start))
+
+        if contacts == []:
+            Error("No contact matches your search")
+        print("\n")
+
+    def showUpcomingBirthdays(birthdays: list):
+        """
+        Prints the contacts whose birthday is coming, one line each, with the date and the days left.
+
+        Parameters:
+            birthdays (list): The (next birthday, contact) pairs, the nearest first.
+
+        Returns:
+            None
+        """
+        print("\n")
+
+        today = date.today()
+        for birthday, contact in birthdays:
+            days = (birthday - today).days
+            when = "today" if days == 0 else "tomorrow" if days == 1 else f"in {days} days"
+            Render(f"{birthday:%d/%m}: {contact.contactNickname} ({contact.contactFirstName} {contact.contactLastName}), {when}")
+
+        if birthdays == []:
+            Error("No birthday in the coming days")
+        print("\n")
+
     def editContact(contact: object):
         """
         Edit the contact information.
@@ -83,18 +312,24 @@ class Contact:
         None
         """
         contact.contactNickname = Asking("Edit contact nickname: ")
-        contact.contactPhone = Asking("Edit contact phone: ")
+        contact.contactPhone = AskingValid("Edit contact phone: ", normalizePhone)
         contact.contactFirstName = Asking("Edit contact first name: ")
         contact.contactLastName = Asking("Edit contact last name: ")
-        contact.contactEmail = Asking("Edit contact email: ")
-        contact.contactNotes = Asking("Edit contact notes: ")
-        contact.contactBirthday = Asking("Edit contact birthday: ")
-        contact.contactAddress = Asking("Edit contact address: ")
-        contact.contactUpdatedAt = date.today()
+        contact.contactEmail = AskingValid("Edit contact email: ", normalizeEmail)
+        contact.contactNotes = internValue(Asking("Edit contact notes: "))
+        contact.contactBirthday = internValue(AskingValid("Edit contact birthday: ", normalizeBirthday))
+        contact.contactAddress = AskingValid("Edit contact address: ", normalizeAddress)
+        contact.contactUpdatedAt = internValue(date.today())
+        # A contact is saved with its directory, so its changes are tracked there too
+        Contact.touch(contact)
         print("\n")
 
 class Directory:
-    def __init__(self, name: str, date: str, update: str, contacts=[]):
+    # Bumped on every change to the directory or its contacts, so a save can skip the directories nobody touched.
+    # Directories pickled before it existed fall back to this class attribute.
+    directoryVersion = 0
+
+    def __init__(self, name: str, date: str, update: str, contacts=None):
         """
         Initializes a new instance of the Directory class with the given parameters.
 
@@ -102,12 +337,89 @@ class Directory:
             name (str): The name of the directory.
             date (str): The creation date of the directory.
             update (str): The last update date of the directory.
-            contacts (list, optional): A list of contacts associated with the directory. Defaults to an empty list.
+            contacts (list, optional): A list of contacts associated with the directory. Defaults to a new empty list.
         """
         self.directoryName = name
         self.directoryCreatedAt = date
         self.directoryUpdatedAt = update
-        self.contacts = contacts
+        if isinstance(contacts, ContactBlocks):
+            # Decoded on first use, see __getattr__
+            self.contactBlocks = contacts
+        else:
+            self.contacts = contacts if contacts is not None else []
+        self.directoryVersion = 0
+
+    def __getattr__(self, name: str):
+        """
+        Decodes the contacts of a directory loaded lazily the first time they are used.
+
+        Only called when the attribute is missing, so the decoded contacts are then read like any other attribute.
+        """
+        if name == "contacts" and "contactBlocks" in self.__dict__:
+            # The contacts of the pages already shown are reused, the directory then holding them all
+            self.contacts = self.contactBlocks.contacts(self)
+            self.contactBlocks.decoded.clear()
+            return self.contacts
+        raise AttributeError(f"'Directory' object has no attribute '{name}'")
+
+    def contactCount(directory: object):
+        """
+        Returns the number of contacts of a directory, without decoding them.
+
+        Args:
+            directory (Directory): The directory.
+
+        Returns:
+            int: The number of contacts.
+        """
+        if "contacts" in vars(directory) or "contactBlocks" not in vars(directory):
+            return len(directory.contacts)
+        return directory.contactBlocks.count
+
+    def contactSlice(directory: object, start: int = 0, stop: int = None):
+        """
+        Returns the contacts between two positions of a directory, decoding only the blocks holding them.
+
+        Args:
+            directory (Directory): The directory.
+            start (int, optional): The position of the first contact. Defaults to 0.
+            stop (int, optional): The position after the last contact. Defaults to the end of the directory.
+
+        Returns:
+            list: The contacts between start and stop.
+        """
+        if "contacts" in vars(directory) or "contactBlocks" not in vars(directory):
+            return directory.contacts[start:stop]
+        return directory.contactBlocks.contacts(directory, start, stop)
+
+    def touch(directory: object):
+        """
+        Marks a directory as changed after its name or one of its contacts was changed in place.
+
+        Args:
+            directory (Directory): The changed directory.
+
+        Returns:
+            None
+        """
+        directory.directoryVersion += 1
+
+    def release(directory: object):
+        """
+        Makes the contacts a deleted directory shared with other directories leave it, see Contact.leave.
+
+        A directory whose contacts were never decoded shares none, see loadSnapshot.
+
+        Args:
+            directory (Directory): The deleted directory.
+
+        Returns:
+            None
+        """
+        if "contacts" in vars(directory):
+            for contact in directory.contacts:
+                if contact.contactDirectories is not None:
+                    Contact.leave(contact, directory)
 
     def __str__(self):
         """
@@ -119,23 +431,32 @@ class Directory:
         Returns:
             str: A formatted string representation of the ContactDirectory object.
         """
-        
-        contact_info = ""
+        return "".join(Directory.render(self))
+
+    def render(directory: object, start: int = 0, stop: int = None):
+        """
+        Lazily yields the formatted output of a directory, with only the contacts between start and stop.
+
+        Parameters:
+            directory (Directory): The directory to render.
+            start (int, optional): The position of the first contact to render. Defaults to 0.
+            stop (int, optional): The position after the last contact to render. Defaults to the end of the directory.
 
-        for i, contact in enumerate(self.contacts, start=1):
-            if i > 1:
-                contact_info += "\n"
-            contact_info += f"   {i}:\n"
-            # Utilisez la méthode __str__ de l'objet Contact en ajoutant une indentation
-            contact_info += "\n".join(f"      {line}" for line in str(contact).split('\n'))
-            contact_info += "\n"
+        Yields:
+            str: The header, the block of each contact and the footer of the directory.
+        """
+        yield renderCache.get(directory, directory.directoryVersion, lambda: f"{Separator()}\n \033[1mDirectory Name:\033[0m {directory.directoryName}\n{Separator()}\n \033[1mDate Created:\033[0m {directory.directoryCreatedAt}\n{Separator()}\n \033[1mDate Updated:\033[0m {directory.directoryUpdatedAt}\n{Separator()}\n \033[1mContacts:\033[0m\n\n")
 
-        if not contact_info:
-            contact_info = "   You don't have any contacts yet." + " " * 34
+        for i, contact in enumerate(Directory.contactSlice(directory, start, stop), start=start + 1):
+            if i > start + 1:
+                yield "\n"
+            # The __str__ of the contact, indented under its number
+            yield f"   {i}:\n" + Contact.indented(contact) + "\n"
 
-        formatted_output = f"{Separator()}\n \033[1mDirectory Name:\033[0m {self.directoryName}\n{Separator()}\n \033[1mDate Created:\033[0m {self.directoryCreatedAt}\n{Separator()}\n \033[1mDate Updated:\033[0m {self.directoryUpdatedAt}\n{Separator()}\n \033[1mContacts:\033[0m\n\n{contact_info}\n{Separator()}"
+        if not Directory.contactCount(directory):
+            yield "   You don't have any contacts yet." + " " * 34
 
-        return formatted_output
+        yield f"\n{Separator()}"
 
     def showAllDirectories(directories: list):
         """
@@ -163,7 +484,9 @@ class Directory:
             None
         """
         for index, directory in enumerate(directories):
-            Render(f"\n\n\nDirectory number {index + 1}: \n\n{directory}")
+            title = f"{Fore.YELLOW}\n\n\nDirectory number {index + 1}: \n\n"
+            if not Paginate(Directory.contactCount(directory), lambda start, stop: [title, *Directory.render(directory, start, stop), f"{Style.RESET_ALL}\n"]):
+                break
         print("\n")
 
     def showDirectoryContent(directory: object):
@@ -173,7 +496,7 @@ class Directory:
         :param directory: An object representing the directory to be printed.
         :return: None
         """
-        print(directory, "\n")
+        Paginate(Directory.contactCount(directory), lambda start, stop: [*Directory.render(directory, start, stop), " \n\n"])
     
     def editDirectory(directory: object):
         """
@@ -187,6 +510,7 @@ class Directory:
         """
         directory.directoryName = Asking("Edit directory name: ")
         directory.directoryUpdatedAt = date.today()
+        Directory.touch(directory)
 
     def createContact(directory: object):
         """
@@ -199,18 +523,19 @@ class Directory:
             None
         """
         contactNickname = Asking("Enter the nickname of the contact: ")
-        contactPhone = Asking("Enter the phone of the contact: ")
+        contactPhone = AskingValid("Enter the phone of the contact: ", normalizePhone)
         contactFirstName = Asking("Enter the first name of the contact: ")
         contactLastName = Asking("Enter the last name of the contact: ")
-        contactEmail = Asking("Enter the email of the contact: ")
+        contactEmail = AskingValid("Enter the email of the contact: ", normalizeEmail)
         contactNotes = Asking("Enter the notes of the contact: ")
-        contactBirthday = Asking("Enter the birthday of the contact: ")
-        contactAddress = Asking("Enter the address of the contact: ")
+        contactBirthday = AskingValid("Enter the birthday of the contact: ", normalizeBirthday)
+        contactAddress = AskingValid("Enter the address of the contact: ", normalizeAddress)
         contactCreatedAt = date.today()
         contactUpdatedAt = date.today()
         print("\n")
         newContact =Contact(contactNickname, contactPhone, contactFirstName, contactLastName, contactEmail, contactNotes, contactBirthday, contactAddress, contactCreatedAt, contactUpdatedAt, directory)
         directory.contacts.append(newContact)
+        Directory.touch(directory)
     
     def showDirectoryContacts(directory: object):
         """
@@ -220,7 +545,7 @@ class Directory:
             directory (Directory): The directory object containing the contacts.
 
         Returns:
-            None
+            int: The index of the edited contact in the directory, or None if nothing was edited.
         """
         for index, contact in enumerate(directory.contacts, start=1):
             print(f"{index}: {contact.contactNickname}")
@@ -230,6 +555,7 @@ class Directory:
             actionChoosed = int(actionChoosed)
             if actionChoosed > 0 and actionChoosed <= len(directory.contacts):
                Contact.editContact(directory.contacts[actionChoosed - 1])
+               return actionChoosed - 1
             else:
                 Error("Invalid input.")
         else:
@@ -254,6 +580,7 @@ class Directory:
         directory.birthday = Asking("Edit contact birthday: ")
         directory.address = Asking("Edit contact address: ")
         directory.directoryUpdatedAt = date.today()
+        Directory.touch(directory)
     
     def deleteContact(directory: object):
         """
@@ -263,7 +590,7 @@ class Directory:
         - directory (object): The directory object containing the contacts.
 
         Returns:
-        None
+        tuple: The index of the deleted contact in the directory and the contact, or None if nothing was deleted.
         """
         for index, contact in enumerate(directory.contacts, start=1):
             print(f"{index}: {contact.contactNickname}")
@@ -272,7 +599,11 @@ class Directory:
         if actionChoosed.isdigit():
             actionChoosed = int(actionChoosed)
             if actionChoosed > 0 and actionChoosed <= len(directory.contacts):
-                directory.contacts.pop(actionChoosed - 1)
+                Directory.touch(directory)
+                contact = directory.contacts.pop(actionChoosed - 1)
+                Contact.leave(contact, directory)
+                Contact.uncache(contact)
+                return actionChoosed - 1, contact
             else:
                 Error("Invalid input.")
         else:
@@ -280,8 +611,101 @@ class Directory:
 
 # ------------------------------------------------ NECESSARY -------------------------------------------------- #
 
-# Needed for the colorama library
-init(autoreset=True)
+class LazyColors:
+    def __init__(self, name: str):
+        """
+        Stands for colorama.Fore or colorama.Style, importing and initializing colorama on first use only.
+
+        One-shot commands that print nothing in color do not pay for it at startup.
+
+        Args:
+            name (str): 'Fore' or 'Style'.
+        """
+        self.name = name
+
+    def __getattr__(self, attribute: str):
+        """
+        Returns the color code from colorama, initializing the library the first time.
+        """
+        import colorama
+
+        global colorsReady
+        if not colorsReady:
+            # Needed for the colorama library
+            colorama.init(autoreset=True)
+            colorsReady = True
+        return getattr(getattr(colorama, self.name), attribute)
+
+colorsReady = False
+Fore = LazyColors("Fore")
+Style = LazyColors("Style")
+
+def sliceContacts(myPhone: list, start: int, stop: int):
+    """
+    Lazily yields the contacts between two positions of the phone book, as if all directories were one list.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        start (int): The position of the first contact.
+        stop (int): The position after the last contact.
+
+    Yields:
+        Contact: The contacts between start and stop.
+    """
+    for directory in myPhone:
+        if start >= stop:
+            return
+        size = Directory.contactCount(directory)
+        if start < size:
+            yield from Directory.contactSlice(directory, start, stop)
+        start, stop = max(0, start - size), stop - size
+
+# Names of the contact fields, in the order of contactRecord, used by the storage and the import and export formats
+contactFieldNames = ("nickname", "phone", "firstName", "lastName", "email", "notes", "birthday", "address", "createdAt", "updatedAt")
+
+# Shared instances of the values repeated across many contacts, such as creation dates
+internedValues = {}
+
+def internValue(value):
+    """
+    Returns a shared instance equal to the given value, so repeated values are stored only once in memory.
+
+    Args:
+        value: A string, a date or any other hashable value.
+
+    Returns:
+        The shared instance of the value.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    try:
+        return internedValues.setdefault(value, value)
+    except TypeError:
+        return value
+
+def newContactId():
+    """
+    Returns a new random id for a contact, stable across saves and processes, see Contact.
+
+    Returns:
+        int: A positive 63 bits integer, so it also fits a SQLite integer.
+    """
+    return int.from_bytes(os.urandom(8), "big") >> 1
+
+def derivedContactId(*parts):
+    """
+    Returns the id of a contact saved before contacts had one, derived from where it was saved so every process gives
+    it the same id.
+
+    Args:
+        parts: The values locating the contact, such as its shard and position.
+
+    Returns:
+        int: A positive 63 bits integer, see newContactId.
+    """
+    import hashlib
+
+    return int.from_bytes(hashlib.blake2b(repr(parts).encode(), digest_size=8).digest(), "big") >> 1
 
 listOfActions = {
     "0": "Show all directories",
@@ -294,246 +718,6300 @@ listOfActions = {
     "7": "Edit a contact",
     "8": "Delete a contact",
     "9": "Delete all contacts",
+    "s": "Search contacts",
+    "i": "Import contacts",
+    "e": "Export contacts",
+    "d": "Merge duplicate contacts",
+    "b": "Show upcoming birthdays",
+    "o": "Show contacts in order",
+    "l": "Share a contact with another directory",
+    "m": "Show the metrics",
     "q": "Quit the application"
 }
 
-# ---------------------------------------------- OUTPUT STYLING ----------------------------------------------- #
+# -------------------------------------------------- METRICS --------------------------------------------------- #
 
-def Asking(message: str):
+# Whether the operations are timed, see timed. Off by default, the timers then cost a single check
+metricsEnabled = False
+
+# What is captured on top of the timings of each outermost operation: None, 'cprofile' for the functions it spends its
+# time in, or 'tracemalloc' for the peak memory it allocates
+profileMode = None
+profileModes = ("cprofile", "tracemalloc")
+
+# The latencies by operation name: 'load', 'refresh', 'save', 'commit', 'compact', 'index', 'search', 'birthdays',
+# 'sorted', 'render', 'write', each record operation of applyRecord for its change to the resident directories and indexes, and
+# 'server.<method>' for the requests answered by the server
+operationMetrics = {}
+metricsLock = threading.Lock()
+timerState = threading.local()
+
+class LatencyHistogram:
+    # Bucket n counts the latencies from 2**(n - 1) to 2**n microseconds, the last one everything longer
+    __slots__ = ("count", "total", "maximum", "buckets", "peakBytes", "profile")
+
+    def __init__(self):
+        """
+        Initializes an empty histogram of the latencies of one operation, with logarithmic buckets.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.buckets = [0] * 40
+        self.peakBytes = None
+        self.profile = None
+
+    def add(self, seconds: float):
+        """
+        Counts one latency.
+
+        Args:
+            seconds (float): The time taken by the operation.
+
+        Returns:
+            None
+        """
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+        self.buckets[min(len(self.buckets) - 1, int(seconds * 1e6).bit_length())] += 1
+
+    def percentile(self, share: float):
+        """
+        Returns the latency below which the given share of the operations took, to the upper bound of its bucket.
+
+        Args:
+            share (float): The share of the operations, between 0 and 1.
+
+        Returns:
+            float: The latency in seconds, never more than the longest one seen.
+        """
+        rank = share * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(self.maximum, (1 << bucket) / 1e6)
+        return self.maximum
+
+    def summary(self):
+        """
+        Returns the count, total, mean, percentiles and maximum of the latencies, in seconds.
+
+        Returns:
+            dict: The summary, with the peak bytes allocated when captured by tracemalloc.
+        """
+        summary = {"count": self.count, "total": self.total, "mean": self.total / self.count if self.count else 0.0, "p50": self.percentile(0.5), "p90": self.percentile(0.9), "p99": self.percentile(0.99), "max": self.maximum}
+        if self.peakBytes is not None:
+            summary["peakBytes"] = self.peakBytes
+        return summary
+
+class OperationTimer:
+    __slots__ = ("operation", "start", "profiler", "baseline")
+
+    def __init__(self, operation: str):
+        """
+        Times one operation in a with statement and adds its latency to operationMetrics.
+
+        Only the outermost timer of a thread profiles, the nested ones being part of what it captures.
+
+        Args:
+            operation (str): The name of the operation.
+        """
+        self.operation = operation
+        self.profiler = None
+        self.baseline = None
+
+    def __enter__(self):
+        depth = getattr(timerState, "depth", 0)
+        timerState.depth = depth + 1
+        if depth == 0 and profileMode == "cprofile":
+            import cProfile
+
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                self.profiler = profiler
+            except ValueError:
+                # Another thread is already profiling
+                pass
+        elif depth == 0 and profileMode == "tracemalloc":
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self.baseline = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        seconds = time.perf_counter() - self.start
+        timerState.depth -= 1
+        profile = peakBytes = None
+        if self.profiler is not None:
+            self.profiler.disable()
+            import pstats
+
+            profile = pstats.Stats(self.profiler)
+        elif self.baseline is not None:
+            import tracemalloc
+
+            peakBytes = tracemalloc.get_traced_memory()[1] - self.baseline
+        recordMetric(self.operation, seconds, peakBytes, profile)
+
+# Returned by timed when the metrics are off
+noTimer = contextlib.nullcontext()
+
+def timed(operation: str):
     """
-    Asks the user for input and returns the input as a string.
+    Returns a context manager timing an operation when the metrics are on, see metricsEnabled.
 
     Args:
-        message (str): The message to display to the user before asking for input.
+        operation (str): The name of the operation, see operationMetrics.
 
     Returns:
-        str: The input provided by the user.
+        OperationTimer: The timer, or a context manager doing nothing when the metrics are off.
     """
-    return input(Fore.GREEN + "\n" + message + " " + Style.RESET_ALL)
+    return OperationTimer(operation) if metricsEnabled else noTimer
 
-def Error(message: str):
+def recordMetric(operation: str, seconds: float, peakBytes: int = None, profile: object = None):
     """
-    Print an error message with a red color.
+    Adds the latency of an operation to its histogram, with what the profiling mode captured.
 
     Args:
-        message (str): The error message to be printed.
+        operation (str): The name of the operation.
+        seconds (float): The time taken.
+        peakBytes (int, optional): The peak memory allocated during the operation.
+        profile (pstats.Stats, optional): The functions the operation spent its time in.
 
     Returns:
         None
     """
-    return print(Fore.RED + "\n" + separator + "\n" + message +  "\n" + separator + "\n" + Style.RESET_ALL)
+    with metricsLock:
+        histogram = operationMetrics.get(operation)
+        if histogram is None:
+            histogram = operationMetrics[operation] = LatencyHistogram()
+        histogram.add(seconds)
+        if peakBytes is not None:
+            histogram.peakBytes = max(histogram.peakBytes or 0, peakBytes)
+        if profile is not None:
+            if histogram.profile is None:
+                histogram.profile = profile
+            else:
+                histogram.profile.add(profile)
 
-def Menu(message: str):
+def enableMetrics(mode: str = None):
     """
-    Print a menu message with a blue color.
+    Turns the timing of the operations on, starting from empty histograms.
 
     Args:
-        message (str): The list of menu options to be printed.
+        mode (str, optional): What to capture on top of the timings, see profileModes. Defaults to nothing.
 
     Returns:
         None
     """
-    return print(Fore.CYAN  + message  + Style.RESET_ALL)
+    global metricsEnabled, profileMode
+    if mode is not None and mode not in profileModes:
+        raise ValueError(f"Unknown profiling mode: {mode!r}.")
+    with metricsLock:
+        operationMetrics.clear()
+    metricsEnabled = True
+    profileMode = mode
 
-def Render(message: str):
+def profileSummary(profile: object, limit: int = 20):
     """
-    Print a message with a yellow color.
+    Returns the functions an operation spent the most time in, with everything they called.
 
     Args:
-        message (str): The message to be printed.
+        profile (pstats.Stats): The accumulated profile of the operation.
+        limit (int, optional): The number of functions returned. Defaults to 20.
 
     Returns:
-        None
+        list: A dictionary per function with its name, calls, own time and cumulative time, the slowest first.
     """
-    return print(Fore.YELLOW  + message  + Style.RESET_ALL)
+    functions = sorted(profile.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{"function": f"{os.path.basename(file)}:{line}({name})", "calls": calls, "total": total, "cumulative": cumulative} for (file, line, name), (_, calls, total, cumulative, _) in functions]
+
+def metricsReport(profiles: bool = False):
+    """
+    Returns the summary of the latencies of every operation timed so far.
+
+    Args:
+        profiles (bool, optional): Whether to add the functions captured by cProfile, see profileSummary. Defaults to False.
+
+    Returns:
+        dict: The summaries by operation name, see LatencyHistogram.summary.
+    """
+    with metricsLock:
+        report = {}
+        for operation, histogram in sorted(operationMetrics.items()):
+            report[operation] = histogram.summary()
+            if profiles and histogram.profile is not None:
+                report[operation]["profile"] = profileSummary(histogram.profile)
+        return report
+
+def showMetrics():
+    """
+    Prints the count, percentiles, maximum and total latency of every operation timed so far, one line each.
+
+    Returns:
+        None
+    """
+    report = metricsReport()
+    if not report:
+        Error("No operation was timed yet." if metricsEnabled else "The metrics are off, start with --metrics.")
+        return
+    width = max(len("operation"), *map(len, report))
+    print(f"{'operation':<{width}} {'count':>8} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'max ms':>10} {'total s':>9}")
+    for operation, summary in report.items():
+        peak = f" peak {summary['peakBytes'] / 1048576:.1f} MiB" if "peakBytes" in summary else ""
+        print(f"{operation:<{width}} {summary['count']:>8} {summary['p50'] * 1000:>10.3f} {summary['p90'] * 1000:>10.3f} {summary['p99'] * 1000:>10.3f} {summary['max'] * 1000:>10.3f} {summary['total']:>9.3f}{peak}")
+
+def dumpMetrics(path: str, extra: dict = None):
+    """
+    Writes the metrics, with the profiles captured, to a JSON file.
+
+    Args:
+        path (str): The file to write.
+        extra (dict, optional): More values to write along, such as the size of the phone book.
+
+    Returns:
+        None
+    """
+    import json
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"python": sys.version.split()[0], "platform": sys.platform, "date": date.today().isoformat(), "profileMode": profileMode, **(extra or {}), "operations": metricsReport(profiles=True)}, file, indent=2)
+
+# ---------------------------------------------- OUTPUT STYLING ----------------------------------------------- #
+
+def Asking(message: str):
+    """
+    Asks the user for input and returns the input as a string.
+
+    Args:
+        message (str): The message to display to the user before asking for input.
+
+    Returns:
+        str: The input provided by the user.
+    """
+    return input(Fore.GREEN + "\n" + message + " " + Style.RESET_ALL)
+
+def AskingValid(message: str, normalizer: object):
+    """
+    Asks the user for a contact field until the answer is empty or valid.
+
+    Args:
+        message (str): The message to display to the user before asking for input.
+        normalizer (callable): Returns the canonical form of the answer, or raises ValueError, see fieldNormalizers.
+
+    Returns:
+        str: The answer in its canonical form.
+    """
+    while True:
+        try:
+            return normalizer(Asking(message))
+        except ValueError as error:
+            Error(str(error))
+
+def Error(message: str):
+    """
+    Print an error message with a red color.
+
+    Args:
+        message (str): The error message to be printed.
+
+    Returns:
+        None
+    """
+    return print(Fore.RED + "\n" + separator + "\n" + message +  "\n" + separator + "\n" + Style.RESET_ALL)
+
+def Menu(message: str):
+    """
+    Print a menu message with a blue color.
+
+    Args:
+        message (str): The list of menu options to be printed.
+
+    Returns:
+        None
+    """
+    return print(Fore.CYAN  + message  + Style.RESET_ALL)
+
+def Render(message: str):
+    """
+    Print a message with a yellow color.
+
+    Args:
+        message (str): The message to be printed.
+
+    Returns:
+        None
+    """
+    return print(Fore.YELLOW  + message  + Style.RESET_ALL)
+
+def Stream(chunks: object):
+    """
+    Writes rendered chunks to the terminal in a few buffered writes.
+
+    Args:
+        chunks (iterable): The strings to write.
+
+    Returns:
+        None
+    """
+    chunks = iter(chunks)
+    # Join the chunks by batches, so one write is enough for a page without building a huge string for long outputs
+    while True:
+        with timed("render"):
+            batch = list(itertools.islice(chunks, 1000))
+        if not batch:
+            break
+        with timed("write"):
+            sys.stdout.write("".join(batch))
+    sys.stdout.flush()
+
+def Paginate(count: int, renderPage: object):
+    """
+    Shows a long output one page at a time, only rendering the items of the current page.
+
+    Args:
+        count (int): The number of items to show.
+        renderPage (callable): Called with the start and stop positions of the page, returns the chunks to write.
+
+    Returns:
+        bool: False if the user went back before the last page, True otherwise.
+    """
+    global pageSize
+    page = 0
+
+    while True:
+        pages = max(1, -(-count // pageSize))
+        page = min(page, pages - 1)
+        start = page * pageSize
+        Stream(renderPage(start, min(start + pageSize, count)))
+        if pages == 1:
+            return True
+
+        command, _, argument = Asking(f"Page {page + 1}/{pages} - n: next, p: previous, j <page>: jump, s <size>: page size, b: back").strip().lower().partition(" ")
+        if command in ("", "n"):
+            if page + 1 == pages:
+                return True
+            page += 1
+        elif command == "p":
+            page = max(0, page - 1)
+        elif command == "j" and argument.isdigit() and 1 <= int(argument) <= pages:
+            page = int(argument) - 1
+        elif command == "s" and argument.isdigit() and int(argument) > 0:
+            pageSize = int(argument)
+            page = start // pageSize
+        elif command == "b":
+            return False
+        else:
+            Error("Invalid input.")
 
 def Separator():
     """
-    Print a separator with a green color.
+    Print a separator with a green color.
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    return Fore.GREEN  + separator  + Style.RESET_ALL
+
+# Calculate the maximum key length and create a format string for key-value pairs in listOfActions to render the menu
+max_key_length = max(len(key) for key in listOfActions.keys())
+format_string = f"{{:<{max_key_length}}} : {{}}"
+
+separator = "-" * 48
+
+# Number of contacts shown per page, can be changed from the pager
+pageSize = 20
+
+class RenderCache:
+    # Bytes counted per entry on top of its text, for the key, the version and the slot of the ordered dictionary
+    entryOverhead = 200
+
+    def __init__(self, maxBytes: int):
+        """
+        Initializes an empty least recently used cache of rendered text, such as the cards of the contacts.
+
+        Each entry is kept with the version of what it was rendered from, and rendered again when the version changed,
+        so an edit never shows a stale card even when nothing removed the entry.
+
+        Args:
+            maxBytes (int): The memory the entries may use, the least recently used ones being dropped beyond it. 0
+                disables the cache.
+        """
+        self.maxBytes = maxBytes
+        self.entries = collections.OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: object, version: object, render: object):
+        """
+        Returns the text rendered for a key, rendering it again if it is missing or was rendered from another version.
+
+        Args:
+            key (object): What the text is rendered from, compared by identity for contacts and directories.
+            version (object): The version of what the text is rendered from, see Contact.touch and Directory.touch.
+            render (callable): Called without arguments, returns the text.
+
+        Returns:
+            str: The rendered text.
+        """
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        text = render()
+        if self.maxBytes:
+            self.discard(key)
+            self.entries[key] = (version, text)
+            self.size += sys.getsizeof(text) + RenderCache.entryOverhead
+            while self.size > self.maxBytes:
+                _, (_, dropped) = self.entries.popitem(last=False)
+                self.size -= sys.getsizeof(dropped) + RenderCache.entryOverhead
+                self.evictions += 1
+        return text
+
+    def discard(self, key: object):
+        """
+        Drops the text rendered for a key, if any.
+
+        Args:
+            key (object): What the text was rendered from.
+
+        Returns:
+            None
+        """
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= sys.getsizeof(entry[1]) + RenderCache.entryOverhead
+
+    def resize(self, maxBytes: int):
+        """
+        Changes the memory the entries may use, dropping everything when the cache is disabled.
+
+        Args:
+            maxBytes (int): The new limit, 0 disabling the cache.
+
+        Returns:
+            None
+        """
+        self.maxBytes = maxBytes
+        if not maxBytes:
+            self.clear()
+        while self.size > self.maxBytes:
+            _, (_, dropped) = self.entries.popitem(last=False)
+            self.size -= sys.getsizeof(dropped) + RenderCache.entryOverhead
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Drops every entry.
+        """
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The number of hits, misses and evictions, and the number of entries and bytes held.
+        """
+        return {"renderHits": self.hits, "renderMisses": self.misses, "renderEvictions": self.evictions, "renderEntries": len(self.entries), "renderBytes": self.size}
+
+# Default memory of the cache of rendered cards, in MiB, see renderCache
+renderCacheSize = 16
+
+# The rendered cards of the contacts, with and without their indentation under a directory, and the headers of the
+# directories
+renderCache = RenderCache(renderCacheSize << 20)
+
+# --------------------------------------------------- SEARCH ---------------------------------------------------- #
+
+def normalizeDigits(phone: str):
+    """
+    Keeps only the digits of a phone number, so '+33 6 12-34' and '33612 34' are found the same way.
+
+    Args:
+        phone (str): The phone number as typed by the user.
+
+    Returns:
+        str: The digits of the phone number.
+    """
+    return "".join(character for character in str(phone) if character.isdigit())
+
+def nGrams(text: str, size: int = 3):
+    """
+    Returns the set of substrings of the given size contained in a text.
+
+    Args:
+        text (str): The text to split.
+        size (int, optional): The length of the substrings. Defaults to 3.
+
+    Returns:
+        set: The substrings of the text.
+    """
+    return {text[index:index + size] for index in range(len(text) - size + 1)}
+
+class ContactIndex:
+    """
+    Base of the in-memory indexes over the contacts, kept up to date from the journal records.
+
+    Subclasses set up their empty structures in __init__ and implement add and remove, remove relying on what add
+    stored rather than on the current fields, since contacts are edited in place. A contact shared by several
+    directories is added once, those following its directories implementing join and leave too.
+    """
+
+    def build(self, myPhone: list):
+        """
+        Rebuilds the index from every contact of every directory.
+
+        Args:
+            myPhone (list): The directories with their contacts.
+
+        Returns:
+            None
+        """
+        self.__init__()
+        for directory in myPhone:
+            for contact in directory.contacts:
+                if contact.contactDirectories is None or contact.contactDirectory is directory:
+                    self.add(contact)
+
+    def join(self, contact: object, directory: object):
+        """
+        Follows an indexed contact added to another directory, see Contact.join. Does nothing by default.
+        """
+
+    def leave(self, contact: object, directory: object):
+        """
+        Follows an indexed contact removed from one of the directories sharing it, see Contact.leave. Does nothing by
+        default.
+        """
+
+    def update(self, myPhone: list, record: tuple, removed: object = None):
+        """
+        Keeps the index up to date after a mutation was applied to the directories.
+
+        Args:
+            myPhone (list): The directories with their contacts, already mutated.
+            record (tuple): The journal record describing the mutation, see applyRecord.
+            removed (object, optional): The contact or directory removed by the mutation, if any.
+
+        Returns:
+            None
+        """
+        operation = record[0]
+        if operation == "createContact":
+            self.add(myPhone[record[1]].contacts[-1])
+        elif operation == "editContact":
+            contact = myPhone[record[1]].contacts[record[2]]
+            self.remove(removed if removed is not None else contact)
+            self.add(contact)
+        elif operation == "deleteContact":
+            directory = myPhone[record[1]]
+            # A shared contact removed from one of its directories lives on in the others
+            if removed.contactDirectory is directory:
+                self.remove(removed)
+            else:
+                self.leave(removed, directory)
+        elif operation == "linkContact":
+            directory = myPhone[record[1]]
+            self.join(directory.contacts[record[2]], directory)
+        elif operation == "deleteDirectory":
+            for contact in removed.contacts:
+                if contact.contactDirectory is removed:
+                    self.remove(contact)
+                else:
+                    self.leave(contact, removed)
+        elif operation == "deleteAllDirectories":
+            self.__init__()
+
+class SearchIndex(ContactIndex):
+    def __init__(self):
+        """
+        Initializes empty search indexes over the contacts.
+
+        The names (nickname, first and last name) are kept in a prefix trie, the email and address in a trigram index
+        for substring matches, and the phone numbers by their normalized digits.
+        """
+        self.trie = {}
+        self.textGrams = {}
+        self.phoneGrams = {}
+        self.phones = {}
+        self.keys = {}
+
+    def add(self, contact: object):
+        """
+        Adds a contact to the indexes.
+
+        Args:
+            contact (Contact): The contact to index.
+
+        Returns:
+            None
+        """
+        names = set()
+        for value in (contact.contactNickname, contact.contactFirstName, contact.contactLastName):
+            names.update(str(value).lower().split())
+        text = f"{contact.contactEmail}\n{contact.contactAddress}".lower()
+        textGrams = nGrams(text)
+        digits = normalizeDigits(contact.contactPhone)
+        phoneGrams = nGrams(digits)
+
+        for name in names:
+            node = self.trie
+            for character in name:
+                node = node.setdefault(character, {})
+            node.setdefault("", set()).add(contact)
+        for gram in textGrams:
+            self.textGrams.setdefault(gram, set()).add(contact)
+        for gram in phoneGrams:
+            self.phoneGrams.setdefault(gram, set()).add(contact)
+        if digits:
+            self.phones.setdefault(digits, set()).add(contact)
+        # Keep what was indexed so the contact can be removed even after its fields were edited in place, and the
+        # order of the results so it is not computed again on every search
+        sortKey = (str(contact.contactLastName).lower(), str(contact.contactFirstName).lower(), str(contact.contactNickname).lower())
+        self.keys[contact] = (names, textGrams, digits, phoneGrams, sortKey)
+
+    def remove(self, contact: object):
+        """
+        Removes a contact from the indexes, using the values it was indexed with.
+
+        Args:
+            contact (Contact): The contact to remove.
+
+        Returns:
+            None
+        """
+        keys = self.keys.pop(contact, None)
+        if keys is None:
+            return
+        names, textGrams, digits, phoneGrams, _ = keys
+
+        for name in names:
+            path = [self.trie]
+            for character in name:
+                path.append(path[-1][character])
+            bucket = path[-1][""]
+            bucket.discard(contact)
+            if not bucket:
+                del path[-1][""]
+            # Prune the branches left without any contact
+            for depth in range(len(name) - 1, -1, -1):
+                if path[depth + 1]:
+                    break
+                del path[depth][name[depth]]
+        for grams, index in ((textGrams, self.textGrams), (phoneGrams, self.phoneGrams)):
+            for gram in grams:
+                bucket = index[gram]
+                bucket.discard(contact)
+                if not bucket:
+                    del index[gram]
+        if digits:
+            bucket = self.phones[digits]
+            bucket.discard(contact)
+            if not bucket:
+                del self.phones[digits]
+
+    def searchName(self, prefix: str):
+        """
+        Finds the contacts having a nickname, first name or last name word starting with the given prefix.
+
+        Args:
+            prefix (str): The beginning of the name.
+
+        Returns:
+            set: The matching contacts.
+        """
+        node = self.trie
+        for character in prefix.lower():
+            node = node.get(character)
+            if node is None:
+                return set()
+
+        results = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == "":
+                    results.update(child)
+                else:
+                    stack.append(child)
+        return results
+
+    def searchGrams(self, query: str, index: dict):
+        """
+        Returns the contacts containing every trigram of the query in the given trigram index.
+        """
+        buckets = []
+        for gram in nGrams(query):
+            bucket = index.get(gram)
+            if bucket is None:
+                return set()
+            buckets.append(bucket)
+        buckets.sort(key=len)
+        return set(buckets[0]).intersection(*buckets[1:])
+
+    def searchText(self, query: str):
+        """
+        Finds the contacts whose email or address contains the query, of three characters at least.
+
+        Args:
+            query (str): The substring to look for.
+
+        Returns:
+            set: The matching contacts, none for a shorter query which only the names and phones answer.
+        """
+        query = query.lower()
+        if len(query) < 3:
+            # Shorter than a trigram, it could only be matched by scanning every contact
+            return set()
+        candidates = self.searchGrams(query, self.textGrams)
+        if len(query) == 3:
+            # A single trigram, contained by every contact indexed under it
+            return candidates
+        return {contact for contact in candidates if query in str(contact.contactEmail).lower() or query in str(contact.contactAddress).lower()}
+
+    def searchPhone(self, query: str):
+        """
+        Finds the contacts whose phone number contains the digits of the query.
+
+        Args:
+            query (str): The phone number, or a part of it, in any format.
+
+        Returns:
+            set: The matching contacts.
+        """
+        digits = normalizeDigits(query)
+        if not digits:
+            return set()
+        if len(digits) < 3:
+            return set(self.phones.get(digits, ()))
+        results = set()
+        queries = [digits]
+        if digits.startswith(trunkPrefix) and not digits.startswith("00"):
+            # Numbers are stored in E.164, where the national prefix is replaced by the country code
+            queries.append(defaultCountryCode + digits[len(trunkPrefix):])
+        for number in queries:
+            candidates = self.searchGrams(number, self.phoneGrams)
+            results.update(contact for contact in candidates if number in self.keys[contact][2])
+        return results
+
+    def search(self, query: str, limit: int = None):
+        """
+        Finds the contacts matching the query by name prefix, email or address substring, or phone digits.
+
+        Args:
+            query (str): What the user is looking for.
+            limit (int, optional): The number of contacts to return, only the first ones being ordered. Defaults to all.
+
+        Returns:
+            list: The matching contacts, sorted by last name, first name and nickname.
+        """
+        import heapq
+
+        query = query.strip()
+        if not query:
+            return []
+        results = None
+        for word in query.split():
+            matches = self.searchName(word)
+            results = matches if results is None else results & matches
+        results.update(self.searchText(query))
+        if all(character in "0123456789+-(). " for character in query):
+            results.update(self.searchPhone(query))
+        if limit is None:
+            return sorted(results, key=lambda contact: self.keys[contact][4])
+        return heapq.nsmallest(limit, results, key=lambda contact: self.keys[contact][4])
+
+monthNames = {"jan": 1, "janv": 1, "janvier": 1, "january": 1, "feb": 2, "fev": 2, "fevr": 2, "fevrier": 2, "february": 2, "mar": 3, "mars": 3, "march": 3, "apr": 4, "avr": 4, "avril": 4, "april": 4, "may": 5, "mai": 5, "jun": 6, "juin": 6, "june": 6, "jul": 7, "juil": 7, "juillet": 7, "july": 7, "aug": 8, "aout": 8, "august": 8, "sep": 9, "sept": 9, "septembre": 9, "september": 9, "oct": 10, "octobre": 10, "october": 10, "nov": 11, "novembre": 11, "november": 11, "dec": 12, "decembre": 12, "december": 12}
+
+def parseBirthday(birthday: object):
+    """
+    Reads the month and day out of a birthday typed in any of the usual formats.
+
+    The birthday is free text, so this accepts '14/03/1990', '14-03', '1990-03-14', '19900314', the vCard '--0314'
+    and '14 mars 1990' or 'March 14', and gives up on anything else. The year is not needed to know when it comes back.
+
+    Args:
+        birthday (object): The birthday of a contact, a string or a date.
+
+    Returns:
+        tuple: The month and day, or None if the birthday is empty or could not be read.
+    """
+    if isinstance(birthday, date):
+        return (birthday.month, birthday.day)
+    text = str(birthday).strip().lower()
+    if not text:
+        return None
+    text = text.replace("é", "e").replace("û", "u").replace(",", " ").replace(".", " ")
+    match = re.fullmatch(r"(\d{4})-?(\d{2})-?(\d{2})(t.*)?|--(\d{2})-?(\d{2})", text)
+    if match:
+        month, day = (match.group(2), match.group(3)) if match.group(1) else (match.group(5), match.group(6))
+    else:
+        match = re.fullmatch(r"(\d{1,2})[/\- ]+(\d{1,2})([/\- ]+\d{2,4})?", text)
+        if match:
+            day, month = match.group(1), match.group(2)
+        else:
+            words = text.replace("/", " ").replace("-", " ").split()
+            numbers = [word for word in words if word.isdigit() and len(word) <= 2]
+            months = [monthNames[word] for word in words if word in monthNames]
+            if len(numbers) != 1 or len(months) != 1:
+                return None
+            day, month = numbers[0], months[0]
+    month, day = int(month), int(day)
+    try:
+        # 2000 is a leap year, so the 29th of February is accepted
+        date(2000, month, day)
+    except ValueError:
+        return None
+    return (month, day)
+
+class BirthdayIndex(ContactIndex):
+    def __init__(self):
+        """
+        Initializes an empty birthday index.
+
+        The contacts with a readable birthday are kept sorted by the day of the year it falls on, counted in a leap
+        year so the 29th of February has its own day, which turns "who has a birthday in the next days" into a
+        binary search followed by a slice.
+        """
+        self.days = []
+        self.contacts = []
+        self.keys = {}
+
+    def add(self, contact: object):
+        """
+        Adds a contact to the index if its birthday can be read.
+
+        Args:
+            contact (Contact): The contact to index.
+
+        Returns:
+            None
+        """
+        birthday = parseBirthday(contact.contactBirthday)
+        if birthday is None:
+            return
+        day = date(2000, *birthday).timetuple().tm_yday
+        position = bisect.bisect_right(self.days, day)
+        self.days.insert(position, day)
+        self.contacts.insert(position, contact)
+        # Keep the indexed day so the contact can be removed even after its birthday was edited in place
+        self.keys[contact] = day
+
+    def remove(self, contact: object):
+        """
+        Removes a contact from the index, using the day it was indexed with.
+
+        Args:
+            contact (Contact): The contact to remove.
+
+        Returns:
+            None
+        """
+        day = self.keys.pop(contact, None)
+        if day is None:
+            return
+        position = bisect.bisect_left(self.days, day)
+        while self.contacts[position] is not contact:
+            position += 1
+        del self.days[position]
+        del self.contacts[position]
+
+    def between(self, first: int, last: int):
+        """
+        Returns the contacts whose birthday falls between two days of the year.
+
+        Args:
+            first (int): The first day of the year, included.
+            last (int): The last day of the year, included.
+
+        Returns:
+            list: The (day of the year, contact) pairs, sorted by day.
+        """
+        start = bisect.bisect_left(self.days, first)
+        stop = bisect.bisect_right(self.days, last)
+        return list(zip(self.days[start:stop], self.contacts[start:stop]))
+
+    def upcoming(self, days: int = 14, today: date = None):
+        """
+        Returns the contacts whose birthday is in the coming days, wrapping around the end of the year.
+
+        The range is cut at the end of the year into at most two slices of the index. Birthdays on the 29th of February
+        are given on the 1st of March in the other years.
+
+        Args:
+            days (int, optional): The number of days to look ahead, today included. Defaults to 14.
+            today (date, optional): The first day of the range. Defaults to today.
+
+        Returns:
+            list: The (next birthday, contact) pairs, the nearest first.
+        """
+        from calendar import isleap
+        from datetime import timedelta
+
+        today = today or date.today()
+        end = today + timedelta(days=min(days, 366) - 1)
+        results = []
+        start = today
+        while start <= end:
+            stop = min(end, date(start.year, 12, 31))
+            first = date(2000, start.month, start.day).timetuple().tm_yday
+            last = date(2000, stop.month, stop.day).timetuple().tm_yday
+            if not isleap(start.year) and (start.month, start.day) == (3, 1):
+                first -= 1
+            for dayOfYear, contact in self.between(first, last):
+                birthday = date(2000, 1, 1) + timedelta(days=dayOfYear - 1)
+                if (birthday.month, birthday.day) == (2, 29) and not isleap(start.year):
+                    results.append((date(start.year, 3, 1), contact))
+                else:
+                    results.append((date(start.year, birthday.month, birthday.day), contact))
+            start = stop + timedelta(days=1)
+        return results
+
+# ------------------------------------------------ SORTED VIEWS ------------------------------------------------- #
+
+# The sort forms already computed, the same names and dates coming back for many contacts, emptied when it grows large
+sortTexts = {}
+
+def sortText(value: object):
+    """
+    Returns the form of a text used to sort it, lowercase and without accents so 'Émile' sorts among the 'e'.
+
+    Args:
+        value (object): The text, or a date.
+
+    Returns:
+        str: The text to sort by, shared by the equal values.
+    """
+    text = sortTexts.get(value)
+    if text is None:
+        text = value.isoformat() if isinstance(value, date) else str(value).lower()
+        if not text.isascii():
+            import unicodedata
+
+            text = "".join(character for character in unicodedata.normalize("NFKD", text) if not unicodedata.combining(character))
+        if len(sortTexts) >= 1 << 16:
+            sortTexts.clear()
+        sortTexts[value] = text
+    return text
+
+class SortedChunks:
+    # Entries per chunk once built, a chunk reaching twice as many being split in two
+    chunkSize = 512
+
+    def __init__(self, entries: list = ()):
+        """
+        Initializes a sorted sequence of unique keys with a value each, kept in chunks like the leaves of a B-tree.
+
+        Inserting or removing an entry only shifts the entries of one chunk, and a key is found by a binary search over
+        the last key of every chunk, then within the chunk.
+
+        Args:
+            entries (list, optional): The (key, value) pairs, already sorted by key.
+        """
+        self.keys = []
+        self.values = []
+        self.maxes = []
+        self.size = len(entries)
+        for start in range(0, len(entries), SortedChunks.chunkSize):
+            chunk = entries[start:start + SortedChunks.chunkSize]
+            self.keys.append([key for key, _ in chunk])
+            self.values.append([value for _, value in chunk])
+            self.maxes.append(self.keys[-1][-1])
+
+    def __len__(self):
+        """
+        Returns the number of entries.
+        """
+        return self.size
+
+    def insert(self, key: tuple, value: object):
+        """
+        Adds an entry at the position of its key.
+
+        Args:
+            key (tuple): The key, not already in the sequence.
+            value (object): The value.
+
+        Returns:
+            None
+        """
+        self.size += 1
+        if not self.maxes:
+            self.keys.append([key])
+            self.values.append([value])
+            self.maxes.append(key)
+            return
+        # A key beyond every chunk goes at the end of the last one
+        chunk = min(bisect.bisect_left(self.maxes, key), len(self.maxes) - 1)
+        keys = self.keys[chunk]
+        position = bisect.bisect_left(keys, key)
+        keys.insert(position, key)
+        self.values[chunk].insert(position, value)
+        self.maxes[chunk] = keys[-1]
+        if len(keys) >= 2 * SortedChunks.chunkSize:
+            half = len(keys) // 2
+            self.keys.insert(chunk + 1, keys[half:])
+            self.values.insert(chunk + 1, self.values[chunk][half:])
+            del keys[half:], self.values[chunk][half:]
+            self.maxes.insert(chunk, keys[-1])
+
+    def remove(self, key: tuple):
+        """
+        Removes the entry of a key.
+
+        Args:
+            key (tuple): The key of the entry.
+
+        Returns:
+            None
+
+        Raises:
+            KeyError: If no entry has this key.
+        """
+        chunk = bisect.bisect_left(self.maxes, key)
+        keys = self.keys[chunk] if chunk < len(self.maxes) else []
+        position = bisect.bisect_left(keys, key)
+        if position == len(keys) or keys[position] != key:
+            raise KeyError(key)
+        self.size -= 1
+        del keys[position], self.values[chunk][position]
+        if keys:
+            self.maxes[chunk] = keys[-1]
+        else:
+            del self.keys[chunk], self.values[chunk], self.maxes[chunk]
+
+    def position(self, key: tuple):
+        """
+        Returns the position of the first entry whose key is not below the given one.
+
+        Args:
+            key (tuple): The key, which does not need to be in the sequence.
+
+        Returns:
+            int: The position, the length of the sequence if every key is below.
+        """
+        chunk = bisect.bisect_left(self.maxes, key)
+        if chunk == len(self.maxes):
+            return self.size
+        return sum(map(len, self.keys[:chunk])) + bisect.bisect_left(self.keys[chunk], key)
+
+    def slice(self, start: int, stop: int):
+        """
+        Returns the values between two positions.
+
+        Args:
+            start (int): The position of the first value.
+            stop (int): The position after the last value.
+
+        Returns:
+            list: The values, in the order of their keys.
+        """
+        values = []
+        for chunk in self.values:
+            if start >= stop:
+                break
+            if start < len(chunk):
+                values.extend(chunk[start:stop])
+            start, stop = max(0, start - len(chunk)), stop - len(chunk)
+        return values
+
+class SortedIndex(ContactIndex):
+    def __init__(self):
+        """
+        Initializes an empty sorted view of the contacts, across all directories and within each one.
+
+        Subclasses define sortKey, the fields a contact is sorted by as a tuple of texts, see sortText, and may override
+        boundText, how a bound of a range is compared to the first of them. The view is updated on every change rather
+        than sorted again, and a page of a range is two binary searches and a slice, see page.
+        """
+        self.all = SortedChunks()
+        self.directories = {}
+        self.keys = {}
+
+    def boundText(value: object):
+        """
+        Returns a bound of a range in the form of the first field of sortKey.
+        """
+        return sortText(value)
+
+    def build(self, myPhone: list):
+        """
+        Rebuilds the view from every contact of every directory, sorting each directory, then merging them.
+
+        Args:
+            myPhone (list): The directories with their contacts.
+
+        Returns:
+            None
+        """
+        self.__init__()
+        directories = []
+        for directory in myPhone:
+            # The identity of the contact breaks the ties, so keys are unique and contacts are never compared
+            entries = sorted(((*type(self).sortKey(contact), id(contact)), contact) for contact in directory.contacts)
+            self.keys.update((contact, key) for key, contact in entries)
+            if entries:
+                self.directories[directory] = SortedChunks(entries)
+            if any(contact.contactDirectories is not None for contact in directory.contacts):
+                # A shared contact only goes in the view across all directories from its first one
+                entries = [entry for entry in entries if entry[1].contactDirectories is None or entry[1].contactDirectory is directory]
+            directories.append(entries)
+        # Sorting already sorted runs only merges them
+        self.all = SortedChunks(sorted(itertools.chain(*directories), key=lambda entry: entry[0]))
+
+    def add(self, contact: object):
+        """
+        Adds a contact to the view, and to the views of its directories.
+
+        Args:
+            contact (Contact): The contact.
+
+        Returns:
+            None
+        """
+        key = (*type(self).sortKey(contact), id(contact))
+        self.all.insert(key, contact)
+        # Keep the key so the contact can be removed even after its fields were edited in place
+        self.keys[contact] = key
+        for directory in Contact.directories(contact):
+            self.join(contact, directory)
+
+    def remove(self, contact: object):
+        """
+        Removes a contact from the view, using the key it was added with.
+
+        Args:
+            contact (Contact): The contact.
+
+        Returns:
+            None
+        """
+        key = self.keys.get(contact)
+        if key is None:
+            return
+        self.all.remove(key)
+        for directory in Contact.directories(contact):
+            self.leave(contact, directory)
+        del self.keys[contact]
+
+    def join(self, contact: object, directory: object):
+        """
+        Adds a contact already in the view to the view of one more directory.
+
+        Args:
+            contact (Contact): The contact.
+            directory (Directory): The directory.
+
+        Returns:
+            None
+        """
+        chunks = self.directories.get(directory)
+        if chunks is None:
+            chunks = self.directories[directory] = SortedChunks()
+        chunks.insert(self.keys[contact], contact)
+
+    def leave(self, contact: object, directory: object):
+        """
+        Removes a contact from the view of one directory, using the key it was added with.
+
+        Args:
+            contact (Contact): The contact.
+            directory (Directory): The directory.
+
+        Returns:
+            None
+        """
+        chunks = self.directories[directory]
+        chunks.remove(self.keys[contact])
+        if not len(chunks):
+            del self.directories[directory]
+
+    def page(self, directory: object = None, low: object = None, high: object = None, start: int = 0, stop: int = None, reverse: bool = False):
+        """
+        Returns a page of the contacts whose first sort field is within a range.
+
+        The high bound is a prefix: 'k' to 'm' holds every name starting with k, l or m, and a date up to the given day
+        included.
+
+        Args:
+            directory (Directory, optional): The directory to list, all of them if None.
+            low (object, optional): The lowest first field, a text or a date. Defaults to no bound.
+            high (object, optional): The highest first field, a text or a date. Defaults to no bound.
+            start (int, optional): The position of the first contact within the range. Defaults to 0.
+            stop (int, optional): The position after the last contact within the range. Defaults to the end of the range.
+            reverse (bool, optional): Whether to count positions from the end of the range, the last contact first.
+
+        Returns:
+            tuple: The number of contacts in the range, and the contacts of the page.
+        """
+        chunks = self.all if directory is None else self.directories.get(directory, SortedChunks())
+        first = 0 if low is None else chunks.position((type(self).boundText(low),))
+        last = len(chunks) if high is None else chunks.position((type(self).boundText(high) + "\U0010ffff",))
+        count = max(0, last - first)
+        stop = count if stop is None else max(0, min(stop, count))
+        start = max(0, min(start, stop))
+        if reverse:
+            return count, chunks.slice(last - stop, last - start)[::-1]
+        return count, chunks.slice(first + start, first + stop)
+
+class LastNameIndex(SortedIndex):
+    def sortKey(contact: object):
+        """
+        Sorts by last name, then first name.
+        """
+        return (sortText(contact.contactLastName), sortText(contact.contactFirstName))
+
+class DateIndex(SortedIndex):
+    def boundText(value: object):
+        """
+        Accepts a date, or a year, a month or a day in ISO 8601 such as '2024', '2024-05' or '2024-05-17'.
+        """
+        text = sortText(value)
+        if not re.fullmatch(r"\d{4}(-(0[1-9]|1[0-2])(-(0[1-9]|[12]\d|3[01]))?)?", text):
+            raise ValueError(f"Invalid date: {value!r}, expected yyyy, yyyy-mm or yyyy-mm-dd.")
+        return text
+
+class CreatedIndex(DateIndex):
+    def sortKey(contact: object):
+        """
+        Sorts by creation date, then last name.
+        """
+        return (sortText(contact.contactCreatedAt), sortText(contact.contactLastName))
+
+class UpdatedIndex(DateIndex):
+    def sortKey(contact: object):
+        """
+        Sorts by update date, then last name.
+        """
+        return (sortText(contact.contactUpdatedAt), sortText(contact.contactLastName))
+
+# The sorted views by the name given on the command line
+sortOrders = {"name": LastNameIndex, "created": CreatedIndex, "updated": UpdatedIndex}
+
+# ----------------------------------------------- SHARED CONTACTS ----------------------------------------------- #
+
+class ContactTable(ContactIndex):
+    def __init__(self):
+        """
+        Initializes an empty table of the contacts by id, a contact shared by several directories being in it once.
+
+        The directories holding a contact are kept on the contact itself, see Contact.join, so the table answers
+        which contact has an id, and the contact which directories hold it, both in constant time.
+        """
+        self.contacts = {}
+
+    def add(self, contact: object):
+        """
+        Adds a contact to the table.
+
+        Args:
+            contact (Contact): The contact.
+
+        Returns:
+            None
+        """
+        self.contacts[contact.contactId] = contact
+
+    def remove(self, contact: object):
+        """
+        Removes a contact from the table, unless a newer version of it took its id already.
+
+        Args:
+            contact (Contact): The contact.
+
+        Returns:
+            None
+        """
+        if self.contacts.get(contact.contactId) is contact:
+            del self.contacts[contact.contactId]
+
+def shareRecords(myPhone: list):
+    """
+    Returns the records turning the copies of a contact kept in several directories into a single shared contact.
+
+    Copies are contacts with the same fields apart from their dates. The first copy, in the order of the directories,
+    is kept and takes the place of each other copy, so the positions of the contacts do not move. Copies within a
+    single directory are left to the duplicate detection, see findDuplicates.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+
+    Returns:
+        list: For each copy, its deletion followed by the link of the kept contact at its position, see applyRecord.
+    """
+    kept = {}
+    records = []
+    for directoryIndex, directory in enumerate(myPhone):
+        for contactIndex, contact in enumerate(directory.contacts):
+            if contact.contactDirectories is not None and contact.contactDirectory is not directory:
+                # Already shared, seen from its first directory
+                continue
+            first = kept.setdefault(contactRecord(contact)[:8], (directoryIndex, contactIndex, contact, {directoryIndex}))
+            if directoryIndex in first[3] or Contact.isIn(first[2], directory):
+                continue
+            first[3].add(directoryIndex)
+            records.append(("deleteContact", directoryIndex, contactIndex))
+            records.append(("linkContact", directoryIndex, contactIndex, first[0], first[1]))
+    return records
+
+def shareContacts(store: object, dryRun: bool = False):
+    """
+    Turns the copies of a contact kept in several directories into a single shared contact, see shareRecords.
+
+    Args:
+        store (PhoneStore): The store holding the phone book.
+        dryRun (bool, optional): Whether to only count the copies. Defaults to False.
+
+    Returns:
+        dict: The number of contacts checked, of contacts now shared and of copies removed, and the seconds taken.
+    """
+    start = time.perf_counter()
+    myPhone = store.load()
+    records = shareRecords(myPhone)
+    if records and not dryRun:
+        store.apply(records)
+    return {"contacts": sum(map(Directory.contactCount, myPhone)), "shared": len({record[3:] for record in records if record[0] == "linkContact"}), "copies": len(records) // 2, "seconds": time.perf_counter() - start}
+
+# ------------------------------------------------ NORMALIZATION ------------------------------------------------ #
+
+# Country code given to the phone numbers written in national format, and the prefix they start with in that format
+defaultCountryCode = "33"
+trunkPrefix = "0"
+
+# What an email address must look like once trimmed and lowercased
+emailPattern = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s.]+")
+
+def normalizePhone(phone: str, countryCode: str = None):
+    """
+    Canonicalizes a phone number to E.164, e.g. '06 12 34 56 78' and '0033 6 12 34 56 78' to '+33612345678'.
+
+    Args:
+        phone (str): The phone number as typed, international ('+' or '00') or national.
+        countryCode (str, optional): The country code of the national numbers. Defaults to defaultCountryCode.
+
+    Returns:
+        str: The phone number in E.164, or an empty string for an empty number.
+
+    Raises:
+        ValueError: If the phone number has other characters than digits and separators, or a wrong length.
+    """
+    text = str(phone).strip().replace("(0)", "")
+    if not text:
+        return ""
+    if not re.fullmatch(r"\+?[\d\s().\-/]+", text):
+        raise ValueError(f"Invalid phone number: {phone!r}.")
+    digits = normalizeDigits(text)
+    if text.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith(trunkPrefix):
+        digits = (countryCode or defaultCountryCode) + digits[len(trunkPrefix):]
+    else:
+        digits = (countryCode or defaultCountryCode) + digits
+    # E.164 allows at most 15 digits, country code included
+    if not 8 <= len(digits) <= 15:
+        raise ValueError(f"Invalid phone number: {phone!r}.")
+    return "+" + digits
+
+def normalizeEmail(email: str):
+    """
+    Trims and lowercases an email address, after checking it looks like one.
+
+    Args:
+        email (str): The email address as typed, possibly a 'mailto:' link.
+
+    Returns:
+        str: The email address, or an empty string for an empty address.
+
+    Raises:
+        ValueError: If the text is not an email address.
+    """
+    text = str(email).strip().lower()
+    if text.startswith("mailto:"):
+        text = text[len("mailto:"):]
+    if text and not emailPattern.fullmatch(text):
+        raise ValueError(f"Invalid email: {email!r}.")
+    return text
+
+def normalizeBirthday(birthday: object):
+    """
+    Canonicalizes a birthday to ISO 8601, 'yyyy-mm-dd', or '--mm-dd' when the year is not known.
+
+    Every format read by parseBirthday is accepted, a two-digit year being taken in the last hundred years.
+
+    Args:
+        birthday (object): The birthday as typed, or a date.
+
+    Returns:
+        str: The birthday in ISO 8601, or an empty string for an empty birthday.
+
+    Raises:
+        ValueError: If the birthday cannot be read, or is not a real date.
+    """
+    if isinstance(birthday, date):
+        return birthday.isoformat()
+    text = str(birthday).strip()
+    if not text:
+        return ""
+    monthDay = parseBirthday(text)
+    if monthDay is None:
+        raise ValueError(f"Invalid birthday: {birthday!r}.")
+
+    if text.startswith("--"):
+        return "--%02d-%02d" % monthDay
+    match = re.match(r"(\d{4})-?\d{2}-?\d{2}", text) or re.search(r"(?<!\d)(\d{4})(?!\d)", text)
+    if match:
+        year = int(match.group(1))
+    else:
+        match = re.fullmatch(r"\d{1,2}[/\- .]+\d{1,2}[/\- .]+(\d{2})", text)
+        if not match:
+            return "--%02d-%02d" % monthDay
+        year = 2000 + int(match.group(1))
+        if year > date.today().year:
+            year -= 100
+    try:
+        return date(year, *monthDay).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid birthday: {birthday!r}.") from None
+
+def normalizeAddress(address: str):
+    """
+    Trims an address and collapses its spaces and line breaks into single spaces.
+
+    Args:
+        address (str): The address as typed.
+
+    Returns:
+        str: The address on one line.
+    """
+    return re.sub(r" ,", ",", " ".join(str(address).split()))
+
+# The normalization of each contact field that has a canonical form
+fieldNormalizers = {"phone": normalizePhone, "email": normalizeEmail, "birthday": normalizeBirthday, "address": normalizeAddress}
+
+def normalizeFields(fields: dict, strict: bool = True, countryCode: str = None):
+    """
+    Normalizes the phone, email, birthday and address among contact fields, see fieldNormalizers.
+
+    Args:
+        fields (dict): The contact fields by name, see contactFieldNames, the missing or None ones being left alone.
+        strict (bool, optional): Whether an invalid value raises ValueError rather than being kept as it is. Defaults to True.
+        countryCode (str, optional): The country code of the national phone numbers. Defaults to defaultCountryCode.
+
+    Returns:
+        tuple: The normalized fields and the names of the fields whose invalid value was kept.
+
+    Raises:
+        ValueError: If a value is invalid, or is not text, and strict is True.
+    """
+    normalized = dict(fields)
+    invalid = []
+    for name in contactFieldNames[:8]:
+        value = fields.get(name)
+        if value is not None and not isinstance(value, str):
+            if strict:
+                raise ValueError(f"The {name} must be text, not {type(value).__name__}.")
+            invalid.append(name)
+    for name, normalizer in fieldNormalizers.items():
+        value = fields.get(name)
+        if value is None or name in invalid:
+            continue
+        try:
+            normalized[name] = normalizer(value, countryCode) if normalizer is normalizePhone else normalizer(value)
+        except ValueError:
+            if strict:
+                raise
+            invalid.append(name)
+    return normalized, invalid
+
+def normalizeChunk(items: list, countryCode: str = None):
+    """
+    Normalizes the fields of existing contacts, meant to run in a worker process, see normalizePhoneBook.
+
+    Args:
+        items (list): The (directory position, contact position, contact values) of the contacts, see contactRecord.
+        countryCode (str, optional): The country code of the national phone numbers. Defaults to defaultCountryCode.
+
+    Returns:
+        tuple: The (directory position, contact position, normalized values) of the contacts that changed, and the
+            number of invalid values kept as they were.
+    """
+    changed = []
+    invalid = 0
+    for directoryIndex, contactIndex, values in items:
+        fields, invalidNames = normalizeFields(dict(zip(contactFieldNames, values)), False, countryCode)
+        invalid += len(invalidNames)
+        normalized = tuple(fields[name] for name in contactFieldNames)
+        if normalized != values:
+            changed.append((directoryIndex, contactIndex, normalized))
+    return changed, invalid
+
+def mapChunks(function: object, chunks: object, processes: int, *arguments):
+    """
+    Lazily calls a function on each chunk, optionally spreading the chunks over worker processes.
+
+    At most two chunks per process are in flight, so the memory used does not depend on the number of chunks.
+
+    Args:
+        function (callable): A module-level function, called with a chunk followed by the other arguments.
+        chunks (iterable): The chunks.
+        processes (int): The number of worker processes, 0 to call the function in this process.
+        *arguments: The other arguments of the function.
+
+    Yields:
+        object: The result of each chunk, in the order of the chunks.
+    """
+    if not processes:
+        for chunk in chunks:
+            yield function(chunk, *arguments)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(processes) as executor:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(executor.submit(function, chunk, *arguments))
+            if len(pending) >= processes * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def normalizePhoneBook(store: object, processes: int = 0, chunkSize: int = 5000, countryCode: str = None, dryRun: bool = False):
+    """
+    Normalizes the phone, email, birthday and address of every existing contact, see normalizeFields.
+
+    The contacts are normalized in chunks, optionally spread over worker processes, and the changed ones written back
+    in batches. Invalid values are kept as they are, and the update date of the contacts is left alone.
+
+    Args:
+        store (PhoneStore): The store holding the phone book.
+        processes (int, optional): The number of worker processes, 0 for none. Defaults to 0.
+        chunkSize (int, optional): The number of contacts normalized and written at once. Defaults to 5000.
+        countryCode (str, optional): The country code of the national phone numbers. Defaults to defaultCountryCode.
+        dryRun (bool, optional): Whether to only count the contacts that would change. Defaults to False.
+
+    Returns:
+        dict: The number of contacts checked, normalized and of invalid values, the seconds taken and the contacts per second.
+    """
+    start = time.perf_counter()
+    myPhone = store.load()
+    # A contact shared by several directories is normalized once, editing it in one edits it in all
+    items = ((directoryIndex, contactIndex, contactRecord(contact)) for directoryIndex, directory in enumerate(myPhone) for contactIndex, contact in enumerate(directory.contacts) if contact.contactDirectories is None or contact.contactDirectory is directory)
+    chunks = iter(lambda: list(itertools.islice(items, chunkSize)), [])
+    count = sum(map(Directory.contactCount, myPhone))
+    normalized = invalid = 0
+
+    for changed, chunkInvalid in mapChunks(normalizeChunk, chunks, processes, countryCode):
+        normalized += len(changed)
+        invalid += chunkInvalid
+        if changed and not dryRun:
+            store.apply([("editContact", directoryIndex, contactIndex, values) for directoryIndex, contactIndex, values in changed])
+
+    seconds = time.perf_counter() - start
+    return {"contacts": count, "normalized": normalized, "invalid": invalid, "seconds": seconds, "perSecond": count / seconds if seconds else 0.0}
+
+# ------------------------------------------ DATA SAVING AND LOADING ------------------------------------------- #
+
+# Every journal record is prefixed by its length and its CRC32 so a torn write at the end of the file is detected
+journalHeader = struct.Struct('>II')
+
+# Size in bytes after which the active journal segment is folded back into the snapshot
+journalCompactSize = 1 << 20
+
+# Every snapshot file starts with a magic number, then the length and the CRC32 of the pickled content
+snapshotHeader = struct.Struct('>4sII')
+snapshotMagic = b"CHS1"
+
+# How hard a snapshot write waits for the disk: 'none' leaves it to the system, 'file' flushes each file before it is
+# renamed into place, and 'full' also flushes the folder so the rename itself survives a power loss
+snapshotDurability = "full"
+durabilityModes = ("none", "file", "full")
+
+# Number of snapshots kept, the newest one first, to fall back to when the newest ones are corrupted
+snapshotGenerations = 3
+
+class CorruptSnapshotError(ValueError):
+    """
+    Raised when a snapshot file does not match its checksum, or cannot be unpickled.
+    """
+
+def journalPath(path: str, segment: int):
+    """
+    Returns the path of a journal segment belonging to the given snapshot file.
+
+    Args:
+        path (str): The snapshot file, e.g. 'myPhone.pkl'.
+        segment (int): The number of the journal segment.
+
+    Returns:
+        str: The path of the journal segment, e.g. 'myPhone.journal.3'.
+    """
+    return f"{os.path.splitext(path)[0]}.journal.{segment}"
+
+def shardFolder(path: str):
+    """
+    Returns the folder holding the directory shards of the given snapshot file.
+
+    Args:
+        path (str): The snapshot file, e.g. 'myPhone.pkl'.
+
+    Returns:
+        str: The shard folder, e.g. 'myPhone.shards'.
+    """
+    return f"{os.path.splitext(path)[0]}.shards"
+
+def lockPath(path: str, purpose: str = "write"):
+    """
+    Returns the path of a lock file belonging to the given snapshot file.
+
+    Args:
+        path (str): The snapshot file, e.g. 'myPhone.pkl'.
+        purpose (str, optional): What the lock protects, 'write' or 'compact'. Defaults to 'write'.
+
+    Returns:
+        str: The path of the lock file, e.g. 'myPhone.write.lock'.
+    """
+    return f"{os.path.splitext(path)[0]}.{purpose}.lock"
+
+def journalSegments(path: str):
+    """
+    Lists the numbers of the journal segments existing next to the given snapshot file.
+
+    Args:
+        path (str): The snapshot file.
+
+    Returns:
+        list: The segment numbers sorted in ascending order.
+    """
+    folder = os.path.dirname(path) or "."
+    prefix = os.path.basename(journalPath(path, ""))
+    segments = []
+    for name in os.listdir(folder):
+        if name.startswith(prefix) and name[len(prefix):].isdigit():
+            segments.append(int(name[len(prefix):]))
+    return sorted(segments)
+
+def snapshotPaths(path: str):
+    """
+    Returns the files of the kept snapshot generations, the newest one first.
+
+    Args:
+        path (str): The snapshot file, e.g. 'myPhone.pkl'.
+
+    Returns:
+        list: The generation files, e.g. ['myPhone.pkl', 'myPhone.pkl.1', 'myPhone.pkl.2'].
+    """
+    return [path] + [f"{path}.{generation}" for generation in range(1, snapshotGenerations)]
+
+def syncFolder(folder: str):
+    """
+    Flushes a folder to the disk, so the files renamed or created in it survive a power loss.
+
+    Windows cannot open a folder and flushes its entries along with the files, so nothing is done there.
+
+    Args:
+        folder (str): The folder to flush.
+
+    Returns:
+        None
+    """
+    if os.name != "nt":
+        descriptor = os.open(folder or ".", os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+def writeDurably(path: str, data: bytes, temporary: bool = True):
+    """
+    Writes a file, flushed to the disk as required by snapshotDurability.
+
+    Args:
+        path (str): The file to write.
+        data (bytes): The content of the file.
+        temporary (bool, optional): Whether to write a temporary file renamed over the given one, so readers see either
+            the old or the new file but never a partial one. Defaults to True.
+
+    Returns:
+        None
+    """
+    target = path + ".tmp" if temporary else path
+    with open(target, 'wb') as file:
+        file.write(data)
+        if snapshotDurability != "none":
+            file.flush()
+            os.fsync(file.fileno())
+    if temporary:
+        os.replace(target, path)
+        if snapshotDurability == "full":
+            syncFolder(os.path.dirname(path))
+
+def writeSnapshotFile(path: str, payload: bytes, temporary: bool = True):
+    """
+    Writes a checksummed snapshot file, see writeDurably.
+
+    Args:
+        path (str): The file to write.
+        payload (bytes): The pickled content.
+        temporary (bool, optional): Whether to write a temporary file renamed over the given one. Defaults to True.
+
+    Returns:
+        None
+    """
+    writeDurably(path, snapshotHeader.pack(snapshotMagic, len(payload), zlib.crc32(payload)) + payload, temporary)
+
+def readSnapshotFile(path: str):
+    """
+    Reads a snapshot file and checks its checksum.
+
+    Files written before snapshots were checksummed have no header and are returned whole.
+
+    Args:
+        path (str): The file to read.
+
+    Returns:
+        bytes: The pickled content.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        CorruptSnapshotError: If the file is truncated or does not match its checksum.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if not data.startswith(snapshotMagic):
+        return data
+    if len(data) < snapshotHeader.size:
+        raise CorruptSnapshotError(f"{path} is truncated.")
+    _, length, checksum = snapshotHeader.unpack_from(data)
+    payload = data[snapshotHeader.size:]
+    if len(payload) != length or zlib.crc32(payload) != checksum:
+        raise CorruptSnapshotError(f"{path} does not match its checksum.")
+    return payload
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str):
+        """
+        Finds the classes of the phone book in this module, however it was run when they were pickled.
+
+        Running main.py as a script pickles them as __main__ ones, contacthub.py and the other importers as main ones,
+        and either kind of file must load with the other.
+
+        Args:
+            module (str): The module the class was pickled from.
+            name (str): The name of the class.
+
+        Returns:
+            type: The class.
+        """
+        if module in ("__main__", "main"):
+            module = __name__
+        return super().find_class(module, name)
+
+def unpickleSnapshot(payload: bytes, path: str):
+    """
+    Unpickles the content of a snapshot file, the failures of files written before checksums reported as corruption.
+
+    Args:
+        payload (bytes): The content returned by readSnapshotFile.
+        path (str): The file it was read from, for the error message.
+
+    Returns:
+        object: The unpickled object.
+    """
+    import io
+
+    try:
+        return SnapshotUnpickler(io.BytesIO(payload)).load()
+    except Exception as error:
+        raise CorruptSnapshotError(f"{path} cannot be read: {error}") from error
+
+def readManifest(path: str):
+    """
+    Reads the header of a snapshot file, listing its shards and the last journal segment it contains.
+
+    Args:
+        path (str): The snapshot file.
+
+    Returns:
+        tuple: The header and the directories stored in the file itself by the snapshots written before sharding.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        CorruptSnapshotError: If the file is corrupted.
+    """
+    import io
+
+    file = io.BytesIO(readSnapshotFile(path))
+    try:
+        header = SnapshotUnpickler(file).load()
+        myPhone = []
+        if isinstance(header, list):
+            myPhone = header
+            try:
+                header = SnapshotUnpickler(file).load()
+            except EOFError:
+                header = {"journal": 0}
+    except Exception as error:
+        raise CorruptSnapshotError(f"{path} cannot be read: {error}") from error
+    return header, myPhone
+
+# A directory shard starts with a magic number, its number of contacts and of blocks and the CRC32 of the block table,
+# then for each block its offset, length and CRC32, then the blocks of compressed contacts. A contact is stored as its
+# fields followed by its id, or as its id alone in all but the first directory sharing it, see saveData.
+blockHeader = struct.Struct('>4sIII')
+blockEntry = struct.Struct('>QII')
+blockMagic = b"CHB1"
+
+# Number of contacts compressed together, the unit decoded when a page of a directory is shown
+contactBlockSize = 256
+
+# Number of the last decoded blocks of each directory kept, so a page shown again is made of the same contacts and
+# their cards are found in renderCache, which knows contacts by identity
+decodedBlockCount = 4
+
+def writeBlockShard(path: str, contacts: list, directory: object = None, owners: dict = None):
+    """
+    Writes the contacts of a directory into a new shard of compressed blocks, see ContactBlocks.
+
+    Args:
+        path (str): The shard to write, a fresh name no snapshot lists yet.
+        contacts (list): The contacts of the directory.
+        directory (Directory, optional): The directory, needed with owners.
+        owners (dict, optional): The directory storing each shared contact, the others only storing its id. Defaults
+            to storing every contact.
+
+    Returns:
+        None
+    """
+    blocks = []
+    for start in range(0, len(contacts), contactBlockSize):
+        records = [(contact.contactId,) if owners and contact.contactDirectories is not None and owners[contact] is not directory else (*contactRecord(contact), contact.contactId) for contact in contacts[start:start + contactBlockSize]]
+        blocks.append(zlib.compress(pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL), 1))
+    table = []
+    offset = blockHeader.size + len(blocks) * blockEntry.size
+    for block in blocks:
+        table.append(blockEntry.pack(offset, len(block), zlib.crc32(block)))
+        offset += len(block)
+    table = b"".join(table)
+    writeDurably(path, blockHeader.pack(blockMagic, len(contacts), len(blocks), zlib.crc32(table)) + table + b"".join(blocks), temporary=False)
+
+class ContactBlocks:
+    def __init__(self, path: str):
+        """
+        Opens the shard of a directory through mmap, decoding nothing but its block table.
+
+        The file is mapped right away, so a compaction removing it afterwards does not matter, and only the pages of
+        the blocks actually decoded are read from the disk.
+
+        Args:
+            path (str): The shard, see writeBlockShard.
+
+        Raises:
+            FileNotFoundError: If the shard does not exist.
+            CorruptSnapshotError: If the shard is truncated or its block table does not match its checksum.
+        """
+        import mmap
+
+        self.path = path
+        with open(path, 'rb') as file:
+            try:
+                self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:
+                raise CorruptSnapshotError(f"{path} is empty.") from error
+        if len(self.data) < blockHeader.size:
+            raise CorruptSnapshotError(f"{path} is truncated.")
+        magic, self.count, blocks, checksum = blockHeader.unpack_from(self.data)
+        table = self.data[blockHeader.size:blockHeader.size + blocks * blockEntry.size]
+        if magic != blockMagic or len(table) != blocks * blockEntry.size or zlib.crc32(table) != checksum:
+            raise CorruptSnapshotError(f"{path} does not match its checksum.")
+        self.blocks = [blockEntry.unpack_from(table, offset) for offset in range(0, len(table), blockEntry.size)]
+        # The contacts of the last blocks decoded, by block number, see blockContacts
+        self.decoded = collections.OrderedDict()
+
+    def records(self, number: int):
+        """
+        Decodes one block.
+
+        Args:
+            number (int): The position of the block in the shard.
+
+        Returns:
+            list: The records of the contacts of the block, see contactRecord.
+
+        Raises:
+            CorruptSnapshotError: If the block does not match its checksum.
+        """
+        offset, length, checksum = self.blocks[number]
+        block = self.data[offset:offset + length]
+        if len(block) != length or zlib.crc32(block) != checksum:
+            raise CorruptSnapshotError(f"Block {number} of {self.path} does not match its checksum.")
+        return pickle.loads(zlib.decompress(block))
+
+    def blockContacts(self, number: int, directory: object, shared: dict = None):
+        """
+        Returns the contacts of one block, decoding it unless it is among the last blocks decoded, see decodedBlockCount.
+
+        Args:
+            number (int): The position of the block in the shard.
+            directory (Directory): The directory the contacts belong to.
+            shared (dict, optional): See contacts. The contacts are always decoded again when given.
+
+        Returns:
+            list: The contacts of the block.
+
+        Raises:
+            CorruptSnapshotError: If the block does not match its checksum, or a contact stored by id was not decoded before.
+        """
+        directoryContacts = self.decoded.get(number) if shared is None else None
+        if directoryContacts is not None and directoryContacts[0] is directory:
+            self.decoded.move_to_end(number)
+            return directoryContacts[1]
+        contacts = []
+        first = number * contactBlockSize
+        for position, record in enumerate(self.records(number), start=first):
+            if len(record) == 1:
+                contact = shared.get(record[0]) if shared is not None else None
+                if contact is None:
+                    raise CorruptSnapshotError(f"Contact {position} of {self.path} is shared with a directory that was not decoded.")
+                Contact.join(contact, directory)
+            else:
+                # Records written before contacts had an id are told by their length
+                contact = Contact(*record[:10], directory, record[10] if len(record) > 10 else derivedContactId(os.path.basename(self.path), position))
+                if shared is not None:
+                    shared[contact.contactId] = contact
+            contacts.append(contact)
+        if shared is None:
+            self.decoded[number] = (directory, contacts)
+            if len(self.decoded) > decodedBlockCount:
+                self.decoded.popitem(last=False)
+        return contacts
+
+    def contacts(self, directory: object, start: int = 0, stop: int = None, shared: dict = None):
+        """
+        Decodes the contacts between two positions, reading only the blocks holding them.
+
+        Args:
+            directory (Directory): The directory the contacts belong to.
+            start (int, optional): The position of the first contact. Defaults to 0.
+            stop (int, optional): The position after the last contact. Defaults to the end of the directory.
+            shared (dict, optional): The contacts decoded from the previous directories by id, the contacts of this one
+                being added, to resolve the contacts stored by id only. Defaults to none being expected.
+
+        Returns:
+            list: The contacts between start and stop.
+
+        Raises:
+            CorruptSnapshotError: If a contact stored by id was not decoded before.
+        """
+        start, stop, _ = slice(start, stop).indices(self.count)
+        contacts = []
+        for number in range(start // contactBlockSize, -(-stop // contactBlockSize)):
+            first = number * contactBlockSize
+            contacts.extend(self.blockContacts(number, directory, shared)[max(0, start - first):stop - first])
+        return contacts
+
+def contactRecord(contact: object):
+    """
+    Returns the fields of a contact as a compact tuple, without its directory.
+
+    Args:
+        contact (Contact): The contact to serialize.
+
+    Returns:
+        tuple: The nickname, phone, first name, last name, email, notes, birthday, address, creation and update dates.
+    """
+    return (contact.contactNickname, contact.contactPhone, contact.contactFirstName, contact.contactLastName, contact.contactEmail, contact.contactNotes, contact.contactBirthday, contact.contactAddress, contact.contactCreatedAt, contact.contactUpdatedAt)
+
+def applyRecord(myPhone: list, record: tuple, cache: bool = True):
+    """
+    Applies one journal record to the directories.
+
+    Contacts are given by their position in their directory. A linkContact record, the position of a directory, a
+    position in it, and the positions of a directory and of one of its contacts, puts the contact in the first
+    directory too, shared rather than copied: editing it changes it in both, and deleting it from one leaves it in the
+    other.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        record (tuple): The operation name followed by its arguments.
+        cache (bool, optional): Whether to drop the rendered cards of what is removed, False for a private copy whose
+            cards were never rendered. Defaults to True.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If a contact is linked to a directory already holding it.
+    """
+    operation = record[0]
+    if operation == "createDirectory":
+        myPhone.append(Directory(record[1], record[2], record[3], []))
+    elif operation == "editDirectory":
+        directory = myPhone[record[1]]
+        directory.directoryName = record[2]
+        directory.directoryUpdatedAt = record[3]
+        Directory.touch(directory)
+    elif operation == "deleteDirectory":
+        directory = myPhone.pop(record[1])
+        Directory.release(directory)
+        if cache:
+            renderCache.discard(directory)
+    elif operation == "deleteAllDirectories":
+        myPhone.clear()
+        if cache:
+            renderCache.clear()
+    elif operation == "createContact":
+        directory = myPhone[record[1]]
+        # Records written before contacts had an id get the same one in every process replaying them
+        contactId = record[3] if len(record) > 3 else derivedContactId(record, len(directory.contacts))
+        directory.contacts.append(Contact(*record[2], directory, contactId))
+        Directory.touch(directory)
+    elif operation == "editContact":
+        directory = myPhone[record[1]]
+        previous = directory.contacts[record[2]]
+        if cache:
+            Contact.uncache(previous)
+        Contact.replace(previous, Contact(*record[3], directory, previous.contactId), directory, record[2])
+    elif operation == "deleteContact":
+        directory = myPhone[record[1]]
+        contact = directory.contacts.pop(record[2])
+        Contact.leave(contact, directory)
+        if cache:
+            Contact.uncache(contact)
+        Directory.touch(directory)
+    elif operation == "linkContact":
+        directory = myPhone[record[1]]
+        contact = myPhone[record[3]].contacts[record[4]]
+        if Contact.isIn(contact, directory):
+            raise ValueError(f"The contact {contact.contactNickname!r} is already in the directory {directory.directoryName!r}.")
+        directory.contacts.insert(record[2], contact)
+        Contact.join(contact, directory)
+        Contact.touch(contact)
+    else:
+        raise ValueError(f"Unknown journal operation: {operation}")
+
+def removedBy(myPhone: list, record: tuple):
+    """
+    Returns the object a record is about to remove or replace, before it is applied.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        record (tuple): The operation name followed by its arguments.
+
+    Returns:
+        object: The replaced or deleted contact, the deleted directory, the name of a renamed directory, or None.
+    """
+    operation = record[0]
+    if operation in ("editContact", "deleteContact"):
+        return myPhone[record[1]].contacts[record[2]]
+    if operation == "deleteDirectory":
+        return myPhone[record[1]]
+    if operation == "editDirectory":
+        return myPhone[record[1]].directoryName
+    return None
+
+def readJournal(path: str, start: int = 0):
+    """
+    Reads every complete record of a journal segment.
+
+    Reading stops at the first truncated or corrupted record, which is what a crash in the middle of an append leaves
+    behind, and also what a reader sees of an append still in progress in another process.
+
+    Args:
+        path (str): The journal segment to read.
+        start (int, optional): The offset of the first record to read. Defaults to the beginning of the segment.
+
+    Returns:
+        tuple: The list of records and the offset of the end of the last valid record.
+
+    Raises:
+        FileNotFoundError: If the segment does not exist, or was folded into the snapshot and removed.
+    """
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read()
+
+    records = []
+    offset = 0
+    while offset + journalHeader.size <= len(data):
+        length, checksum = journalHeader.unpack_from(data, offset)
+        begin = offset + journalHeader.size
+        payload = data[begin:begin + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            break
+        records.append(pickle.loads(payload))
+        offset = begin + length
+    return records, start + offset
+
+def journalEntry(record: tuple):
+    """
+    Returns the bytes of one journal record, header included.
+
+    Args:
+        record (tuple): The operation name followed by its arguments.
+
+    Returns:
+        bytes: The length, the CRC32 and the pickled record.
+    """
+    payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+    return journalHeader.pack(len(payload), zlib.crc32(payload)) + payload
+
+def appendJournal(file: object, records: list):
+    """
+    Appends records to an open journal segment in a single write.
+
+    Args:
+        file (file): The journal segment opened in binary append mode.
+        records (list): The records, each one an operation name followed by its arguments.
+
+    Returns:
+        None
+    """
+    file.write(b"".join(journalEntry(record) for record in records))
+    file.flush()
+
+def saveData(myPhone: list, path: str = 'myPhone.pkl', segment: int = None, shards: dict = None, epoch: int = None):
+    """
+    Save the directories with their contacts into a pickle snapshot.
+
+    The contacts of each directory are written in compressed blocks to a shard file of their own, see ContactBlocks,
+    and the snapshot itself only holds the name and dates of the directories and their shards in order, so listing the
+    directories decodes no contact. A directory whose version did not change since it was last loaded or saved, or
+    whose contacts were never decoded, keeps its shard and is not serialized again. A contact shared by several
+    directories is stored once, by the first of them, the others only storing its id, and the snapshot lists the
+    directories sharing contacts so they are decoded together when loaded, see loadSnapshot.
+    Shards are never overwritten and the snapshot is written to a temporary file and renamed, each file carrying the
+    checksum of its content, so a crash never leaves a half-written snapshot behind. The previous snapshot is kept as a
+    generation to fall back to, see snapshotGenerations. It remembers the last journal segment it contains, and the
+    segments and shards no kept generation needs any more are removed.
+
+    Args:
+        myPhone (list): The directories with their contacts to be saved.
+        path (str, optional): The pickle file to write. Defaults to 'myPhone.pkl'.
+        segment (int, optional): The last journal segment contained in the snapshot. Defaults to every existing segment.
+        shards (dict, optional): The (version, shard name) of each directory as last loaded or saved, updated in place.
+            Defaults to writing every directory.
+        epoch (int, optional): The epoch of the snapshot, kept when the journal is only folded into it. Defaults to the
+            epoch following the current one, telling the other processes the content was replaced.
+
+    Returns:
+        int: The epoch of the written snapshot.
+    """
+    if segment is None:
+        segment = max(journalSegments(path), default=0)
+    if shards is None:
+        shards = {}
+
+    try:
+        current, _ = readManifest(path)
+        previous = readSnapshotFile(path)
+    except (FileNotFoundError, CorruptSnapshotError):
+        # A corrupted snapshot is replaced without pushing a good generation out
+        current, previous = {}, None
+    if epoch is None:
+        epoch = current.get("epoch", 0) + 1
+
+    folder = shardFolder(path)
+    os.makedirs(folder, exist_ok=True)
+    existing = set(os.listdir(folder))
+    number = max((int(os.path.splitext(name)[0]) for name in existing if os.path.splitext(name)[0].isdigit()), default=0)
+    # Contacts still in their blocks are shared with no other directory, they were decoded with them otherwise
+    owners, sharing = {}, []
+    for position, directory in enumerate(myPhone):
+        if "contacts" in vars(directory) and any(contact.contactDirectories is not None for contact in directory.contacts):
+            sharing.append(position)
+            for contact in directory.contacts:
+                if contact.contactDirectories is not None:
+                    owners.setdefault(contact, directory)
+    saved = {}
+    for directory in myPhone:
+        version, name = shards.get(directory, (None, None))
+        # Contacts still in their blocks cannot have changed, only the name or dates kept in the snapshot itself
+        unchanged = version == directory.directoryVersion or "contacts" not in vars(directory)
+        if not unchanged or name not in existing:
+            number += 1
+            name = f"{number}.blk"
+            # A fresh name is never read before the snapshot listing it exists, no temporary file is needed
+            writeBlockShard(os.path.join(folder, name), directory.contacts, directory, owners)
+        saved[directory] = (directory.directoryVersion, name)
+    if snapshotDurability == "full":
+        syncFolder(folder)
+    if segment and not os.path.exists(journalPath(path, segment)):
+        # An older generation falling back past this snapshot replays every segment after its own, even empty ones
+        open(journalPath(path, segment), 'ab').close()
+
+    generations = snapshotPaths(path)
+    if previous is not None and len(generations) > 1:
+        for generation in range(len(generations) - 1, 1, -1):
+            if os.path.exists(generations[generation - 1]):
+                os.replace(generations[generation - 1], generations[generation])
+        writeSnapshotFile(generations[1], previous)
+    directories = [(directory.directoryName, directory.directoryCreatedAt, directory.directoryUpdatedAt) for directory in myPhone]
+    writeSnapshotFile(path, pickle.dumps({"directories": directories, "shards": [saved[directory][1] for directory in myPhone], "sharing": sharing, "journal": segment, "epoch": epoch}))
+    shards.clear()
+    shards.update(saved)
+
+    needed, oldest = set(), segment
+    for generation in generations:
+        try:
+            header, _ = readManifest(generation)
+        except (FileNotFoundError, CorruptSnapshotError):
+            continue
+        needed.update(header.get("shards", ()))
+        oldest = min(oldest, header["journal"])
+    for name in existing - needed:
+        try:
+            os.remove(os.path.join(folder, name))
+        except PermissionError:
+            # Windows refuses to remove a shard still mapped by a lazily loaded directory, the next save retries
+            pass
+    for covered in journalSegments(path):
+        if covered <= oldest:
+            os.remove(journalPath(path, covered))
+    return epoch
+
+def loadSnapshot(path: str = 'myPhone.pkl', shards: dict = None, info: dict = None):
+    """
+    Load the snapshot part of the data, without replaying the journal.
+
+    The directories are loaded lazily, their contacts being decoded on first use, see Directory.__getattr__. The
+    checksum of the snapshot and of the block table of its shards is checked, and a corrupted snapshot is skipped in
+    favor of the newest good generation, whose journal segments are kept. A corrupted block is only found when it is
+    decoded. The directories sharing contacts are decoded right away, in order, so each shared contact is decoded
+    once from the first of them and found by id from the others. Snapshots written before the contacts were stored
+    in blocks, before the directories were sharded, holding the whole list of directories, before they were
+    checksummed, or before contacts had an id, are still read.
+
+    Args:
+        path (str, optional): The pickle file to read. Defaults to 'myPhone.pkl'.
+        shards (dict, optional): Filled with the (version, shard name) of each loaded directory, see saveData.
+        info (dict, optional): Filled with the 'epoch' of the loaded snapshot, the 'generation' file it was read from
+            and the corrupted generations 'skipped' before it.
+
+    Returns:
+        tuple: The directories and the last journal segment contained in the snapshot.
+
+    Raises:
+        CorruptSnapshotError: If every generation of the snapshot is corrupted.
+    """
+    skipped = []
+    folder = shardFolder(path)
+    for generation in snapshotPaths(path):
+        loaded = {}
+        try:
+            header, myPhone = readManifest(generation)
+            for position, name in enumerate(header.get("shards", ())):
+                # A missing shard is not a corruption but a compaction removing it while we read, see PickleStorage.load
+                if name.endswith(".blk"):
+                    directory = Directory(*header["directories"][position], ContactBlocks(os.path.join(folder, name)))
+                else:
+                    directory = unpickleSnapshot(readSnapshotFile(os.path.join(folder, name)), name)
+                myPhone.append(directory)
+                loaded[directory] = (directory.directoryVersion, name)
+            shared = {}
+            for position in header.get("sharing", ()):
+                directory = myPhone[position]
+                directory.contacts = directory.contactBlocks.contacts(directory, shared=shared)
+        except CorruptSnapshotError:
+            skipped.append(generation)
+            continue
+        except FileNotFoundError as error:
+            if error.filename != generation:
+                raise
+            continue
+        break
+    else:
+        if skipped:
+            raise CorruptSnapshotError(f"Every snapshot generation of {path} is corrupted.")
+        header, myPhone, loaded, generation = {"journal": 0}, [], {}, None
+
+    for position, directory in enumerate(myPhone):
+        # Contacts pickled whole before they had an id, named after their shard or position like those of the blocks
+        if "contacts" in vars(directory) and "contactBlocks" not in vars(directory):
+            origin = loaded.get(directory, (None, position))[1]
+            for index, contact in enumerate(directory.contacts):
+                if contact.contactId is None:
+                    contact.contactId = derivedContactId(origin, index)
+
+    if shards is not None:
+        shards.update(loaded)
+    if info is not None:
+        info.update(epoch=header.get("epoch", 0), generation=generation, skipped=skipped)
+    return myPhone, header["journal"]
+
+def replayJournal(myPhone: list, path: str, base: int):
+    """
+    Replays every journal segment newer than the snapshot onto the directories.
+
+    Args:
+        myPhone (list): The directories loaded from the snapshot.
+        path (str): The snapshot file.
+        base (int): The last journal segment contained in the snapshot.
+
+    Returns:
+        tuple: The last replayed segment and the offset of the end of its last valid record.
+    """
+    last, offset = base, 0
+    for segment in journalSegments(path):
+        if segment <= base:
+            continue
+        if segment != last + 1:
+            # The segments in between were folded into a newer snapshot than the one given
+            raise FileNotFoundError(journalPath(path, last + 1))
+        records, offset = readJournal(journalPath(path, segment))
+        for record in records:
+            applyRecord(myPhone, record)
+        last = segment
+    return last, offset
+
+def loadData(path: str = 'myPhone.pkl'):
+    """
+    Load data from a pickle file.
+
+    This function attempts to open the file 'myPhone.pkl' in read binary mode. If the file is found, it loads the data using the pickle module, replays the journal written since then and returns it. If the file is not found, it initializes an empty list and returns it.
+
+    Args:
+        path (str, optional): The pickle file to read. Defaults to 'myPhone.pkl'.
+
+    Returns:
+        list: The loaded data from the pickle file, or an empty list if the file is not found.
+    """
+    myPhone, base = loadSnapshot(path)
+    replayJournal(myPhone, path, base)
+    return myPhone
+
+def compactJournal(path: str, segment: int):
+    """
+    Folds the journal segments up to the given one into a new snapshot.
+
+    The directories are rebuilt from the files rather than taken from memory, so this can run in a background thread
+    while the application keeps mutating its resident copy. Only the directories the journal touched are written again.
+
+    Args:
+        path (str): The snapshot file.
+        segment (int): The last journal segment to fold into the snapshot.
+
+    Returns:
+        bool: Whether a new snapshot was written, rather than another process having folded the segments already.
+    """
+    shards, info = {}, {}
+    myPhone, base = loadSnapshot(path, shards, info)
+    if base >= segment:
+        return False
+    for covered in journalSegments(path):
+        if base < covered <= segment:
+            for record in readJournal(journalPath(path, covered))[0]:
+                # The copy is private, the cache shared with the application thread is left alone
+                applyRecord(myPhone, record, cache=False)
+    # Folding the journal does not change the content, the epoch stays the same
+    saveData(myPhone, path, segment, shards, info["epoch"])
+    return True
+
+class FileLock:
+    def __init__(self, path: str):
+        """
+        Initializes an advisory lock held on a file, shared by every process opening the same phone book.
+
+        The lock is reentrant within the object and thread, so a method holding it can call another one taking it
+        again, while another thread of the process waits like another process would.
+
+        Args:
+            path (str): The lock file, created if needed.
+        """
+        self.path = path
+        self.file = None
+        self.depth = 0
+        # Held along with the file, so the other threads of the process wait and only the holder touches the depth
+        self.threadLock = threading.RLock()
+
+    def acquire(self):
+        """
+        Waits until no other process, nor another thread, holds the lock, then takes it.
+        """
+        self.threadLock.acquire()
+        try:
+            if self.depth == 0:
+                file = open(self.path, 'a+b')
+                try:
+                    if os.name == "nt":
+                        import msvcrt
+
+                        file.seek(0)
+                        while True:
+                            try:
+                                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                                break
+                            except OSError:
+                                # LK_LOCK only retries for about ten seconds
+                                continue
+                    else:
+                        import fcntl
+
+                        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+                except BaseException:
+                    file.close()
+                    raise
+                self.file = file
+            self.depth += 1
+        except BaseException:
+            self.threadLock.release()
+            raise
+
+    def release(self):
+        """
+        Releases the lock once every acquire was matched.
+        """
+        self.depth -= 1
+        if self.depth == 0:
+            if os.name == "nt":
+                import msvcrt
+
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+        self.threadLock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exception):
+        self.release()
+
+class PickleStorage:
+    # Whether a contact can be shared between directories, see applyRecord
+    sharesContacts = True
+
+    def __init__(self, path: str = 'myPhone.pkl'):
+        """
+        Initializes the storage keeping the directories in a pickle snapshot followed by journal segments.
+
+        Several processes can share the files: writers append to the journal while holding an advisory lock, after
+        reading what the others appended, and readers never take a lock.
+
+        Args:
+            path (str, optional): The pickle snapshot. Defaults to 'myPhone.pkl'.
+        """
+        self.path = path
+        self.segment = 1
+        self.journalOffset = 0
+        self.journal = None
+        self.compaction = None
+        self.knownSnapshots = set()
+        self.epoch = 0
+        self.compactions = 0
+        self.recoveries = 0
+        # The (version, shard name) of the resident directories, so a save only writes the changed ones
+        self.shards = {}
+        self.writeLock = FileLock(lockPath(path))
+        self.compactLock = FileLock(lockPath(path, "compact"))
+
+    def statSignature(self, path: str):
+        """
+        Returns the (inode, mtime, size) signature of a file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def signature(self):
+        """
+        Returns a value that changes whenever another process changes the files.
+
+        It is made of the snapshot, unless its content is already known (loaded or written by us), of the active
+        journal segment, and whether a newer segment was started by another process.
+        """
+        snapshot = self.statSignature(self.path)
+        if snapshot in self.knownSnapshots:
+            snapshot = "known"
+        return (snapshot, self.statSignature(journalPath(self.path, self.segment)), os.path.exists(journalPath(self.path, self.segment + 1)))
+
+    def lock(self):
+        """
+        Returns the lock to hold while reading the changes of the other processes and appending to the journal.
+        """
+        return self.writeLock
+
+    def load(self):
+        """
+        Loads the snapshot and replays the journal segments written since.
+
+        No lock is taken: if a compaction in another process replaced the snapshot and removed what it covers in the
+        meantime, the reading starts over.
+
+        Returns:
+            list: The directories with their contacts.
+        """
+        self.waitCompaction()
+        self.closeJournal()
+        while True:
+            snapshot = self.statSignature(self.path)
+            shards, info = {}, {}
+            try:
+                myPhone, base = loadSnapshot(self.path, shards, info)
+                segment, offset = replayJournal(myPhone, self.path, base)
+            except (FileNotFoundError, IndexError):
+                # What was read belongs to an older snapshot than the one a compaction just put in place
+                if self.statSignature(self.path) == snapshot:
+                    raise
+                continue
+            if self.statSignature(self.path) == snapshot:
+                break
+        self.shards = shards
+        self.knownSnapshots = {snapshot}
+        self.epoch = info["epoch"]
+        self.recoveries += len(info["skipped"])
+        self.segment, self.journalOffset = segment, offset
+        if self.segment == base:
+            self.segment, self.journalOffset = base + 1, 0
+        return myPhone
+
+    def changes(self):
+        """
+        Reads the records other processes appended to the journal since it was last loaded, read or written by us.
+
+        Returns:
+            list: The records to apply to the resident directories, or None if another process saved a new content,
+                or folded records we never read into the snapshot, in which case everything must be loaded again.
+        """
+        snapshot = self.statSignature(self.path)
+        if snapshot not in self.knownSnapshots:
+            try:
+                epoch = readManifest(self.path)[0].get("epoch", 0)
+            except (FileNotFoundError, CorruptSnapshotError):
+                return None
+            if epoch != self.epoch:
+                return None
+            # Only the journal was folded into it, and the segments we did not read yet are kept for the generations
+            self.knownSnapshots.add(snapshot)
+        records = []
+        while True:
+            newer = os.path.exists(journalPath(self.path, self.segment + 1))
+            try:
+                segmentRecords, offset = readJournal(journalPath(self.path, self.segment), self.journalOffset)
+            except FileNotFoundError:
+                # Either nobody wrote to this segment yet, or it was folded along with what we did not read
+                if self.journalOffset or max(journalSegments(self.path), default=0) > self.segment:
+                    return None
+                return records
+            records.extend(segmentRecords)
+            if not newer:
+                self.journalOffset = offset
+                return records
+            # A segment is never appended to once a newer one exists, so this one was read to its end
+            self.closeJournal()
+            self.segment, self.journalOffset = self.segment + 1, 0
+
+    def save(self, myPhone: list):
+        """
+        Rewrites the snapshot, serializing only the directories changed since they were loaded or saved.
+
+        Every existing journal segment is covered by the new snapshot, whose new epoch tells the other processes they
+        have to load everything again, and a new segment is started.
+
+        Args:
+            myPhone (list): The directories with their contacts to be saved.
+
+        Returns:
+            None
+        """
+        self.waitCompaction()
+        self.closeJournal()
+        with self.compactLock, self.writeLock:
+            segment = max(journalSegments(self.path) + [self.segment])
+            self.epoch = saveData(myPhone, self.path, segment, self.shards)
+            self.knownSnapshots.add(self.statSignature(self.path))
+            self.segment, self.journalOffset = segment + 1, 0
+            open(journalPath(self.path, self.segment), 'ab').close()
+
+    def apply(self, record: tuple):
+        """
+        Appends a mutation to the journal, see applyMany.
+
+        Args:
+            record (tuple): The operation name followed by its arguments, see applyRecord.
+
+        Returns:
+            None
+        """
+        self.applyMany([record])
+
+    def applyMany(self, records: list):
+        """
+        Appends mutations to the journal, and starts a background compaction once the segment is large enough.
+
+        The caller is expected to hold the lock and to have applied the changes of the other processes first.
+
+        Args:
+            records (list): The records, each one an operation name followed by its arguments, see applyRecord.
+
+        Returns:
+            None
+        """
+        if not records:
+            # Nothing is written, and the position of the journal would go back to before what the others appended
+            return
+        with self.writeLock:
+            if self.journal is None:
+                self.journal = open(journalPath(self.path, self.segment), 'ab')
+            if os.fstat(self.journal.fileno()).st_size > self.journalOffset:
+                # Drop what a crash may have left after the last complete record, keeping any record we did not read
+                self.journal.truncate(readJournal(journalPath(self.path, self.segment), self.journalOffset)[1])
+            appendJournal(self.journal, records)
+            self.journalOffset = self.journal.tell()
+
+            if self.journalOffset >= journalCompactSize and self.compaction is None:
+                self.closeJournal()
+                self.compaction = threading.Thread(target=self.compact, args=(self.segment,))
+                self.segment, self.journalOffset = self.segment + 1, 0
+                # Start the next segment right away, the other writers switch to it as soon as it exists
+                open(journalPath(self.path, self.segment), 'ab').close()
+                self.compaction.start()
+
+    def compact(self, segment: int):
+        """
+        Folds the journal into the snapshot, meant to run in a background thread.
+
+        Args:
+            segment (int): The last journal segment to fold into the snapshot.
+
+        Returns:
+            None
+        """
+        try:
+            # A lock of its own: the writers keep appending to the next segment in the meantime
+            with timed("compact"), FileLock(lockPath(self.path, "compact")):
+                if compactJournal(self.path, segment):
+                    # Only a snapshot written by us is known to hold nothing the resident copy lacks
+                    self.knownSnapshots.add(self.statSignature(self.path))
+                    self.compactions += 1
+        finally:
+            self.compaction = None
+
+    def waitCompaction(self):
+        """
+        Waits for the running background compaction, if any, to finish.
+        """
+        compaction = self.compaction
+        if compaction is not None:
+            compaction.join()
+
+    def closeJournal(self):
+        """
+        Closes the active journal segment, if it is open.
+        """
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def close(self):
+        """
+        Finishes the background work and releases the open files.
+        """
+        self.waitCompaction()
+        self.closeJournal()
+
+    def stats(self):
+        """
+        Returns the counters specific to this storage.
+        """
+        return {"compactions": self.compactions, "recoveries": self.recoveries}
+
+def sqlValue(value):
+    """
+    Converts a field value to what is stored in SQLite, dates being stored as ISO text.
+    """
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def sqlDate(value):
+    """
+    Converts a date read from SQLite back to a date, leaving free-form values untouched.
+    """
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    return value
+
+class SqliteStorage:
+    # Columns of the contacts table, in the order of contactRecord
+    contactColumns = contactFieldNames
+    # A contact is a row of a single directory, those shared in a pickle phone book are migrated as copies
+    sharesContacts = False
+
+    def __init__(self, path: str = 'myPhone.db'):
+        """
+        Initializes the storage keeping the directories and contacts as rows of a SQLite database.
+
+        Every mutation only touches the rows involved, and the database is opened in WAL mode so readers in other
+        processes are not blocked by a writer.
+
+        Args:
+            path (str, optional): The SQLite database. Defaults to 'myPhone.db'.
+        """
+        import sqlite3
+
+        self.path = path
+        self.writeLock = FileLock(lockPath(path))
+        self.dataVersion = None
+        # The row ids in the order of the positions used by the records, see rowIds
+        self.positions = None
+        self.positionsVersion = None
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS directories (
+                id INTEGER PRIMARY KEY,
+                name TEXT,
+                createdAt TEXT,
+                updatedAt TEXT
+            );
+            CREATE TABLE IF NOT EXISTS contacts (
+                id INTEGER PRIMARY KEY,
+                directoryId INTEGER NOT NULL REFERENCES directories(id) ON DELETE CASCADE,
+                nickname TEXT,
+                phone TEXT,
+                firstName TEXT,
+                lastName TEXT,
+                email TEXT,
+                notes TEXT,
+                birthday TEXT,
+                address TEXT,
+                createdAt TEXT,
+                updatedAt TEXT,
+                uid INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS contactsDirectory ON contacts(directoryId, id);
+            CREATE INDEX IF NOT EXISTS contactsName ON contacts(lastName, firstName);
+            CREATE INDEX IF NOT EXISTS contactsNickname ON contacts(nickname);
+            CREATE INDEX IF NOT EXISTS contactsPhone ON contacts(phone);
+            CREATE INDEX IF NOT EXISTS contactsEmail ON contacts(email);
+        """)
+        if "uid" not in [column[1] for column in self.connection.execute("PRAGMA table_info(contacts)")]:
+            # Databases created before contacts had an id, their contacts get one derived from their row id
+            self.connection.execute("ALTER TABLE contacts ADD COLUMN uid INTEGER")
+
+    def signature(self):
+        """
+        Returns the data version of the database, which changes when another connection commits.
+        """
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def lock(self):
+        """
+        Returns the lock to hold while checking for the changes of the other processes and applying mutations.
+
+        SQLite serializes the transactions by itself, the lock only keeps another process from committing between
+        the check and the mutations.
+        """
+        return self.writeLock
+
+    def changes(self):
+        """
+        Tells whether another process committed since the rows were last loaded.
+
+        Returns:
+            list: No record if nothing changed, or None if everything must be loaded again.
+        """
+        return [] if self.signature() == self.dataVersion else None
+
+    def rowIds(self):
+        """
+        Returns the row id of each directory with the row ids of its contacts, in the order of their positions.
+
+        They are read again only once another connection committed, the mutations made through this one updating
+        them, so finding the rows of a record costs no query whatever its position.
+
+        Returns:
+            list: The (row id, array of contact row ids) of every directory.
+        """
+        import array
+
+        version = self.signature()
+        if self.positions is None or version != self.positionsVersion:
+            directories = {}
+            # Both queries read the same state, unless already within a transaction of this connection
+            begin = not self.connection.in_transaction
+            if begin:
+                self.connection.execute("BEGIN")
+            try:
+                for (directoryId,) in self.connection.execute("SELECT id FROM directories ORDER BY id"):
+                    directories[directoryId] = array.array("q")
+                for directoryId, contactId in self.connection.execute("SELECT directoryId, id FROM contacts ORDER BY directoryId, id"):
+                    directories[directoryId].append(contactId)
+            finally:
+                if begin:
+                    self.connection.execute("COMMIT")
+            self.positions = list(directories.items())
+            self.positionsVersion = version
+        return self.positions
+
+    def directoryId(self, directoryIndex: int):
+        """
+        Returns the row id of the directory at the given position.
+        """
+        positions = self.rowIds()
+        if not 0 <= directoryIndex < len(positions):
+            raise IndexError("directory index out of range")
+        return positions[directoryIndex][0]
+
+    def contactId(self, directoryIndex: int, contactIndex: int):
+        """
+        Returns the row id of the contact at the given position of the directory at the given position.
+        """
+        self.directoryId(directoryIndex)
+        contactIds = self.positions[directoryIndex][1]
+        if not 0 <= contactIndex < len(contactIds):
+            raise IndexError("contact index out of range")
+        return contactIds[contactIndex]
+
+    def contactFromRow(self, row: tuple, directory: object):
+        """
+        Builds a Contact from the columns of a row of the contacts table in the order of contactRecord, followed by its
+        uid and its row id.
+        """
+        return Contact(*row[:8], sqlDate(row[8]), sqlDate(row[9]), directory, row[10] if row[10] is not None else derivedContactId("sqlite", row[11]))
+
+    def load(self):
+        """
+        Loads every directory with its contacts.
+
+        Returns:
+            list: The directories with their contacts.
+        """
+        import array
+
+        myPhone = []
+        directories = {}
+        positions = {}
+        self.dataVersion = self.signature()
+        # Both queries read the same state even if another process commits in between
+        self.connection.execute("BEGIN")
+        try:
+            for directoryId, name, createdAt, updatedAt in self.connection.execute("SELECT id, name, createdAt, updatedAt FROM directories ORDER BY id"):
+                directory = Directory(name, sqlDate(createdAt), sqlDate(updatedAt), [])
+                directories[directoryId] = directory
+                positions[directoryId] = array.array("q")
+                myPhone.append(directory)
+            for row in self.connection.execute(f"SELECT directoryId, {', '.join(self.contactColumns)}, uid, id FROM contacts ORDER BY directoryId, id"):
+                directory = directories[row[0]]
+                directory.contacts.append(self.contactFromRow(row[1:], directory))
+                positions[row[0]].append(row[-1])
+        finally:
+            self.connection.execute("COMMIT")
+        # The rows just read give the positions of the records to come for free
+        self.positions, self.positionsVersion = list(positions.items()), self.dataVersion
+        return myPhone
+
+    def insertDirectory(self, directory: object):
+        """
+        Inserts a directory with its contacts, inside the current transaction.
+        """
+        cursor = self.connection.execute("INSERT INTO directories (name, createdAt, updatedAt) VALUES (?, ?, ?)", (directory.directoryName, sqlValue(directory.directoryCreatedAt), sqlValue(directory.directoryUpdatedAt)))
+        # A contact shared by several directories keeps its id in the first one only
+        self.connection.executemany(f"INSERT INTO contacts (directoryId, {', '.join(self.contactColumns)}, uid) VALUES (?, {', '.join('?' * len(self.contactColumns))}, ?)", ((cursor.lastrowid, *map(sqlValue, contactRecord(contact)), contact.contactId if contact.contactDirectory is directory else None) for contact in directory.contacts))
+
+    def save(self, myPhone: list):
+        """
+        Replaces every row by the given directories.
+
+        Args:
+            myPhone (list): The directories with their contacts to be saved.
+
+        Returns:
+            None
+        """
+        with self.writeLock, self.connection:
+            self.connection.execute("DELETE FROM contacts")
+            self.connection.execute("DELETE FROM directories")
+            for directory in myPhone:
+                self.insertDirectory(directory)
+        self.positions = None
+        self.dataVersion = self.signature()
+
+    def apply(self, record: tuple):
+        """
+        Applies a mutation to the rows it involves, see applyMany.
+
+        Args:
+            record (tuple): The operation name followed by its arguments, see applyRecord.
+
+        Returns:
+            None
+        """
+        self.applyMany([record])
+
+    def applyMany(self, records: list):
+        """
+        Applies mutations to the rows they involve, in a single transaction.
+
+        Args:
+            records (list): The records, each one an operation name followed by its arguments, see applyRecord.
+
+        Returns:
+            None
+        """
+        try:
+            with self.writeLock, self.connection:
+                for record in records:
+                    self.applyRow(record)
+        except BaseException:
+            # The transaction was rolled back, not the positions already updated for it
+            self.positions = None
+            raise
+
+    def applyRow(self, record: tuple):
+        """
+        Applies one mutation to the rows it involves, inside the current transaction.
+        """
+        import array
+
+        operation = record[0]
+        positions = self.rowIds()
+        if operation == "createDirectory":
+            cursor = self.connection.execute("INSERT INTO directories (name, createdAt, updatedAt) VALUES (?, ?, ?)", tuple(map(sqlValue, record[1:4])))
+            positions.append((cursor.lastrowid, array.array("q")))
+        elif operation == "editDirectory":
+            self.connection.execute("UPDATE directories SET name = ?, updatedAt = ? WHERE id = ?", (record[2], sqlValue(record[3]), self.directoryId(record[1])))
+        elif operation == "deleteDirectory":
+            self.connection.execute("DELETE FROM directories WHERE id = ?", (self.directoryId(record[1]),))
+            positions.pop(record[1])
+        elif operation == "deleteAllDirectories":
+            self.connection.execute("DELETE FROM contacts")
+            self.connection.execute("DELETE FROM directories")
+            positions.clear()
+        elif operation == "createContact":
+            cursor = self.connection.execute(f"INSERT INTO contacts (directoryId, {', '.join(self.contactColumns)}, uid) VALUES (?, {', '.join('?' * len(self.contactColumns))}, ?)", (self.directoryId(record[1]), *map(sqlValue, record[2]), record[3] if len(record) > 3 else None))
+            positions[record[1]][1].append(cursor.lastrowid)
+        elif operation == "editContact":
+            contactId = self.contactId(record[1], record[2])
+            self.connection.execute(f"UPDATE contacts SET {', '.join(column + ' = ?' for column in self.contactColumns)} WHERE id = ?", (*map(sqlValue, record[3]), contactId))
+        elif operation == "deleteContact":
+            self.connection.execute("DELETE FROM contacts WHERE id = ?", (self.contactId(record[1], record[2]),))
+            del positions[record[1]][1][record[2]]
+        else:
+            raise ValueError(f"Unknown journal operation: {operation}")
+
+    def listDirectories(self):
+        """
+        Lists the directories with their number of contacts, without loading any contact.
+
+        Returns:
+            list: The (name, creation date, update date, number of contacts) of every directory.
+        """
+        return [(name, sqlDate(createdAt), sqlDate(updatedAt), count) for name, createdAt, updatedAt, count in self.connection.execute("SELECT name, createdAt, updatedAt, (SELECT COUNT(*) FROM contacts WHERE directoryId = directories.id) FROM directories ORDER BY id")]
+
+    def pageContacts(self, directoryIndex: int, offset: int, limit: int):
+        """
+        Loads one page of the contacts of a directory.
+
+        Args:
+            directoryIndex (int): The position of the directory.
+            offset (int): The position of the first contact of the page.
+            limit (int): The maximum number of contacts of the page.
+
+        Returns:
+            list: The contacts of the page.
+        """
+        directoryId = self.directoryId(directoryIndex)
+        contactIds = self.positions[directoryIndex][1][offset:offset + limit]
+        name, createdAt, updatedAt = self.connection.execute("SELECT name, createdAt, updatedAt FROM directories WHERE id = ?", (directoryId,)).fetchone()
+        directory = Directory(name, sqlDate(createdAt), sqlDate(updatedAt), [])
+        if contactIds:
+            # The row ids of the page are known, the index gets there without skipping the contacts before it
+            rows = self.connection.execute(f"SELECT {', '.join(self.contactColumns)}, uid, id FROM contacts WHERE directoryId = ? AND id BETWEEN ? AND ? ORDER BY id", (directoryId, contactIds[0], contactIds[-1]))
+            directory.contacts.extend(self.contactFromRow(row, directory) for row in rows)
+        return directory.contacts
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self.connection.close()
+
+    def stats(self):
+        """
+        Returns the counters specific to this storage.
+        """
+        return {}
+
+def openStorage(path: str):
+    """
+    Opens the storage backend matching the extension of the given file.
+
+    Args:
+        path (str): A '.db', '.sqlite' or '.sqlite3' file for SQLite, anything else for the pickle snapshot and journal.
+
+    Returns:
+        PickleStorage or SqliteStorage: The storage backend.
+    """
+    if os.path.splitext(path)[1] in (".db", ".sqlite", ".sqlite3"):
+        return SqliteStorage(path)
+    return PickleStorage(path)
+
+def migrateToSqlite(picklePath: str = 'myPhone.pkl', databasePath: str = 'myPhone.db'):
+    """
+    Copies an existing pickle phone book, journal included, into a SQLite database.
+
+    Args:
+        picklePath (str, optional): The pickle snapshot to read. Defaults to 'myPhone.pkl'.
+        databasePath (str, optional): The SQLite database to write. Defaults to 'myPhone.db'.
+
+    Returns:
+        int: The number of contacts migrated.
+    """
+    myPhone = loadData(picklePath)
+    storage = SqliteStorage(databasePath)
+    try:
+        storage.save(myPhone)
+    finally:
+        storage.close()
+    return sum(len(directory.contacts) for directory in myPhone)
+
+class ConflictError(ValueError):
+    """
+    Raised when a mutation cannot be persisted because another process changed or removed what it was about.
+    """
+
+def changeOf(myPhone: list, record: tuple, removed: object = None):
+    """
+    Returns the objects involved in a record just applied to the directories, so it can be rebased later on.
+
+    Directories and contacts are followed by identity rather than by position: a contact edited by a journal record is
+    replaced by a new object, so finding the same object again means nobody else touched it.
+
+    Args:
+        myPhone (list): The directories with their contacts, the record already applied.
+        record (tuple): The operation name followed by its arguments, see applyRecord.
+        removed (object, optional): The contact or directory removed or replaced by the record, or the previous name of a
+            renamed directory, if any, see removedBy.
+
+    Returns:
+        tuple: The record, its directory, the contact it replaced or removed or the previous name of the directory, and
+            the contact it created or edited.
+    """
+    operation = record[0]
+    if operation == "createDirectory":
+        return (record, myPhone[-1], None, None)
+    if operation == "editDirectory":
+        return (record, myPhone[record[1]], removed, None)
+    if operation == "deleteDirectory":
+        return (record, removed, None, None)
+    if operation == "createContact":
+        directory = myPhone[record[1]]
+        return (record, directory, None, directory.contacts[-1])
+    if operation == "editContact":
+        directory = myPhone[record[1]]
+        contact = directory.contacts[record[2]]
+        return (record, directory, removed if removed is not None else contact, contact)
+    if operation == "deleteContact":
+        return (record, myPhone[record[1]], removed, None)
+    if operation == "linkContact":
+        directory = myPhone[record[1]]
+        return (record, directory, None, directory.contacts[record[2]])
+    return (record, None, None, None)
+
+def undoChange(myPhone: list, change: tuple):
+    """
+    Puts the directories back in the shape they had before a change, so the records of other processes can be
+    replayed at the positions they were written for. Field values edited in place are left as they are.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        change (tuple): The change to undo, see changeOf.
+
+    Returns:
+        None
+    """
+    (operation, *arguments), directory, previous, current = change
+    if operation == "createDirectory":
+        myPhone.pop()
+    elif operation == "deleteDirectory":
+        myPhone.insert(arguments[0], directory)
+        for contact in directory.contacts if "contacts" in vars(directory) else ():
+            if not Contact.isIn(contact, directory):
+                Contact.join(contact, directory)
+    elif operation == "createContact":
+        directory.contacts.pop()
+    elif operation == "editContact":
+        if previous is not current:
+            Contact.replace(current, previous, directory, arguments[1])
+    elif operation == "deleteContact":
+        directory.contacts.insert(arguments[1], previous)
+        if not Contact.isIn(previous, directory):
+            Contact.join(previous, directory)
+    elif operation == "linkContact":
+        directory.contacts.pop(arguments[1])
+        Contact.leave(current, directory)
+
+def identityIndex(items: list, item: object):
+    """
+    Returns the position of an object in a list, compared by identity, or None if it is not there.
+    """
+    return next((index for index, candidate in enumerate(items) if candidate is item), None)
+
+def rebaseChanges(myPhone: list, changes: list, foreign: list):
+    """
+    Moves changes made on a stale copy of the directories on top of the records other processes appended since.
+
+    The changes are undone, the other records replayed, then the changes made again at the new positions of their
+    directories and contacts. A change conflicts when its directory or contact was removed or replaced in the
+    meantime, when both sides renamed the same directory, or when a deleted directory was changed by someone else,
+    which the version of the directory tells.
+
+    Args:
+        myPhone (list): The directories with their contacts, the changes already applied.
+        changes (list): The changes, see changeOf.
+        foreign (list): The records appended by the other processes.
+
+    Returns:
+        list: The records of the changes, at their new positions.
+
+    Raises:
+        ConflictError: If a change conflicts with the records of the other processes.
+    """
+    if any(change[0][0] == "deleteAllDirectories" for change in changes):
+        raise ConflictError("The phone book was changed by someone else while it was being deleted.")
+    for change in reversed(changes):
+        undoChange(myPhone, change)
+    versions = {change[1]: change[1].directoryVersion for change in changes if change[1] is not None}
+    for record in foreign:
+        applyRecord(myPhone, record)
+
+    records = []
+    for change in changes:
+        (operation, *arguments), directory, previous, current = change
+        if operation == "createDirectory":
+            myPhone.append(directory)
+            records.append(change[0])
+            continue
+        directoryIndex = identityIndex(myPhone, directory)
+        if directoryIndex is None:
+            raise ConflictError(f"The directory {directory.directoryName!r} was deleted by someone else.")
+        if operation == "editDirectory":
+            if directory.directoryName != arguments[1]:
+                raise ConflictError(f"The directory {arguments[1]!r} was renamed by someone else.")
+            records.append((operation, directoryIndex, *arguments[1:]))
+        elif operation == "deleteDirectory":
+            if directory.directoryVersion != versions[directory]:
+                raise ConflictError(f"The directory {directory.directoryName!r} was changed by someone else.")
+            myPhone.pop(directoryIndex)
+            Directory.release(directory)
+            records.append((operation, directoryIndex))
+        elif operation == "createContact":
+            directory.contacts.append(current)
+            records.append((operation, directoryIndex, *arguments[1:]))
+        elif operation == "linkContact":
+            # Linked from any directory still holding the very same contact
+            sources = ((identityIndex(myPhone, source), source) for source in Contact.directories(current) if source is not directory)
+            sourceIndex, source = next(((index, source) for index, source in sources if index is not None), (None, None))
+            contactIndex = None if source is None else identityIndex(source.contacts, current)
+            if contactIndex is None or Contact.isIn(current, directory):
+                raise ConflictError(f"The contact {current.contactNickname!r} was changed, deleted or linked by someone else.")
+            position = min(arguments[1], len(directory.contacts))
+            directory.contacts.insert(position, current)
+            Contact.join(current, directory)
+            Contact.touch(current)
+            records.append((operation, directoryIndex, position, sourceIndex, contactIndex))
+        else:
+            contactIndex = identityIndex(directory.contacts, previous)
+            if contactIndex is None:
+                raise ConflictError(f"The contact {previous.contactNickname!r} was changed or deleted by someone else.")
+            if operation == "editContact":
+                if previous is not current:
+                    Contact.replace(previous, current, directory, contactIndex)
+                records.append((operation, directoryIndex, contactIndex, arguments[2]))
+            else:
+                directory.contacts.pop(contactIndex)
+                Contact.leave(previous, directory)
+                records.append((operation, directoryIndex, contactIndex))
+    return records
+
+def reloadChanges(myPhone: list, changes: list, fresh: list):
+    """
+    Moves changes made on a stale copy of the directories on top of a copy loaded again from the storage, for when the
+    records the other processes wrote since cannot be read one by one, see rebaseChanges.
+
+    Without the records, directories are found again in the new copy by the name they had before the changes and their
+    creation date, and contacts by their id. A change conflicts when its directory cannot be found, or cannot be told
+    apart from another one, when its contact was deleted or edited by someone else, or when a deleted directory no
+    longer holds the same contacts.
+
+    Args:
+        myPhone (list): The stale directories with their contacts, the changes already applied.
+        changes (list): The changes, see changeOf.
+        fresh (list): The directories loaded again, the changes being applied to them.
+
+    Returns:
+        list: The records of the changes, for the new copy.
+
+    Raises:
+        ConflictError: If a change conflicts with what the other processes wrote.
+    """
+    if any(change[0][0] == "deleteAllDirectories" for change in changes):
+        raise ConflictError("The phone book was changed by someone else while it was being deleted.")
+    for change in reversed(changes):
+        undoChange(myPhone, change)
+    names = {}
+    for (operation, *arguments), directory, previous, current in changes:
+        if operation == "editDirectory" and isinstance(previous, str):
+            names.setdefault(directory, previous)
+    keyOf = lambda directory: (names.get(directory, directory.directoryName), directory.directoryCreatedAt)
+    staleKeys = collections.Counter(map(keyOf, myPhone))
+    freshDirectories = {}
+    for directory in fresh:
+        key = (directory.directoryName, directory.directoryCreatedAt)
+        # None tells the directories that cannot be told apart
+        freshDirectories[key] = None if key in freshDirectories else directory
+    matches = {directory: freshDirectories.get(keyOf(directory)) if staleKeys[keyOf(directory)] == 1 else None for directory in myPhone}
+    contactIndex = lambda contacts, contactId: next((index for index, contact in enumerate(contacts) if contact.contactId == contactId), None)
+
+    records = []
+    for change in changes:
+        (operation, *arguments), directory, previous, current = change
+        if operation == "createDirectory":
+            record = change[0]
+        else:
+            match = matches.get(directory)
+            directoryIndex = None if match is None else identityIndex(fresh, match)
+            if directoryIndex is None:
+                raise ConflictError(f"The directory {directory.directoryName!r} was deleted or renamed by someone else.")
+            if operation == "editDirectory":
+                record = (operation, directoryIndex, *arguments[1:])
+            elif operation == "deleteDirectory":
+                if [(contact.contactId, contactRecord(contact)) for contact in match.contacts] != [(contact.contactId, contactRecord(contact)) for contact in directory.contacts]:
+                    raise ConflictError(f"The directory {directory.directoryName!r} was changed by someone else.")
+                record = (operation, directoryIndex)
+            elif operation == "createContact":
+                # The id of the contact is kept, later changes find it by id
+                record = (operation, directoryIndex, arguments[1], current.contactId)
+            elif operation == "linkContact":
+                sources = ((identityIndex(fresh, matches.get(source)), source) for source in Contact.directories(current) if source is not directory)
+                sourceIndex = next((index for index, source in sources if index is not None), None)
+                index = None if sourceIndex is None else contactIndex(fresh[sourceIndex].contacts, current.contactId)
+                if index is None or contactIndex(match.contacts, current.contactId) is not None:
+                    raise ConflictError(f"The contact {current.contactNickname!r} was changed, deleted or linked by someone else.")
+                record = (operation, directoryIndex, min(arguments[1], len(match.contacts)), sourceIndex, index)
+            else:
+                index = contactIndex(match.contacts, previous.contactId)
+                # A contact edited in place has no previous fields to compare with
+                if index is None or (previous is not current and contactRecord(match.contacts[index]) != contactRecord(previous)):
+                    raise ConflictError(f"The contact {previous.contactNickname!r} was changed or deleted by someone else.")
+                record = (operation, directoryIndex, index, *arguments[2:])
+        applyRecord(fresh, record)
+        if operation == "createDirectory":
+            matches[directory] = fresh[-1]
+        records.append(record)
+    return records
+
+class PhoneStore:
+    def __init__(self, path: str = 'myPhone.pkl', storage: object = None):
+        """
+        Initializes a long-lived store that keeps the directories resident in memory.
+
+        Mutations are handed to the storage backend one by one instead of rewriting everything, and the data is only
+        read again when the backend shows that another process changed it, by replaying what that process appended
+        when the backend can tell. Mutations made on a stale copy are rebased on top of the changes of the other
+        processes, see rebaseChanges.
+
+        Args:
+            path (str, optional): The file backing the store, see openStorage. Defaults to 'myPhone.pkl'.
+            storage (object, optional): An already opened storage backend, used instead of the path.
+        """
+        self.storage = storage if storage is not None else openStorage(path)
+        self.myPhone = None
+        self.signature = None
+        self.indexes = {}
+        self.hits = 0
+        self.reloads = 0
+        self.loadTime = 0.0
+        self.records = 0
+        self.refreshes = 0
+        self.rebases = 0
+        self.conflicts = 0
+
+    def load(self):
+        """
+        Returns the resident directories, reloading them only if the backing files changed.
+
+        Returns:
+            list: The directories with their contacts.
+        """
+        signature = self.storage.signature()
+        if self.myPhone is not None and signature == self.signature:
+            self.hits += 1
+            return self.myPhone
+
+        if self.myPhone is not None:
+            with timed("refresh"):
+                foreign = self.storage.changes()
+                if foreign is not None:
+                    for record in foreign:
+                        removed = removedBy(self.myPhone, record)
+                        applyRecord(self.myPhone, record)
+                        for index in self.indexes.values():
+                            index.update(self.myPhone, record, removed)
+            if foreign is not None:
+                self.refreshes += 1
+                self.signature = signature
+                return self.myPhone
+
+        start = time.perf_counter()
+        with timed("load"):
+            self.myPhone = self.storage.load()
+        self.indexes = {}
+        self.loadTime += time.perf_counter() - start
+        self.reloads += 1
+        self.signature = self.storage.signature()
+        return self.myPhone
+
+    def save(self, myPhone: list):
+        """
+        Rewrites the whole phone book and keeps the directories as the resident copy.
+
+        Args:
+            myPhone (list): The directories with their contacts to be saved.
+
+        Returns:
+            None
+        """
+        with timed("save"):
+            self.storage.save(myPhone)
+        self.myPhone = myPhone
+        self.indexes = {}
+        self.signature = self.storage.signature()
+
+    def record(self, record: tuple, removed: object = None):
+        """
+        Persists a mutation already applied to the resident directories.
+
+        Args:
+            record (tuple): The operation name followed by its arguments, see applyRecord.
+            removed (object, optional): The contact or directory removed by the mutation, needed to update the indexes.
+
+        Returns:
+            None
+        """
+        with timed(record[0]):
+            for index in self.indexes.values():
+                index.update(self.myPhone, record, removed)
+        self.commit([changeOf(self.myPhone, record, removed)])
+
+    def apply(self, records: list):
+        """
+        Applies mutations to the resident directories and persists them in a single batch.
+
+        The records are positions in the directories as last returned by load, so they are applied to them as they are
+        and rebased by commit if another process changed the files since.
+
+        Args:
+            records (list): The records, each one an operation name followed by its arguments, see applyRecord.
+
+        Returns:
+            None
+        """
+        self.commit(self.stage(records))
+
+    def stage(self, records: list):
+        """
+        Applies mutations to the resident directories and their indexes, without persisting them.
+
+        Args:
+            records (list): The records, each one an operation name followed by its arguments, see applyRecord.
+
+        Returns:
+            list: The changes to hand to commit, see changeOf.
+
+        Raises:
+            Exception: Whatever a record failing to apply raised, the records applied before it being undone.
+        """
+        myPhone = self.myPhone if self.myPhone is not None else self.load()
+        if not self.storage.sharesContacts and any(record[0] == "linkContact" for record in records):
+            raise ValueError("This storage cannot share a contact between directories, use the pickle storage.")
+        changes = []
+        try:
+            for record in records:
+                if record[0] == "createContact" and len(record) == 3:
+                    # The id is chosen once, so every process replaying the record gives the contact the same one
+                    record = (*record, newContactId())
+                with timed(record[0]):
+                    removed = removedBy(myPhone, record)
+                    applyRecord(myPhone, record)
+                    changes.append(changeOf(myPhone, record, removed))
+                    for index in self.indexes.values():
+                        index.update(myPhone, record, removed)
+        except Exception:
+            for change in reversed(changes):
+                undoChange(myPhone, change)
+            # An index may have been left halfway, they are built again on their next use
+            self.indexes = {}
+            raise
+        return changes
+
+    def commit(self, changes: list):
+        """
+        Persists changes already applied to the resident directories, holding the lock of the storage.
+
+        If other processes persisted records since the resident copy was read, they are replayed first and the changes
+        rebased on top of them. When the storage cannot tell the records, another process having saved, compacted
+        past them or committed to the database, the directories are loaded again and the changes moved onto them, see
+        reloadChanges. On a conflict nothing is persisted and the resident copy is dropped, so the next load reads what
+        the other processes wrote.
+
+        Args:
+            changes (list): The changes, see changeOf.
+
+        Returns:
+            None
+
+        Raises:
+            ConflictError: If the changes conflict with those of another process.
+        """
+        records = [change[0] for change in changes]
+        with timed("commit"), self.storage.lock():
+            foreign = self.storage.changes()
+            if foreign:
+                # The indexes are built again on their next use rather than followed through the rebase
+                self.indexes = {}
+                try:
+                    records = rebaseChanges(self.myPhone, changes, foreign)
+                except ConflictError:
+                    self.myPhone = None
+                    self.conflicts += 1
+                    raise
+                self.rebases += 1
+            elif foreign is None:
+                # What the others wrote is only known from a new copy, the changes are moved onto it
+                self.indexes = {}
+                fresh = self.storage.load()
+                try:
+                    records = reloadChanges(self.myPhone, changes, fresh)
+                except ConflictError:
+                    self.myPhone = None
+                    self.conflicts += 1
+                    raise
+                self.myPhone = fresh
+                self.rebases += 1
+            self.storage.applyMany(records)
+            # Read while still holding the lock, so the next load cannot miss what another process appends right after
+            self.signature = self.storage.signature()
+        self.records += len(records)
+
+    def update(self, buildRecords: object, attempts: int = 3):
+        """
+        Builds records from the current directories and applies them, building them again from what the other
+        processes wrote when they conflict.
+
+        Args:
+            buildRecords (callable): Called with the directories, returns the records to apply.
+            attempts (int, optional): The number of tries before giving up. Defaults to 3.
+
+        Returns:
+            list: The records built by the last attempt.
+
+        Raises:
+            ConflictError: If every attempt conflicted.
+        """
+        for attempt in range(attempts):
+            records = buildRecords(self.load())
+            try:
+                self.apply(records)
+                return records
+            except ConflictError:
+                if attempt == attempts - 1:
+                    raise
+
+    def updateMany(self, builders: list, attempts: int = 3):
+        """
+        Runs several independent updates, see update, persisting their records in a single commit.
+
+        Each builder sees the directories with the records of the previous ones applied. A builder failing, e.g. with
+        ValueError for a contact that does not exist, or whose records fail to apply, only leaves its own records out.
+
+        Args:
+            builders (list): The callables building the records of each update from the directories.
+            attempts (int, optional): The number of tries before giving up. Defaults to 3.
+
+        Returns:
+            list: For each builder, the records it built or the exception it raised.
+
+        Raises:
+            ConflictError: If every attempt conflicted.
+        """
+        for attempt in range(attempts):
+            myPhone = self.load()
+            results, changes = [], []
+            for buildRecords in builders:
+                try:
+                    records = buildRecords(myPhone)
+                    changes.extend(self.stage(records))
+                except Exception as error:
+                    results.append(error)
+                    continue
+                results.append(records)
+            try:
+                if changes:
+                    self.commit(changes)
+                return results
+            except ConflictError:
+                if attempt == attempts - 1:
+                    raise
+
+    def index(self, indexClass: type):
+        """
+        Returns an index over the resident contacts, building it on first use and keeping it up to date afterwards.
+
+        Args:
+            indexClass (type): The class of the index, a subclass of ContactIndex.
+
+        Returns:
+            ContactIndex: The index.
+        """
+        myPhone = self.load()
+        if indexClass not in self.indexes:
+            index = indexClass()
+            with timed("index"):
+                index.build(myPhone)
+            self.indexes[indexClass] = index
+        return self.indexes[indexClass]
+
+    def search(self, query: str, limit: int = None):
+        """
+        Searches the resident contacts, building the search index on first use.
+
+        Args:
+            query (str): A name prefix, a part of an email or address, or a phone number.
+            limit (int, optional): The number of contacts to return. Defaults to all.
+
+        Returns:
+            list: The matching contacts, see SearchIndex.search.
+        """
+        index = self.index(SearchIndex)
+        with timed("search"):
+            return index.search(query, limit)
+
+    def contactById(self, contactId: int):
+        """
+        Returns a resident contact by its id, building the table of the contacts on first use, see ContactTable.
+
+        Args:
+            contactId (int): The id of the contact.
+
+        Returns:
+            Contact: The contact, or None if no contact has this id.
+        """
+        return self.index(ContactTable).contacts.get(contactId)
+
+    def upcomingBirthdays(self, days: int = 14, today: date = None):
+        """
+        Returns the contacts whose birthday is in the coming days, building the birthday index on first use.
+
+        Args:
+            days (int, optional): The number of days to look ahead, today included. Defaults to 14.
+            today (date, optional): The first day of the range. Defaults to today.
+
+        Returns:
+            list: The (next birthday, contact) pairs, the nearest first.
+        """
+        index = self.index(BirthdayIndex)
+        with timed("birthdays"):
+            return index.upcoming(days, today)
+
+    def sortedContacts(self, order: str, directory: object = None, low: object = None, high: object = None, start: int = 0, stop: int = None, reverse: bool = False):
+        """
+        Returns a page of the resident contacts in a sorted view, building the view on first use, see SortedIndex.page.
+
+        Args:
+            order (str): The name of the view, see sortOrders.
+            directory (Directory, optional): The directory to list, all of them if None.
+            low (object, optional): The lowest last name or date. Defaults to no bound.
+            high (object, optional): The highest last name or date, as a prefix. Defaults to no bound.
+            start (int, optional): The position of the first contact within the range. Defaults to 0.
+            stop (int, optional): The position after the last contact within the range. Defaults to the end of the range.
+            reverse (bool, optional): Whether to start from the end of the range. Defaults to False.
+
+        Returns:
+            tuple: The number of contacts in the range, and the contacts of the page.
+
+        Raises:
+            ValueError: If there is no such view.
+        """
+        if order not in sortOrders:
+            raise ValueError(f"Unknown order: {order!r}, expected one of {', '.join(sortOrders)}.")
+        index = self.index(sortOrders[order])
+        with timed("sorted"):
+            return index.page(directory, low, high, start, stop, reverse)
+
+    def close(self):
+        """
+        Closes the storage backend.
+        """
+        self.storage.close()
+
+    def stats(self):
+        """
+        Returns the cache and storage counters of the store.
+
+        Returns:
+            dict: The number of hits, reloads and refreshes, the total load time in seconds, the records persisted, rebased
+                and in conflict, and the storage counters.
+        """
+        return {"hits": self.hits, "reloads": self.reloads, "refreshes": self.refreshes, "loadTime": self.loadTime, "records": self.records, "rebases": self.rebases, "conflicts": self.conflicts, **self.storage.stats()}
+
+# ---------------------------------------------- IMPORT AND EXPORT ---------------------------------------------- #
+
+# File extensions of the supported import and export formats
+fileFormats = {".csv": "csv", ".vcf": "vcard", ".vcard": "vcard", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+def fileFormat(path: str):
+    """
+    Returns the import and export format matching the extension of a file.
+
+    Args:
+        path (str): The file to import or export.
+
+    Returns:
+        str: 'csv', 'vcard' or 'jsonl'.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in fileFormats:
+        raise ValueError(f"Unsupported file format: {extension or path}, use one of {', '.join(fileFormats)}")
+    return fileFormats[extension]
+
+def escapeVCard(value: object):
+    """
+    Escapes a vCard property value.
+    """
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace(",", "\\,").replace(";", "\\;")
+
+def splitVCard(value: str, separator: str = ";"):
+    """
+    Splits a vCard value on the separators that are not escaped, and unescapes every part.
+
+    Args:
+        value (str): The raw property value.
+        separator (str, optional): The separator of the components. Defaults to ';'.
+
+    Returns:
+        list: The unescaped components.
+    """
+    parts = [""]
+    escaped = False
+    for character in value:
+        if escaped:
+            parts[-1] += "\n" if character in "nN" else character
+            escaped = False
+        elif character == "\\":
+            escaped = True
+        elif character == separator:
+            parts.append("")
+        else:
+            parts[-1] += character
+    return parts
+
+def contactToVCard(fields: dict, version: str = "4.0"):
+    """
+    Formats one contact as a vCard.
+
+    Args:
+        fields (dict): The contact fields by name, see contactFieldNames, and its directory.
+        version (str, optional): '3.0' or '4.0'. Defaults to '4.0'.
+
+    Returns:
+        str: The vCard, from BEGIN to END.
+    """
+    fullName = " ".join(str(fields[name]) for name in ("firstName", "lastName") if fields[name]) or str(fields["nickname"])
+    lines = [
+        "BEGIN:VCARD",
+        f"VERSION:{version}",
+        f"FN:{escapeVCard(fullName)}",
+        f"N:{escapeVCard(fields['lastName'])};{escapeVCard(fields['firstName'])};;;",
+        f"NICKNAME:{escapeVCard(fields['nickname'])}",
+        f"TEL;TYPE={'cell' if version == '4.0' else 'CELL'}:{escapeVCard(fields['phone'])}",
+        f"EMAIL:{escapeVCard(fields['email'])}",
+        f"NOTE:{escapeVCard(fields['notes'])}",
+        f"BDAY{';VALUE=text' if version == '4.0' else ''}:{escapeVCard(fields['birthday'])}",
+        f"ADR:;;{escapeVCard(fields['address'])};;;;",
+        f"X-CONTACTHUB-CREATED:{escapeVCard(sqlValue(fields['createdAt']))}",
+        f"REV:{escapeVCard(sqlValue(fields['updatedAt']))}",
+        f"CATEGORIES:{escapeVCard(fields['directory'])}",
+        "END:VCARD",
+    ]
+    return "\r\n".join(lines) + "\r\n"
+
+def vCardToContact(text: str):
+    """
+    Parses one vCard 3.0 or 4.0.
+
+    Args:
+        text (str): The vCard, from BEGIN to END.
+
+    Returns:
+        dict: The contact fields by name, see contactFieldNames, and its directory.
+    """
+    fields = {}
+    # Lines starting with a space or a tab continue the previous one
+    for line in re.sub(r"\r?\n[ \t]", "", text).splitlines():
+        name, _, value = line.partition(":")
+        name = name.split(";")[0].split(".")[-1].upper()
+        if name == "N":
+            parts = splitVCard(value) + ["", ""]
+            fields.setdefault("lastName", parts[0])
+            fields.setdefault("firstName", parts[1])
+        elif name == "FN" and "firstName" not in fields:
+            fields["fullName"] = splitVCard(value)[0]
+        elif name == "ADR":
+            fields.setdefault("address", ", ".join(part for part in splitVCard(value) if part))
+        elif name == "CATEGORIES":
+            fields.setdefault("directory", splitVCard(value, ",")[0])
+        elif name in vCardProperties:
+            fields.setdefault(vCardProperties[name], splitVCard(value)[0])
+    if "firstName" not in fields and "fullName" in fields:
+        fields["firstName"], _, fields["lastName"] = fields["fullName"].partition(" ")
+    return fields
+
+# vCard properties holding a single contact field
+vCardProperties = {"NICKNAME": "nickname", "TEL": "phone", "EMAIL": "email", "NOTE": "notes", "BDAY": "birthday", "X-CONTACTHUB-CREATED": "createdAt", "REV": "updatedAt"}
+
+def readRawRecords(file: object, format: str):
+    """
+    Lazily splits an import file into the raw text of its records, without parsing them.
+
+    Args:
+        file (file): The file opened in text mode.
+        format (str): 'csv', 'vcard' or 'jsonl'.
+
+    Yields:
+        tuple: The number of the line the record starts on, from 1, and the text of the record. For CSV, the first one
+            is the header.
+    """
+    pending = []
+    quotes = 0
+    start = 1
+    for number, line in enumerate(file, start=1):
+        if format == "jsonl":
+            if line.strip():
+                yield number, line
+        elif format == "csv":
+            if not pending:
+                start = number
+            # A record only ends on a line break outside of quotes
+            pending.append(line)
+            quotes += line.count('"')
+            if quotes % 2 == 0:
+                yield start, "".join(pending)
+                pending, quotes = [], 0
+        else:
+            if line.strip().upper() == "BEGIN:VCARD":
+                pending, start = [], number
+            pending.append(line)
+            if line.strip().upper() == "END:VCARD":
+                yield start, "".join(pending)
+    if format == "csv" and pending:
+        yield start, "".join(pending)
+
+def parseRawRecords(format: str, rawRecords: list, header: list = None):
+    """
+    Parses raw records into contact fields, meant to also run in worker processes.
+
+    Args:
+        format (str): 'csv', 'vcard' or 'jsonl'.
+        rawRecords (list): The line numbers and text of the records, see readRawRecords.
+        header (list, optional): The column names of a CSV file.
+
+    Returns:
+        list: The contact fields by name of every record.
+
+    Raises:
+        ValueError: If a JSONL line is not a JSON object, naming the line.
+    """
+    import io
+    import csv
+    import json
+
+    if format == "jsonl":
+        records = []
+        for number, raw in rawRecords:
+            try:
+                fields = json.loads(raw)
+            except ValueError as error:
+                raise ValueError(f"Line {number}: {error}.") from error
+            if not isinstance(fields, dict):
+                raise ValueError(f"Line {number}: expected a JSON object, not {type(fields).__name__}.")
+            records.append(fields)
+        return records
+    if format == "csv":
+        return [dict(zip(header, row)) for row in csv.reader(io.StringIO("".join(raw for _, raw in rawRecords)))]
+    return [vCardToContact(raw) for _, raw in rawRecords]
+
+def recordFields(fields: dict):
+    """
+    Converts parsed contact fields into the values of a contact, see contactRecord.
+
+    Args:
+        fields (dict): The contact fields by name.
+
+    Returns:
+        tuple: The values of the contact, missing dates being today.
+    """
+    values = [str(fields.get(name) or "") for name in contactFieldNames[:8]]
+    for name in contactFieldNames[8:]:
+        values.append(sqlDate(fields.get(name)) or date.today())
+    return tuple(values)
+
+def parsedChunks(path: str, format: str, chunkSize: int, processes: int):
+    """
+    Lazily parses an import file chunk by chunk, optionally spreading the chunks over worker processes.
+
+    At most two chunks per process are in flight, so the memory used does not depend on the size of the file.
+
+    Args:
+        path (str): The file to import.
+        format (str): 'csv', 'vcard' or 'jsonl'.
+        chunkSize (int): The number of records per chunk.
+        processes (int): The number of worker processes, 0 to parse in this process.
+
+    Yields:
+        tuple: The normalized contact fields by name of the records of one chunk, in the order of the file, and the
+            number of invalid values kept as they were, see normalizedRecords.
+    """
+    import csv
+
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        rawRecords = readRawRecords(file, format)
+        header = None
+        if format == "csv":
+            header = next(csv.reader([next(rawRecords, (1, ""))[1]]), [])
+
+        chunks = iter(lambda: list(itertools.islice(rawRecords, chunkSize)), [])
+        yield from mapChunks(normalizedRecords, chunks, processes, format, header)
+
+def normalizedRecords(chunk: list, format: str, header: list):
+    """
+    Parses raw records and normalizes their fields, meant to run in a worker process, see parsedChunks.
+
+    Args:
+        chunk (list): The raw records, see readRawRecords.
+        format (str): 'csv', 'vcard' or 'jsonl'.
+        header (list): The column names of a CSV file.
+
+    Returns:
+        tuple: The normalized contact fields by name of each record, and the number of invalid values kept as they were.
+    """
+    records = []
+    invalid = 0
+    for fields in parseRawRecords(format, chunk, header):
+        fields, invalidNames = normalizeFields(fields, strict=False)
+        records.append(fields)
+        invalid += len(invalidNames)
+    return records, invalid
+
+def importContacts(store: object, path: str, directoryName: str = None, batchSize: int = 5000, processes: int = 0):
+    """
+    Imports the contacts of a CSV, vCard or JSONL file without asking anything.
+
+    The records are streamed from the file, normalized, see normalizeFields, and written to the storage in batches.
+    A contact goes to the directory named in the file (CSV and JSONL 'directory' column, vCard CATEGORIES), else to
+    the given one; missing directories are created. Invalid values are imported as they are and counted.
+
+    Args:
+        store (PhoneStore): The store to import into.
+        path (str): The file to import, its extension gives the format.
+        directoryName (str, optional): The directory of the contacts whose file does not name one. Defaults to 'Imported'.
+        batchSize (int, optional): The number of contacts parsed and written at once. Defaults to 5000.
+        processes (int, optional): The number of worker processes parsing the file, 0 for none. Defaults to 0.
+
+    Returns:
+        dict: The number of contacts imported and of invalid values, the seconds taken and the contacts per second.
+    """
+    start = time.perf_counter()
+    format = fileFormat(path)
+    myPhone = store.load()
+    directories = {directory.directoryName: index for index, directory in reversed(list(enumerate(myPhone)))}
+    count = invalid = 0
+
+    for chunk, chunkInvalid in parsedChunks(path, format, batchSize, processes):
+        invalid += chunkInvalid
+        records = []
+        for fields in chunk:
+            name = str(fields.get("directory") or directoryName or "Imported")
+            if name not in directories:
+                directories[name] = len(myPhone) + sum(record[0] == "createDirectory" for record in records)
+                records.append(("createDirectory", name, date.today(), date.today()))
+            records.append(("createContact", directories[name], recordFields(fields)))
+        store.apply(records)
+        count += len(chunk)
+
+    seconds = time.perf_counter() - start
+    return {"contacts": count, "invalid": invalid, "seconds": seconds, "perSecond": count / seconds if seconds else 0.0}
+
+def contactDict(contact: object, directoryName: str):
+    """
+    Returns the fields of a contact by name, dates as ISO text, with the name of its directory and its id.
+
+    Args:
+        contact (Contact): The contact to convert.
+        directoryName (str): The name of the directory of the contact.
+
+    Returns:
+        dict: The contact fields by name, see contactFieldNames, 'directory' and 'id'.
+    """
+    fields = dict(zip(contactFieldNames, map(sqlValue, contactRecord(contact))))
+    fields["directory"] = directoryName
+    fields["id"] = contact.contactId
+    return fields
+
+def exportContacts(myPhone: list, path: str, vCardVersion: str = "4.0"):
+    """
+    Exports every contact to a CSV, vCard or JSONL file, writing them one by one.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        path (str): The file to write, its extension gives the format.
+        vCardVersion (str, optional): '3.0' or '4.0' for vCard files. Defaults to '4.0'.
+
+    Returns:
+        dict: The number of contacts exported, the seconds taken and the contacts per second.
+    """
+    import csv
+    import json
+
+    start = time.perf_counter()
+    format = fileFormat(path)
+    count = 0
+
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        if format == "csv":
+            writer.writerow((*contactFieldNames, "directory", "id"))
+        for directory in myPhone:
+            for contact in directory.contacts:
+                fields = contactDict(contact, directory.directoryName)
+                if format == "csv":
+                    writer.writerow(fields.values())
+                elif format == "jsonl":
+                    file.write(json.dumps(fields, ensure_ascii=False) + "\n")
+                else:
+                    file.write(contactToVCard(fields, vCardVersion))
+                count += 1
+
+    seconds = time.perf_counter() - start
+    return {"contacts": count, "seconds": seconds, "perSecond": count / seconds if seconds else 0.0}
+
+# ------------------------------------------------- DUPLICATES -------------------------------------------------- #
+
+def nameKey(contact: object):
+    """
+    Returns the sort key of the name of a contact: lowercase words without accents, in alphabetical order.
+
+    'Léa Dupont' and 'dupont lea' get the same key. Contacts without first or last name use their nickname.
+
+    Args:
+        contact (Contact): The contact.
+
+    Returns:
+        str: The name sort key.
+    """
+    import unicodedata
+
+    name = f"{contact.contactFirstName} {contact.contactLastName}".strip() or str(contact.contactNickname)
+    name = unicodedata.normalize("NFKD", name.lower())
+    return " ".join(sorted("".join(character for character in name if not unicodedata.combining(character)).split()))
+
+def phoneKey(contact: object):
+    """
+    Returns the last nine digits of the phone of a contact, so '+33 6 12 34 56 78' and '06 12 34 56 78' match.
+    """
+    return normalizeDigits(contact.contactPhone)[-9:]
+
+def emailKey(contact: object):
+    """
+    Returns the lowercase email of a contact, or an empty string if it does not look like one.
+    """
+    email = str(contact.contactEmail).strip().lower()
+    return email if "@" in email else ""
+
+def contactSimilarity(first: tuple, second: tuple):
+    """
+    Scores how likely two contacts are the same person, from their name, phone and email keys.
+
+    Only the fields known for both contacts count, the name weighing 0.4 and the phone and email 0.3 each.
+
+    Args:
+        first (tuple): The (name, phone, email) keys of the first contact.
+        second (tuple): The (name, phone, email) keys of the second contact.
+
+    Returns:
+        float: The similarity, from 0 to 1.
+    """
+    import difflib
+
+    score = total = 0.0
+    if first[0] and second[0]:
+        score += 0.4 * (1.0 if first[0] == second[0] else difflib.SequenceMatcher(None, first[0], second[0]).ratio())
+        total += 0.4
+    for position in (1, 2):
+        if first[position] and second[position]:
+            score += 0.3 * (first[position] == second[position])
+            total += 0.3
+    return score / total if total else 0.0
+
+def findDuplicates(myPhone: list, threshold: float = 0.85, window: int = 5, maxBlockSize: int = 50):
+    """
+    Finds the groups of contacts that look like the same person, across all directories.
+
+    Contacts are only compared when they share a blocking key: their phone, email or name sort key. Blocks larger than
+    maxBlockSize, such as a very common name, are sorted and each contact is only compared to its next neighbours,
+    so the work grows linearly with the number of contacts instead of quadratically.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        threshold (float, optional): The similarity from which two contacts are duplicates. Defaults to 0.85.
+        window (int, optional): The number of neighbours compared in large blocks. Defaults to 5.
+        maxBlockSize (int, optional): The size from which a block is compared by neighbours only. Defaults to 50.
+
+    Returns:
+        list: The groups of duplicates, each a list of contacts, the most recently updated first.
+    """
+    # A contact shared by several directories is not a duplicate of itself
+    contacts = [contact for directory in myPhone for contact in directory.contacts if contact.contactDirectories is None or contact.contactDirectory is directory]
+    keys = [(nameKey(contact), phoneKey(contact), emailKey(contact)) for contact in contacts]
+
+    blocks = {}
+    for index, (name, phone, email) in enumerate(keys):
+        for block in (("name", name), ("phone", phone), ("email", email)):
+            if block[1]:
+                blocks.setdefault(block, []).append(index)
+
+    # Union-find over the positions of the contacts
+    parents = list(range(len(contacts)))
+
+    def root(index):
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        if len(members) > maxBlockSize:
+            members = sorted(members, key=lambda index: keys[index])
+            pairs = ((members[position], other) for position in range(len(members)) for other in members[position + 1:position + 1 + window])
+        else:
+            pairs = itertools.combinations(members, 2)
+        for first, second in pairs:
+            if root(first) != root(second) and contactSimilarity(keys[first], keys[second]) >= threshold:
+                parents[root(second)] = root(first)
+
+    groups = {}
+    for index, contact in enumerate(contacts):
+        groups.setdefault(root(index), []).append(contact)
+    return [sorted(group, key=lambda contact: str(sqlValue(contact.contactUpdatedAt)), reverse=True) for group in groups.values() if len(group) > 1]
+
+def mergedValues(group: list):
+    """
+    Returns the values of the contact merging a group of duplicates.
+
+    Each field comes from the most recently updated contact that has it, the creation date being the oldest one.
+
+    Args:
+        group (list): The duplicates, the most recently updated first.
+
+    Returns:
+        tuple: The values of the merged contact, see contactRecord.
+    """
+    records = [contactRecord(contact) for contact in group]
+    values = [next((record[position] for record in records if record[position]), "") for position in range(8)]
+    values.append(min((record[8] for record in records), key=lambda value: str(sqlValue(value))))
+    values.append(date.today())
+    return tuple(values)
+
+def mergeRecords(myPhone: list, groups: list):
+    """
+    Returns the records merging every group of duplicates into its most recently updated contact, the others being
+    deleted from every directory sharing them.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        groups (list): The groups of duplicates, see findDuplicates.
+
+    Returns:
+        list: The edits of the kept contacts followed by the deletions of the others, see applyRecord.
+    """
+    positions = {}
+    for directoryIndex, directory in enumerate(myPhone):
+        for contactIndex, contact in enumerate(directory.contacts):
+            positions.setdefault(contact, []).append((directoryIndex, contactIndex))
+
+    edits = []
+    deletions = []
+    for group in groups:
+        edits.append(("editContact", *positions[group[0]][0], mergedValues(group)))
+        deletions.extend(position for contact in group[1:] for position in positions[contact])
+    # Delete from the end so the positions of the remaining contacts do not move
+    return edits + [("deleteContact", *position) for position in sorted(deletions, reverse=True)]
+
+def mergeDuplicates(store: object, threshold: float = 0.85, ask: bool = True):
+    """
+    Finds the duplicate contacts and merges them, asking before each group unless ask is False.
+
+    Args:
+        store (PhoneStore): The store holding the phone book.
+        threshold (float, optional): The similarity from which two contacts are duplicates. Defaults to 0.85.
+        ask (bool, optional): Whether to show each group and ask before merging it. Defaults to True.
+
+    Returns:
+        dict: The number of groups found and merged, of contacts removed, and the seconds taken to find them.
+    """
+    start = time.perf_counter()
+    myPhone = store.load()
+    groups = findDuplicates(myPhone, threshold)
+    seconds = time.perf_counter() - start
+
+    accepted = []
+    for number, group in enumerate(groups, start=1):
+        if ask:
+            Stream(Contact.render(group))
+            answer = Asking(f"Duplicates {number}/{len(groups)}: merge them into the first one? (y: yes, n: no, a: yes to all, q: stop)").strip().lower()
+            if answer == "q":
+                break
+            if answer == "a":
+                ask = False
+            elif answer != "y":
+                continue
+        accepted.append(group)
+
+    if accepted:
+        store.apply(mergeRecords(myPhone, accepted))
+    return {"groups": len(groups), "merged": len(accepted), "removed": sum(len(group) - 1 for group in accepted), "seconds": seconds}
+
+# --------------------------------------------------- SERVER ---------------------------------------------------- #
+
+# Address the server listens on and the client connects to by default, 'host:port' or the path of a Unix socket
+serverAddress = "127.0.0.1:8765"
+
+# Methods of the server that change nothing, which a client may safely send again on a new connection
+serverReadMethods = ("directories", "list", "search", "birthdays", "where", "stats")
+
+def parseAddress(address: str):
+    """
+    Splits a server address into a TCP host and port, or recognizes the path of a Unix socket.
+
+    Args:
+        address (str): 'host:port', ':port' for the local host, or the path of a Unix socket.
+
+    Returns:
+        tuple: The host and the port, or the path and None for a Unix socket.
+    """
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit():
+        return host or "127.0.0.1", int(port)
+    return address, None
+
+class ContactServer:
+    def __init__(self, store: object):
+        """
+        Initializes a server answering requests from the resident directories and indexes of a store.
+
+        Requests and responses are JSON objects, one per line: {"id": 1, "method": "search", "params": {"query":
+        "dupont"}} is answered with {"id": 1, "result": [...]} or {"id": 1, "error": "..."}. A client may send several
+        requests without waiting, the responses coming back as they are ready. Reads are answered by a thread of their
+        own, and the writes received meanwhile are queued and persisted together in a single commit, see
+        PhoneStore.updateMany, made by another thread so that waiting for the lock held by another process does not
+        hold up the reads. The resident directories are only touched by one of them at a time, see commitBatch, and the
+        event loop never waits for either, so connections are accepted and writes queued while a commit is flushed.
+
+        Args:
+            store (PhoneStore): The store holding the phone book.
+        """
+        self.store = store
+        self.server = None
+        self.queue = None
+        self.batcher = None
+        self.reader = None
+        self.writer = None
+        self.mutex = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.writes = 0
+        self.methods = {
+            "directories": self.listDirectories,
+            "list": self.listContacts,
+            "search": self.search,
+            "birthdays": self.birthdays,
+            "where": self.where,
+            "stats": self.stats,
+            "add": self.addContact,
+            "edit": self.editContact,
+            "delete": self.delete,
+            "link": self.link,
+        }
+
+    async def start(self, address: str = serverAddress):
+        """
+        Starts listening, a stale Unix socket left by a previous server being removed.
+
+        Args:
+            address (str, optional): Where to listen, see parseAddress. Port 0 picks a free port. Defaults to serverAddress.
+
+        Returns:
+            str: The address actually listened on.
+        """
+        import stat
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.queue = asyncio.Queue()
+        self.reader = ThreadPoolExecutor(1, thread_name_prefix="contacthub-reader")
+        self.writer = ThreadPoolExecutor(1, thread_name_prefix="contacthub-writer")
+        self.batcher = asyncio.ensure_future(self.writeBatches())
+        host, port = parseAddress(address)
+        if port is None:
+            try:
+                if stat.S_ISSOCK(os.stat(host).st_mode):
+                    os.remove(host)
+            except FileNotFoundError:
+                pass
+            self.server = await asyncio.start_unix_server(self.handle, host)
+            return host
+        self.server = await asyncio.start_server(self.handle, host, port)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"{host}:{port}"
+
+    async def close(self):
+        """
+        Stops listening and writing.
+        """
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher.cancel()
+        # Lets a read or a commit already started finish
+        self.reader.shutdown()
+        self.writer.shutdown()
+
+    async def handle(self, reader: object, writer: object):
+        """
+        Reads the requests of one connection, answering each one in a task of its own.
+
+        Args:
+            reader (asyncio.StreamReader): The requests.
+            writer (asyncio.StreamWriter): Where to write the responses.
+
+        Returns:
+            None
+        """
+        import asyncio
+
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self.respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, line: bytes, writer: object):
+        """
+        Answers one request.
+
+        Args:
+            line (bytes): The request, see ContactServer.
+            writer (asyncio.StreamWriter): Where to write the response.
+
+        Returns:
+            None
+        """
+        import json
+        import asyncio
+
+        self.requests += 1
+        start = time.perf_counter()
+        response = {"id": None}
+        method = None
+        try:
+            request = json.loads(line)
+            response["id"] = request.get("id")
+            method = self.methods.get(request.get("method"))
+            if method is None:
+                raise ValueError(f"Unknown method: {request.get('method')!r}.")
+            if request["method"] in serverReadMethods:
+                result = await asyncio.get_running_loop().run_in_executor(self.reader, self.read, method, request.get("params") or {})
+            else:
+                result = {"records": len(await self.write(method(**(request.get("params") or {}))))}
+            response["result"] = result
+        except Exception as error:
+            response["error"] = str(error)
+        writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+        if metricsEnabled and method is not None:
+            # Timed by hand, the timers of concurrent requests would not nest
+            recordMetric(f"server.{request['method']}", time.perf_counter() - start)
+        await writer.drain()
+
+    async def write(self, buildRecords: object):
+        """
+        Queues an update for the next batch and waits until it is persisted.
+
+        Args:
+            buildRecords (callable): Called with the directories, returns the records to apply, see PhoneStore.update.
+
+        Returns:
+            list: The records persisted.
+        """
+        import asyncio
+
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((buildRecords, future))
+        return await future
+
+    async def writeBatches(self):
+        """
+        Persists the queued updates, all those waiting at once.
+        """
+        import asyncio
+
+        while True:
+            batch = [await self.queue.get()]
+            # Let the requests already received queue their writes too
+            await asyncio.sleep(0)
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(self.writer, self.commitBatch, [buildRecords for buildRecords, _ in batch])
+            except Exception as error:
+                # Failing the whole batch rather than the task, which would leave every later write waiting
+                results = [error] * len(batch)
+            self.batches += 1
+            self.writes += len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    # The client went away before its update was persisted
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def read(self, method: object, params: dict):
+        """
+        Answers a read from the reader thread, once no commit is touching the resident directories.
+
+        A read waits for the commit in progress to be flushed: refreshing the resident copy meanwhile would replay the
+        records being appended as if another process had written them.
+
+        Args:
+            method (callable): The method answering the request.
+            params (dict): Its parameters.
+
+        Returns:
+            object: The result of the method.
+        """
+        with self.mutex:
+            return method(**params)
+
+    def commitBatch(self, builders: list):
+        """
+        Runs updates in a single commit, see PhoneStore.updateMany, from the writer thread.
+
+        The lock of the storage is waited for before taking the resident directories from the reads, which only wait
+        for the updates themselves and not for another process to release the lock.
+
+        Args:
+            builders (list): The callables building the records of each update from the directories.
+
+        Returns:
+            list: For each builder, the records it built or the exception it raised.
+        """
+        with self.store.storage.lock(), self.mutex:
+            return self.store.updateMany(builders)
+
+    def listDirectories(self):
+        """
+        Returns the directories with their number of contacts, without decoding them.
+        """
+        return [{"name": directory.directoryName, "createdAt": sqlValue(directory.directoryCreatedAt), "updatedAt": sqlValue(directory.directoryUpdatedAt), "contacts": Directory.contactCount(directory)} for directory in self.store.load()]
+
+    def listContacts(self, directory: str = None, start: int = 0, stop: int = None, sort: str = None, low: str = None, high: str = None, reverse: bool = False):
+        """
+        Returns the contacts between two positions of a directory, see contactDict, or of a range of a sorted view
+        within one directory or across all of them, see PhoneStore.sortedContacts.
+        """
+        myPhone = self.store.load()
+        found = None
+        if directory is not None:
+            directoryIndex = findDirectory(myPhone, str(directory))
+            if directoryIndex is None:
+                raise ValueError(f"No directory {directory!r}.")
+            found = myPhone[directoryIndex]
+        if sort is not None:
+            contacts = self.store.sortedContacts(sort, found, low, high, start, stop, reverse)[1]
+        elif found is None:
+            raise ValueError("A directory is needed to list contacts without sorting them.")
+        else:
+            contacts = Directory.contactSlice(found, start, stop)
+        return [contactDict(contact, Contact.directoryNames(contact)) for contact in contacts]
+
+    def search(self, query: str, limit: int = None):
+        """
+        Returns the contacts matching a search, see PhoneStore.search, only the first ones when a limit is given.
+        """
+        return [contactDict(contact, Contact.directoryNames(contact)) for contact in self.store.search(query, limit)]
+
+    def birthdays(self, days: int = 14):
+        """
+        Returns the contacts whose birthday is in the coming days, with their next birthday.
+        """
+        return [dict(contactDict(contact, Contact.directoryNames(contact)), nextBirthday=birthday.isoformat()) for birthday, contact in self.store.upcomingBirthdays(days)]
+
+    def where(self, id: int):
+        """
+        Returns the names of the directories holding a contact given by its id.
+        """
+        contact = self.store.contactById(int(id))
+        if contact is None:
+            raise ValueError(f"No contact with the id {id}.")
+        return [directory.directoryName for directory in Contact.directories(contact)]
+
+    def stats(self):
+        """
+        Returns the size of the phone book, the counters of the store and those of the server, with the latencies of
+        the operations when the metrics are on.
+        """
+        myPhone = self.store.load()
+        statistics = {"directories": len(myPhone), "contacts": sum(map(Directory.contactCount, myPhone)), **self.store.stats(), "requests": self.requests, "batches": self.batches, "writes": self.writes}
+        if metricsEnabled:
+            statistics["metrics"] = metricsReport()
+        return statistics
+
+    def addContact(self, directory: str, **fields):
+        """
+        Returns the update adding a contact, see addRecords.
+        """
+        checkFieldNames(fields)
+        return lambda myPhone: addRecords(myPhone, str(directory), fields)
+
+    def editContact(self, directory: str, contact: int, **fields):
+        """
+        Returns the update changing the given fields of a contact, see editRecords.
+        """
+        checkFieldNames(fields)
+        contact = int(contact)
+        return lambda myPhone: editRecords(myPhone, str(directory), contact, fields)
+
+    def delete(self, directory: str, contact: int = None):
+        """
+        Returns the update deleting a contact, or a whole directory when no contact is given, see deleteRecords.
+        """
+        contact = None if contact is None else int(contact)
+        return lambda myPhone: deleteRecords(myPhone, str(directory), contact)
+
+    def link(self, directory: str, source: str, contact: int):
+        """
+        Returns the update adding a contact of a directory to another one, see linkRecords.
+        """
+        contact = int(contact)
+        return lambda myPhone: linkRecords(myPhone, str(directory), str(source), contact)
+
+def checkFieldNames(fields: dict):
+    """
+    Raises ValueError if a contact field sent to the server does not exist, or its value is not text.
+    """
+    unknown = set(fields) - set(contactFieldNames[:8])
+    if unknown:
+        raise ValueError(f"Unknown contact fields: {', '.join(sorted(unknown))}.")
+    for name, value in fields.items():
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"The {name} must be text, not {type(value).__name__}.")
+
+def serve(store: object, address: str = serverAddress):
+    """
+    Runs the server until it is interrupted.
+
+    Args:
+        store (PhoneStore): The store holding the phone book.
+        address (str, optional): Where to listen, see parseAddress. Defaults to serverAddress.
+
+    Returns:
+        None
+    """
+    import asyncio
+
+    async def run():
+        server = ContactServer(store)
+        Render(f"Serving the phone book on {await server.start(address)}, press Ctrl+C to stop.")
+        try:
+            await server.server.serve_forever()
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+class ContactClient:
+    def __init__(self, address: str = serverAddress, poolSize: int = 8, timeout: float = 30.0):
+        """
+        Initializes a client of the server, keeping its connections open to send the next requests over them.
+
+        It can be shared by several threads, each request taking a connection from the pool or opening a new one.
+
+        Args:
+            address (str, optional): The address of the server, see parseAddress. Defaults to serverAddress.
+            poolSize (int, optional): The number of idle connections kept open. Defaults to 8.
+            timeout (float, optional): The seconds to wait for the server. Defaults to 30.
+        """
+        import queue
+
+        self.address = address
+        self.poolSize = poolSize
+        self.timeout = timeout
+        self.pool = queue.LifoQueue()
+        self.ids = itertools.count(1)
+        self.connections = 0
+
+    def connect(self):
+        """
+        Opens a new connection to the server.
+
+        Returns:
+            tuple: The socket and a binary file reading and writing it.
+        """
+        import socket
+
+        host, port = parseAddress(self.address)
+        if port is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            try:
+                connection.connect(host)
+            except OSError:
+                connection.close()
+                raise
+        else:
+            connection = socket.create_connection((host, port), self.timeout)
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connections += 1
+        return connection, connection.makefile("rwb")
+
+    def call(self, method: str, **params):
+        """
+        Sends a request and waits for its response.
+
+        A read sent over a pooled connection the server closed in the meantime is sent again over a new one.
+
+        Args:
+            method (str): The method, see ContactServer.
+            **params: The parameters of the method.
+
+        Returns:
+            object: The result of the method.
+
+        Raises:
+            ValueError: If the server answered with an error.
+            OSError: If the server cannot be reached.
+        """
+        import json
+        import queue
+
+        request = json.dumps({"id": next(self.ids), "method": method, "params": params}, ensure_ascii=False).encode("utf-8") + b"\n"
+        while True:
+            try:
+                connection, pooled = self.pool.get_nowait(), True
+            except queue.Empty:
+                connection, pooled = self.connect(), False
+            try:
+                connection[1].write(request)
+                connection[1].flush()
+                line = connection[1].readline()
+                if not line:
+                    raise ConnectionError("The server closed the connection.")
+            except OSError:
+                self.disconnect(connection)
+                if pooled and method in serverReadMethods:
+                    continue
+                raise
+            break
+
+        if self.pool.qsize() < self.poolSize:
+            self.pool.put(connection)
+        else:
+            self.disconnect(connection)
+        response = json.loads(line)
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    def disconnect(self, connection: tuple):
+        """
+        Closes a connection.
+        """
+        connection[1].close()
+        connection[0].close()
+
+    def close(self):
+        """
+        Closes the pooled connections.
+        """
+        import queue
+
+        while True:
+            try:
+                self.disconnect(self.pool.get_nowait())
+            except queue.Empty:
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+# ------------------------------------------------- BENCHMARKS -------------------------------------------------- #
+
+def syntheticFields(index: int):
+    """
+    Returns realistic field values for a generated contact.
+
+    Args:
+        index (int): The number of the generated contact, used to make its values unique.
+
+    Returns:
+        tuple: The nickname, phone, first name, last name, email, notes, birthday and address of the contact.
+    """
+    firstNames = ("Jean", "Marie", "Pierre", "Camille", "Lucas", "Emma", "Hugo", "Léa")
+    lastNames = ("Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand")
+    firstName = firstNames[index % len(firstNames)]
+    lastName = lastNames[index // len(firstNames) % len(lastNames)]
+    return (f"{firstName.lower()}{index}", f"06 {index % 100:02d} {index // 100 % 100:02d} {index // 10000 % 100:02d} {index // 1000000 % 100:02d}", firstName, lastName, f"{firstName.lower()}.{lastName.lower()}{index}@example.com", "", f"{index % 28 + 1:02d}/{index % 12 + 1:02d}/{1950 + index % 60}", f"{index % 200 + 1} rue de la République, {69000 + index % 10} Lyon")
+
+def benchmarkMemory(count: int = 100000):
+    """
+    Measures the memory used per contact by the slotted Contact against the previous __dict__ based layout.
+
+    The field strings are created beforehand and shared by both layouts, so only the object overhead is compared.
+
+    Args:
+        count (int, optional): The number of contacts to create for each layout. Defaults to 100000.
+
+    Returns:
+        dict: The bytes per contact in memory and in the pickle file, before and after.
+    """
+    import tracemalloc
+
+    class DictContact:
+        def __init__(self, *fields):
+            (self.contactNickname, self.contactPhone, self.contactFirstName, self.contactLastName, self.contactEmail, self.contactNotes, self.contactBirthday, self.contactAddress, self.contactCreatedAt, self.contactUpdatedAt, self.contactDirectory) = fields
+
+    directory = Directory("Benchmark", date.today(), date.today())
+    fields = [syntheticFields(index) for index in range(count)]
+    results = {}
+    for name, build in (("before", lambda values: DictContact(*values, date.today(), date.today(), directory)), ("after", lambda values: Contact(*values, date.today(), date.today(), directory))):
+        tracemalloc.start()
+        contacts = [build(values) for values in fields]
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        results[f"{name}MemoryPerContact"] = used / count
+        if name == "after":
+            results[f"{name}PicklePerContact"] = len(pickle.dumps(contacts)) / count
+        else:
+            # The class is local to this function, so pickle the dictionaries it would have written
+            results[f"{name}PicklePerContact"] = len(pickle.dumps([vars(contact) for contact in contacts])) / count
+        del contacts
+    return results
+
+def benchmarkDedup(count: int = 1000000, duplicateRate: float = 0.1):
+    """
+    Times the duplicate detection on a generated phone book with known duplicates.
+
+    The duplicates are copies of other contacts with another nickname, a differently formatted phone, an uppercase
+    email or accents removed from the name, spread over other directories.
+
+    Args:
+        count (int, optional): The number of contacts, duplicates included. Defaults to 1000000.
+        duplicateRate (float, optional): The share of contacts that duplicate another one. Defaults to 0.1.
+
+    Returns:
+        dict: The seconds taken, the groups found and the share of the generated duplicates that were found.
+    """
+    myPhone = [Directory(f"Directory {index}", date.today(), date.today(), []) for index in range(10)]
+    originals = int(count * (1 - duplicateRate))
+    for index in range(count):
+        directory = myPhone[index % len(myPhone)]
+        if index < originals:
+            fields = syntheticFields(index)
+        else:
+            nickname, phone, firstName, lastName, email, notes, birthday, address = syntheticFields(index % originals)
+            variant = index % 3
+            fields = (f"{nickname}-bis", "+33 " + phone[1:] if variant == 0 else phone.replace(" ", ""), firstName.replace("é", "e"), lastName, email.upper() if variant == 1 else email, notes, birthday, address if variant == 2 else "")
+        directory.contacts.append(Contact(*fields, date.today(), date.today(), directory))
+
+    start = time.perf_counter()
+    groups = findDuplicates(myPhone)
+    seconds = time.perf_counter() - start
+
+    nicknames = {contact.contactNickname for group in groups for contact in group}
+    found = sum(f"{syntheticFields(index % originals)[0]}-bis" in nicknames for index in range(originals, count))
+    return {"seconds": seconds, "groups": len(groups), "recall": found / max(1, count - originals)}
+
+def benchmarkNormalize(count: int = 100000, processes: int = None):
+    """
+    Times the normalization of a generated phone book, in the calling process then spread over a process pool.
+
+    The phone book is only checked, see normalizePhoneBook, so both runs do the same work.
+
+    Args:
+        count (int, optional): The number of contacts. Defaults to 100000.
+        processes (int, optional): The number of worker processes of the second run. Defaults to the number of CPUs.
+
+    Returns:
+        dict: The contacts per second normalized by each run, and the number of contacts that would change.
+    """
+    import tempfile
+
+    processes = processes or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as folder:
+        store = PhoneStore(os.path.join(folder, "myPhone.pkl"))
+        myPhone = [Directory(f"Directory {index}", date.today(), date.today(), []) for index in range(10)]
+        for index in range(count):
+            directory = myPhone[index % len(myPhone)]
+            nickname, phone, firstName, lastName, email, notes, birthday, address = syntheticFields(index)
+            directory.contacts.append(Contact(nickname, phone, firstName, lastName, email.upper(), notes, birthday, f" {address} ", date.today(), date.today(), directory))
+        store.save(myPhone)
+
+        serial = normalizePhoneBook(store, 0, dryRun=True)
+        parallel = normalizePhoneBook(store, processes, dryRun=True)
+        store.close()
+    return {"processes": processes, "serialPerSecond": serial["perSecond"], "parallelPerSecond": parallel["perSecond"], "normalized": parallel["normalized"]}
+
+def benchmarkSorted(count: int = 100000, operations: int = 1000):
+    """
+    Times the sorted views against sorting the contacts again on every request, on a generated phone book.
+
+    Args:
+        count (int, optional): The number of contacts. Defaults to 100000.
+        operations (int, optional): The number of edits and of range pages timed. Defaults to 1000.
+
+    Returns:
+        dict: The seconds taken to build the view, then per edit kept in order, per page of a last name range from the
+            view, and per page of the same range sorted from scratch.
+    """
+    myPhone = generatePhoneBook(10, count)
+    index = LastNameIndex()
+    start = time.perf_counter()
+    index.build(myPhone)
+    results = {"build": time.perf_counter() - start}
+
+    start = time.perf_counter()
+    for number in range(operations):
+        directory = myPhone[number % len(myPhone)]
+        if not directory.contacts:
+            continue
+        record = ("editContact", number % len(myPhone), number % len(directory.contacts), syntheticFields(count + number) + (date.today(), date.today()))
+        removed = removedBy(myPhone, record)
+        applyRecord(myPhone, record)
+        index.update(myPhone, record, removed)
+    results["edit"] = (time.perf_counter() - start) / operations
+
+    start = time.perf_counter()
+    for number in range(operations):
+        index.page(low="k", high="m", start=number * pageSize % 1000, stop=number * pageSize % 1000 + pageSize)
+    results["page"] = (time.perf_counter() - start) / operations
+
+    # Sorting from scratch is much slower, so fewer pages are timed
+    pages = max(1, operations // 100)
+    start = time.perf_counter()
+    for number in range(pages):
+        contacts = sorted((contact for directory in myPhone for contact in directory.contacts), key=LastNameIndex.sortKey)
+        inRange = [contact for contact in contacts if "k" <= sortText(contact.contactLastName)[:1] <= "m"]
+        inRange[number * pageSize % 1000:number * pageSize % 1000 + pageSize]
+    results["resort"] = (time.perf_counter() - start) / pages
+    return results
+
+def benchmarkSharing(count: int = 100000, shareRate: float = 0.1, queries: int = 10000):
+    """
+    Compares putting contacts in a second directory as copies and as shared contacts, on a generated phone book.
+
+    Args:
+        count (int, optional): The number of contacts. Defaults to 100000.
+        shareRate (float, optional): The share of contacts also put in the next directory. Defaults to 0.1.
+        queries (int, optional): The number of queries for the directories holding a contact. Defaults to 10000.
+
+    Returns:
+        dict: The bytes of the snapshot and in memory once loaded back with every directory decoded, with copies and
+            with shared contacts, the seconds taken to turn the copies into shared contacts, see shareRecords, and
+            the seconds per query, looking for the copies in every directory or asking the shared contact.
+    """
+    import tempfile
+    import tracemalloc
+
+    myPhone = generatePhoneBook(10, count)
+    picked = [(position, index) for position, directory in enumerate(myPhone) for index in range(len(directory.contacts))][::max(1, round(1 / shareRate))]
+    for position, index in picked:
+        target = myPhone[(position + 1) % len(myPhone)]
+        target.contacts.append(Contact(*contactRecord(myPhone[position].contacts[index]), target))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for name in ("copy", "shared"):
+            if name == "shared":
+                start = time.perf_counter()
+                for record in shareRecords(myPhone):
+                    applyRecord(myPhone, record)
+                results["migrate"] = time.perf_counter() - start
+            path = os.path.join(folder, f"{name}.pkl")
+            saveData(myPhone, path)
+            results[f"{name}SnapshotBytes"] = os.path.getsize(path) + sum(os.path.getsize(os.path.join(shardFolder(path), shard)) for shard in os.listdir(shardFolder(path)))
+            tracemalloc.start()
+            loaded = loadSnapshot(path)[0]
+            for directory in loaded:
+                directory.contacts
+            results[f"{name}Bytes"] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del loaded
+
+            # Without sharing, every directory is scanned for the copies, so fewer queries are timed
+            queryCount = queries if name == "shared" else max(1, queries // 100)
+            start = time.perf_counter()
+            for number in range(queryCount):
+                position, index = picked[number % len(picked)]
+                contact = myPhone[position].contacts[index]
+                if name == "shared":
+                    Contact.directoryNames(contact)
+                else:
+                    record = contactRecord(contact)
+                    [directory.directoryName for directory in myPhone if any(contactRecord(other) == record for other in directory.contacts)]
+            results[f"{name}Query"] = (time.perf_counter() - start) / queryCount
+    return results
+
+def benchmarkMetrics(count: int = 100000, searches: int = 2000):
+    """
+    Measures what the timers cost on searches, with the metrics off, on, and capturing each profiling mode.
+
+    Args:
+        count (int, optional): The number of contacts. Defaults to 100000.
+        searches (int, optional): The number of nickname searches timed in each mode. Defaults to 2000.
+
+    Returns:
+        dict: The seconds per search in each mode.
+    """
+    import tempfile
+
+    global metricsEnabled, profileMode
+    previous = (metricsEnabled, profileMode)
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        store = PhoneStore(os.path.join(folder, "myPhone.pkl"))
+        myPhone = [Directory(f"Directory {index}", date.today(), date.today(), []) for index in range(10)]
+        for index in range(count):
+            directory = myPhone[index % len(myPhone)]
+            directory.contacts.append(Contact(*syntheticFields(index), date.today(), date.today(), directory))
+        store.save(myPhone)
+        queries = [syntheticFields(index * 7919 % count)[0] for index in range(searches)]
+        store.search(queries[0])
+
+        try:
+            for mode in ("off", "on") + profileModes:
+                if mode == "off":
+                    metricsEnabled = False
+                else:
+                    enableMetrics(None if mode == "on" else mode)
+                start = time.perf_counter()
+                for query in queries:
+                    store.search(query)
+                results[mode] = (time.perf_counter() - start) / searches
+        finally:
+            metricsEnabled, profileMode = previous
+            store.close()
+    return results
+
+def benchmarkRender(count: int = 100000, pages: int = 50):
+    """
+    Times the rendering of the first pages of a directory, then of the same pages again from the render cache, and
+    after a contact of each page was edited.
+
+    Args:
+        count (int, optional): The number of contacts of the directory. Defaults to 100000.
+        pages (int, optional): The number of pages rendered, see pageSize. Defaults to 50.
+
+    Returns:
+        dict: The seconds per page of each pass, and the share of the cards found in the cache on the second one.
+    """
+    directory = Directory("Directory", date.today(), date.today(), [])
+    for index in range(count):
+        directory.contacts.append(Contact(*syntheticFields(index), date.today(), date.today(), directory))
+    pages = max(1, min(pages, -(-count // pageSize)))
+
+    def renderPages():
+        start = time.perf_counter()
+        for page in range(pages):
+            "".join(Directory.render(directory, page * pageSize, (page + 1) * pageSize))
+        return (time.perf_counter() - start) / pages
+
+    renderCache.clear()
+    results = {"cold": renderPages()}
+    hits, misses = renderCache.hits, renderCache.misses
+    results["warm"] = renderPages()
+    results["hitRate"] = (renderCache.hits - hits) / max(1, renderCache.hits - hits + renderCache.misses - misses)
+    for page in range(pages):
+        applyRecord([directory], ("editContact", 0, page * pageSize, syntheticFields(count + page) + (date.today(), date.today())))
+    results["edited"] = renderPages()
+    renderCache.clear()
+    return results
+
+def generatePhoneBook(directoryCount: int = 10, contactCount: int = 1000, seed: int = 0, notesRate: float = 0.3, notesWords: float = 8.0, addressWords: float = 3.0):
+    """
+    Generates a realistic synthetic phone book.
+
+    Directory sizes follow a Zipf-like distribution, a few directories holding most of the contacts. The notes and
+    the street names have random lengths following exponential distributions, so some contacts are much larger
+    than the average.
+
+    Args:
+        directoryCount (int, optional): The number of directories. Defaults to 10.
+        contactCount (int, optional): The total number of contacts. Defaults to 1000.
+        seed (int, optional): The seed of the random generator, the same seed gives the same phone book. Defaults to 0.
+        notesRate (float, optional): The share of contacts having notes. Defaults to 0.3.
+        notesWords (float, optional): The average number of words of the notes. Defaults to 8.
+        addressWords (float, optional): The average number of words of the street names. Defaults to 3.
+
+    Returns:
+        list: The generated directories with their contacts.
+    """
+    import random
+
+    generator = random.Random(seed)
+    firstNames = ("Jean", "Marie", "Pierre", "Camille", "Lucas", "Emma", "Hugo", "Léa", "Louis", "Chloé", "Gabriel", "Inès", "Arthur", "Jade", "Nathan", "Zoé")
+    lastNames = ("Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau", "Simon", "Laurent", "Lefebvre", "Michel", "Garcia", "Fournier")
+    words = ("la", "de", "rue", "grand", "parc", "voir", "appeler", "bureau", "projet", "lundi", "anniversaire", "rendez-vous", "école", "famille", "vacances", "sport")
+    directoryNames = ("Family", "Work", "Friends", "School", "Sport", "Neighbours", "Doctors", "Holidays")
+    cities = ("Paris", "Lyon", "Marseille", "Toulouse", "Nantes", "Lille", "Bordeaux", "Strasbourg")
+    domains = ("gmail.com", "outlook.fr", "orange.fr", "free.fr", "example.com")
+    firstDay = date.today().toordinal() - 5 * 365
+
+    myPhone = []
+    for index in range(directoryCount):
+        name = directoryNames[index % len(directoryNames)] + (f" {index // len(directoryNames) + 1}" if index >= len(directoryNames) else "")
+        createdAt = date.fromordinal(firstDay + generator.randrange(365))
+        myPhone.append(Directory(name, createdAt, createdAt, []))
+
+    weights = [1 / (rank + 1) for rank in range(directoryCount)]
+    for index, directory in enumerate(generator.choices(myPhone, weights, k=contactCount)):
+        firstName = generator.choice(firstNames)
+        lastName = generator.choice(lastNames)
+        notes = ""
+        if generator.random() < notesRate:
+            notes = " ".join(generator.choices(words, k=1 + int(generator.expovariate(1 / notesWords))))
+        street = " ".join(generator.choices(words, k=1 + int(generator.expovariate(1 / addressWords)))).title()
+        createdAt = firstDay + generator.randrange(5 * 365)
+        updatedAt = createdAt + int(generator.expovariate(1 / 90))
+        directory.contacts.append(Contact(
+            f"{firstName.lower()}{index}",
+            "0" + generator.choice("67") + "".join(f" {generator.randrange(100):02d}" for _ in range(4)),
+            firstName,
+            lastName,
+            f"{firstName.lower()}.{lastName.lower()}{index}@{generator.choice(domains)}",
+            notes,
+            f"{generator.randrange(1, 29):02d}/{generator.randrange(1, 13):02d}/{generator.randrange(1940, 2015)}",
+            f"{generator.randrange(1, 300)} rue {street}, {generator.randrange(10, 96)}000 {generator.choice(cities)}",
+            date.fromordinal(createdAt),
+            date.fromordinal(min(updatedAt, date.today().toordinal())),
+            directory,
+        ))
+    return myPhone
+
+def measure(function: object, traceMemory: bool = True):
+    """
+    Times a function, then runs it again under tracemalloc to get its peak memory.
+
+    The two runs are separate so the tracing does not slow the timed one down.
+
+    Args:
+        function (callable): The operation to measure, called without arguments.
+        traceMemory (bool, optional): Whether to also measure the peak memory. Defaults to True.
+
+    Returns:
+        tuple: The seconds taken and the peak memory in bytes, or None if it was not measured.
+    """
+    import tracemalloc
+
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if traceMemory:
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak
+
+def benchmarkCore(sizes: tuple = (1000, 100000, 1000000), directoryCount: int = 10, edits: int = 100, traceMemory: bool = True):
+    """
+    Times the core operations of ContactHub on generated phone books of growing sizes.
+
+    Args:
+        sizes (tuple, optional): The numbers of contacts of the phone books. Defaults to 1k, 100k and 1M.
+        directoryCount (int, optional): The number of directories of the phone books. Defaults to 10.
+        edits (int, optional): The number of contact edits timed. Defaults to 100.
+        traceMemory (bool, optional): Whether to also measure the peak memory of each operation. Defaults to True.
+
+    Returns:
+        list: One dictionary per size and operation with the seconds taken (per edit for editContact) and the peak memory in bytes.
+    """
+    import tempfile
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            myPhone = generatePhoneBook(directoryCount, size)
+            largest = max(myPhone, key=lambda directory: len(directory.contacts))
+            path = os.path.join(folder, f"myPhone{size}.pkl")
+            store = PhoneStore(path)
+            shards = {}
+
+            def saveAll():
+                shards.clear()
+                saveData(myPhone, path, shards=shards)
+
+            def saveOneDirectory():
+                # Only the touched directory is serialized again, the others keep their shard
+                Directory.touch(largest)
+                saveData(myPhone, path, shards=shards)
+
+            def editContacts():
+                myPhone = store.load()
+                for index in range(edits):
+                    directory = myPhone[index % len(myPhone)]
+                    if directory.contacts:
+                        values = list(contactRecord(directory.contacts[index % len(directory.contacts)]))
+                        values[1], values[9] = f"07 {index % 100:02d} 00 00 00", date.today()
+                        store.apply([("editContact", index % len(myPhone), index % len(directory.contacts), tuple(values))])
+
+            operations = (
+                ("saveData", saveAll),
+                ("saveDataOneDirectory", saveOneDirectory),
+                ("loadData", lambda: loadData(path)),
+                ("showAllContacts", lambda: sum(map(len, Contact.render(sliceContacts(myPhone, 0, size))))),
+                ("Directory.__str__", lambda: len(str(largest))),
+                ("editContact", editContacts),
+            )
+            for operation, function in operations:
+                if operation == "editContact":
+                    # Load the saved phone book beforehand, only the edits are timed
+                    store.load()
+                seconds, peak = measure(function, traceMemory)
+                if operation == "editContact":
+                    seconds /= edits
+                results.append({"size": size, "operation": operation, "seconds": seconds, "peakBytes": peak})
+            store.close()
+    return results
+
+def flattenResults(results: object, prefix: str = ""):
+    """
+    Flattens benchmark results into numbers by path, so two runs can be compared key by key.
+
+    Args:
+        results (object): The results, nested dictionaries and lists of core results.
+        prefix (str, optional): The path of the results. Defaults to ''.
+
+    Returns:
+        dict: The numbers of the results by path, such as 'core.100000.loadData.seconds'.
+    """
+    flat = {}
+    if isinstance(results, dict):
+        for key, value in results.items():
+            flat.update(flattenResults(value, f"{prefix}{key}."))
+    elif isinstance(results, list):
+        for result in results:
+            for key in ("seconds", "peakBytes"):
+                if result.get(key) is not None:
+                    flat[f"{prefix}{result['size']}.{result['operation']}.{key}"] = result[key]
+    elif isinstance(results, (int, float)):
+        flat[prefix.rstrip(".")] = results
+    return flat
+
+def compareResults(previous: dict, current: dict):
+    """
+    Compares two benchmark runs.
+
+    Args:
+        previous (dict): The results of the reference run.
+        current (dict): The results of the new run.
+
+    Returns:
+        list: The (path, previous value, current value, ratio) of every number found in both runs.
+    """
+    previous = flattenResults(previous)
+    comparison = []
+    for path, value in flattenResults(current).items():
+        if path in previous:
+            comparison.append((path, previous[path], value, value / previous[path] if previous[path] else float("inf")))
+    return comparison
+
+def benchmarkStorage(count: int = 100000, operations: int = 1000):
+    """
+    Compares the pickle and SQLite storage backends on a generated phone book.
+
+    Args:
+        count (int, optional): The number of contacts of the phone book. Defaults to 100000.
+        operations (int, optional): The number of creations, edits and deletions timed. Defaults to 1000.
+
+    Returns:
+        dict: The seconds taken by a full save and load, and per created, edited and deleted contact, for each backend.
+    """
+    import tempfile
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for name, fileName in (("pickle", "myPhone.pkl"), ("sqlite", "myPhone.db")):
+            storage = openStorage(os.path.join(folder, fileName))
+            myPhone = [Directory(f"Directory {index}", date.today(), date.today(), []) for index in range(10)]
+            for index in range(count):
+                directory = myPhone[index % len(myPhone)]
+                directory.contacts.append(Contact(*syntheticFields(index), date.today(), date.today(), directory))
+
+            start = time.perf_counter()
+            storage.save(myPhone)
+            results[f"{name}.save"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            myPhone = storage.load()
+            results[f"{name}.load"] = time.perf_counter() - start
+
+            operationsTimed = (
+                ("createContact", lambda index: ("createContact", index % len(myPhone), syntheticFields(count + index) + (date.today(), date.today()))),
+                ("editContact", lambda index: ("editContact", index % len(myPhone), index % max(1, count // len(myPhone)), syntheticFields(index) + (date.today(), date.today()))),
+                ("deleteContact", lambda index: ("deleteContact", index % len(myPhone), 0)),
+            )
+            for operation, buildRecord in operationsTimed:
+                start = time.perf_counter()
+                for index in range(operations):
+                    storage.apply(buildRecord(index))
+                results[f"{name}.{operation}"] = (time.perf_counter() - start) / operations
+            storage.close()
+    return results
+
+def benchmarkDurability(count: int = 100000, saves: int = 5):
+    """
+    Times the snapshot writes under each durability mode, and the loading of a snapshot whose newest generation is corrupted.
+
+    Args:
+        count (int, optional): The number of contacts of the phone book. Defaults to 100000.
+        saves (int, optional): The number of saves timed per mode. Defaults to 5.
+
+    Returns:
+        dict: The seconds taken by a full save and by the save of one changed directory for each mode, and by a load
+            and a load falling back to the previous generation.
+    """
+    import tempfile
+
+    global snapshotDurability
+    myPhone = generatePhoneBook(10, count)
+    largest = max(myPhone, key=lambda directory: len(directory.contacts))
+    results = {}
+    durability = snapshotDurability
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "myPhone.pkl")
+            for mode in durabilityModes:
+                snapshotDurability = mode
+                shards = {}
+                start = time.perf_counter()
+                for _ in range(saves):
+                    shards.clear()
+                    saveData(myPhone, path, shards=shards)
+                results[f"{mode}.save"] = (time.perf_counter() - start) / saves
+
+                start = time.perf_counter()
+                for _ in range(saves):
+                    Directory.touch(largest)
+                    saveData(myPhone, path, shards=shards)
+                results[f"{mode}.saveOneDirectory"] = (time.perf_counter() - start) / saves
+
+            start = time.perf_counter()
+            loadData(path)
+            results["load"] = time.perf_counter() - start
+
+            with open(path, 'r+b') as file:
+                file.seek(snapshotHeader.size)
+                file.write(b"\0")
+            start = time.perf_counter()
+            loadData(path)
+            results["loadCorrupted"] = time.perf_counter() - start
+    finally:
+        snapshotDurability = durability
+    return results
+
+def coldStart(path: str):
+    """
+    Opens a phone book in a fresh process, lists its directories and shows the first page of each one.
 
     Args:
-        None
+        path (str): The phone book.
 
     Returns:
-        None
+        dict: The seconds taken by the load, the listing and the pages, and the peak memory of the process in bytes,
+            or None where it cannot be measured.
     """
-    return Fore.GREEN  + separator  + Style.RESET_ALL
+    results = {}
+    start = time.perf_counter()
+    store = PhoneStore(path)
+    myPhone = store.load()
+    results["load"] = time.perf_counter() - start
 
-# Calculate the maximum key length and create a format string for key-value pairs in listOfActions to render the menu
-max_key_length = max(len(key) for key in listOfActions.keys())
-format_string = f"{{:<{max_key_length}}} : {{}}"
+    start = time.perf_counter()
+    names = [directory.directoryName for directory in myPhone]
+    results["listDirectories"] = time.perf_counter() - start
 
-separator = "-" * 48
+    start = time.perf_counter()
+    for directory in myPhone:
+        "".join(Directory.render(directory, 0, pageSize))
+    results["firstPages"] = time.perf_counter() - start
+    store.close()
 
-# ------------------------------------------ DATA SAVING AND LOADING ------------------------------------------- #
+    results["peakBytes"] = peakMemory()
+    return results
 
-def saveData(myPhone: list):
+def peakMemory():
     """
-    Print an error message with a red color.
+    Returns the peak resident memory of the process in bytes, or None where it cannot be measured.
+
+    On Linux the getrusage peak survives exec, so a process spawned by a larger one would report the memory of its
+    parent, and the peak of the process itself is read from /proc instead.
+    """
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Kilobytes on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+def benchmarkColdStart(sizes: tuple = (1000, 100000, 1000000)):
+    """
+    Measures the opening of phone books holding a small directory next to a large one of growing sizes.
+
+    Each phone book is opened in a new process, so the memory measured is only what opening it costs. Since the
+    contacts stay in their compressed blocks until a page needs them, the results should not grow with the size.
 
     Args:
-        myPhone (list): The directories with their contacts to be saved.
+        sizes (tuple, optional): The numbers of contacts of the large directory. Defaults to 1k, 100k and 1M.
+
+    Returns:
+        dict: The results of coldStart for each size.
+    """
+    import tempfile
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            small = generatePhoneBook(1, 100)[0]
+            small.directoryName = "Small"
+            large = generatePhoneBook(1, size)[0]
+            path = os.path.join(folder, f"myPhone{size}.pkl")
+            saveData([small, large], path)
+            del small, large
+            # A spawned process does not inherit the generated phone book, unlike a forked one
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                results[size] = executor.submit(coldStart, path).result()
+    return results
+
+def benchmarkServer(count: int = 100000, clients: int = 8, requests: int = 4000):
+    """
+    Measures the request rates of the server, run in a thread of this process, against client threads sharing one
+    pooled ContactClient, next to a search made by loading the phone book from scratch as a separate tool would.
+
+    Args:
+        count (int, optional): The number of contacts of the phone book. Defaults to 100000.
+        clients (int, optional): The number of client threads. Defaults to 8.
+        requests (int, optional): The number of searches, and of contact additions, sent in all. Defaults to 4000.
+
+    Returns:
+        dict: The seconds of the search from scratch, the searches and additions per second through the server, the
+            average number of additions persisted per commit and the connections opened.
+    """
+    import asyncio
+    import tempfile
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "myPhone.pkl")
+        myPhone = generatePhoneBook(10, count)
+        saveData(myPhone, path)
+        # Look up existing contacts by nickname, as a tool resolving a caller would
+        queries = [contact.contactNickname for contact in itertools.islice(sliceContacts(myPhone, 0, count), 0, count, max(1, count // 64))]
+        del myPhone
+
+        start = time.perf_counter()
+        store = PhoneStore(path)
+        store.search(queries[0])
+        results["coldSearch"] = time.perf_counter() - start
+
+        server = ContactServer(store)
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever)
+        thread.start()
+        try:
+            address = asyncio.run_coroutine_threadsafe(server.start("127.0.0.1:0"), loop).result()
+            with ContactClient(address, poolSize=clients) as client:
+                def run(method: str, buildParams: object):
+                    def sendRequests(first: int):
+                        for index in range(first, requests, clients):
+                            client.call(method, **buildParams(index))
+
+                    threads = [threading.Thread(target=sendRequests, args=(first,)) for first in range(clients)]
+                    start = time.perf_counter()
+                    for clientThread in threads:
+                        clientThread.start()
+                    for clientThread in threads:
+                        clientThread.join()
+                    return requests / (time.perf_counter() - start)
+
+                results["searchesPerSecond"] = run("search", lambda index: {"query": queries[index % len(queries)], "limit": pageSize})
+                batches = server.batches
+                results["addsPerSecond"] = run("add", lambda index: {"directory": str(index % 10 + 1), "nickname": f"server{index}", "phone": f"07 {index % 100:02d} 00 00 00"})
+                results["addsPerCommit"] = requests / max(1, server.batches - batches)
+                results["connections"] = client.connections
+            asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+            store.close()
+    return results
+
+def concurrentWriter(path: str, writer: int, operations: int, compactSize: int):
+    """
+    Creates, edits and deletes contacts from one process of the concurrency benchmark.
+
+    Every writer creates its own contacts in the shared directories, edits and deletes some of them, and keeps
+    overwriting the notes of one contact shared by all writers, which is where the conflicts happen.
+
+    Args:
+        path (str): The phone book shared by the writers.
+        writer (int): The number of this writer.
+        operations (int): The number of mutations to make.
+        compactSize (int): The journal size triggering a compaction, small to compact while the others write.
+
+    Returns:
+        dict: The phone and notes expected for each contact this writer created and kept, and the store counters.
+    """
+    global journalCompactSize
+    journalCompactSize = compactSize
+
+    store = PhoneStore(path)
+    expected = {}
+    for index in range(operations):
+        nickname = f"writer{writer}-{index}"
+        if index % 5 == 4 and expected:
+            # Edit one of our own contacts
+            target = sorted(expected)[index % len(expected)]
+            phone = f"edited {index}"
+
+            def buildRecords(myPhone, target=target, phone=phone):
+                for directoryIndex, directory in enumerate(myPhone):
+                    for contactIndex, contact in enumerate(directory.contacts):
+                        if contact.contactNickname == target:
+                            values = list(contactRecord(contact))
+                            values[1] = phone
+                            return [("editContact", directoryIndex, contactIndex, tuple(values))]
+                raise ValueError(f"{target} went missing")
+
+            store.update(buildRecords, attempts=100)
+            expected[target] = phone
+        elif index % 7 == 6 and expected:
+            # Delete one of our own contacts
+            target = sorted(expected)[0]
+
+            def buildRecords(myPhone, target=target):
+                for directoryIndex, directory in enumerate(myPhone):
+                    for contactIndex, contact in enumerate(directory.contacts):
+                        if contact.contactNickname == target:
+                            return [("deleteContact", directoryIndex, contactIndex)]
+                raise ValueError(f"{target} went missing")
+
+            store.update(buildRecords, attempts=100)
+            del expected[target]
+        elif index % 3 == 2:
+            # Overwrite the notes of the contact every writer edits
+            def buildRecords(myPhone, index=index):
+                values = list(contactRecord(myPhone[0].contacts[0]))
+                values[5] = f"writer{writer}-{index}"
+                return [("editContact", 0, 0, tuple(values))]
+
+            store.update(buildRecords, attempts=100)
+        else:
+            fields = syntheticFields(writer * operations + index)
+            store.update(lambda myPhone: [("createContact", index % len(myPhone), (nickname,) + fields[1:] + (date.today(), date.today()))], attempts=100)
+            expected[nickname] = fields[1]
+    store.close()
+    return {"expected": expected, **store.stats()}
+
+def benchmarkConcurrency(processes: int = 8, operations: int = 200, compactSize: int = 1 << 16):
+    """
+    Runs writer processes against the same pickle phone book at once, then checks that no contact went missing.
+
+    Args:
+        processes (int, optional): The number of writer processes. Defaults to 8.
+        operations (int, optional): The number of mutations made by each writer. Defaults to 200.
+        compactSize (int, optional): The journal size triggering a compaction. Defaults to 64 KiB.
+
+    Returns:
+        dict: The mutations per second, the contacts missing or unexpected at the end, and the conflicts and rebases.
+    """
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "myPhone.pkl")
+        store = PhoneStore(path)
+        store.apply([("createDirectory", f"Directory {index}", date.today(), date.today()) for index in range(3)])
+        store.apply([("createContact", 0, ("shared",) + syntheticFields(0)[1:] + (date.today(), date.today()))])
+        store.close()
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(processes) as executor:
+            writers = [executor.submit(concurrentWriter, path, writer, operations, compactSize) for writer in range(processes)]
+            results = [writer.result() for writer in writers]
+        seconds = time.perf_counter() - start
+
+        found = collections.Counter()
+        phones = {}
+        for directory in loadData(path):
+            for contact in directory.contacts:
+                found[contact.contactNickname] += 1
+                phones[contact.contactNickname] = contact.contactPhone
+    expected = {nickname: phone for result in results for nickname, phone in result["expected"].items()}
+    return {
+        "processes": processes,
+        "operations": processes * operations,
+        "seconds": seconds,
+        "perSecond": processes * operations / seconds,
+        "missing": sum(1 for nickname, phone in expected.items() if found[nickname] != 1 or phones[nickname] != phone),
+        "unexpected": sum(count for nickname, count in found.items() if nickname not in expected and nickname != "shared"),
+        "conflicts": sum(result["conflicts"] for result in results),
+        "rebases": sum(result["rebases"] for result in results),
+        "compactions": sum(result["compactions"] for result in results),
+    }
+
+# ------------------------------------------------ COMMAND LINE ------------------------------------------------- #
+
+def findDirectory(myPhone: list, reference: str):
+    """
+    Returns the position of a directory given by its number in the menu or by its name.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        reference (str): The number of the directory, starting at 1, or its name.
+
+    Returns:
+        int: The position of the directory, or None if there is no such directory.
+    """
+    if reference.isdigit() and 1 <= int(reference) <= len(myPhone):
+        return int(reference) - 1
+    for index, directory in enumerate(myPhone):
+        if directory.directoryName == reference:
+            return index
+    return None
+
+def findContact(myPhone: list, directoryReference: str, contactNumber: int):
+    """
+    Returns the position of a directory and of one of its contacts, raising ValueError if they do not exist.
+    """
+    directoryIndex = findDirectory(myPhone, directoryReference)
+    if directoryIndex is None:
+        raise ValueError(f"No directory {directoryReference!r}.")
+    if not 1 <= contactNumber <= len(myPhone[directoryIndex].contacts):
+        raise ValueError(f"No contact number {contactNumber} in directory {directoryReference!r}.")
+    return directoryIndex, contactNumber - 1
+
+def addRecords(myPhone: list, directoryReference: str, fields: dict):
+    """
+    Returns the records adding a contact to a directory, creating the directory if no directory has this name.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        directoryReference (str): The number or the name of the directory.
+        fields (dict): The fields of the contact by name, see contactFieldNames, the missing ones being left empty.
+
+    Returns:
+        list: The records to apply.
+
+    Raises:
+        ValueError: If the directory is missing or a field is invalid, see normalizeFields.
+    """
+    fields = normalizeFields(fields)[0]
+    records = []
+    directoryIndex = findDirectory(myPhone, directoryReference)
+    if directoryIndex is None:
+        directoryIndex = len(myPhone)
+        records.append(("createDirectory", directoryReference, date.today(), date.today()))
+    values = tuple(fields.get(name) or "" for name in contactFieldNames[:8])
+    records.append(("createContact", directoryIndex, values + (date.today(), date.today())))
+    return records
+
+def editRecords(myPhone: list, directoryReference: str, contactNumber: int, fields: dict):
+    """
+    Returns the records changing the given fields of a contact, keeping the others.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        directoryReference (str): The number or the name of the directory.
+        contactNumber (int): The number of the contact in the directory, starting at 1.
+        fields (dict): The fields to change by name, see contactFieldNames, None leaving a field unchanged.
+
+    Returns:
+        list: The records to apply.
+
+    Raises:
+        ValueError: If the contact does not exist or a field is invalid, see normalizeFields.
+    """
+    fields = normalizeFields(fields)[0]
+    directoryIndex, contactIndex = findContact(myPhone, directoryReference, contactNumber)
+    values = list(contactRecord(myPhone[directoryIndex].contacts[contactIndex]))
+    for position, name in enumerate(contactFieldNames[:8]):
+        if fields.get(name) is not None:
+            values[position] = fields[name]
+    values[9] = date.today()
+    return [("editContact", directoryIndex, contactIndex, tuple(values))]
+
+def deleteRecords(myPhone: list, directoryReference: str, contactNumber: int = None):
+    """
+    Returns the records deleting a contact, or a whole directory when no contact is given.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        directoryReference (str): The number or the name of the directory.
+        contactNumber (int, optional): The number of the contact in the directory, starting at 1.
+
+    Returns:
+        list: The records to apply.
+    """
+    if contactNumber is None:
+        directoryIndex = findDirectory(myPhone, directoryReference)
+        if directoryIndex is None:
+            raise ValueError(f"No directory {directoryReference!r}.")
+        return [("deleteDirectory", directoryIndex)]
+    return [("deleteContact", *findContact(myPhone, directoryReference, contactNumber))]
+
+def linkRecords(myPhone: list, directoryReference: str, sourceReference: str, contactNumber: int):
+    """
+    Returns the records adding a contact of a directory to the end of another one, shared rather than copied.
+
+    Args:
+        myPhone (list): The directories with their contacts.
+        directoryReference (str): The number or the name of the directory to add the contact to.
+        sourceReference (str): The number or the name of the directory holding the contact.
+        contactNumber (int): The number of the contact in that directory, starting at 1.
+
+    Returns:
+        list: The records to apply.
+
+    Raises:
+        ValueError: If a directory or the contact is missing, or the directory already holds the contact.
+    """
+    sourceIndex, contactIndex = findContact(myPhone, sourceReference, contactNumber)
+    directoryIndex = findDirectory(myPhone, directoryReference)
+    if directoryIndex is None:
+        raise ValueError(f"No directory {directoryReference!r}.")
+    directory = myPhone[directoryIndex]
+    contact = myPhone[sourceIndex].contacts[contactIndex]
+    if Contact.isIn(contact, directory):
+        raise ValueError(f"The contact {contact.contactNickname!r} is already in the directory {directory.directoryName!r}.")
+    return [("linkContact", directoryIndex, len(directory.contacts), sourceIndex, contactIndex)]
+
+def printContacts(contacts: object, asJson: bool):
+    """
+    Prints contacts for the command line, as formatted blocks or as JSON lines.
+
+    Args:
+        contacts (iterable): The (contact, directory name) pairs to print.
+        asJson (bool): Whether to print one JSON object per line.
 
     Returns:
         None
     """
-    with open('myPhone.pkl', 'wb') as file:
-        pickle.dump(myPhone, file)
+    if asJson:
+        import json
+
+        Stream(json.dumps(contactDict(contact, directoryName), ensure_ascii=False) + "\n" for contact, directoryName in contacts)
+    else:
+        Stream(Contact.render(contact for contact, _ in contacts))
 
-def loadData():
+def commandList(store: object, arguments: object):
     """
-    Load data from a pickle file.
+    Prints every contact, or those of one directory, optionally from a range of a sorted view.
+    """
+    myPhone = store.load()
+    if arguments.directory is None:
+        directories = myPhone
+    else:
+        directoryIndex = findDirectory(myPhone, arguments.directory)
+        if directoryIndex is None:
+            raise ValueError(f"No directory {arguments.directory!r}.")
+        directories = [myPhone[directoryIndex]]
+    if arguments.sort is None:
+        if arguments.low is not None or arguments.high is not None or arguments.reverse:
+            raise ValueError("--from, --to and --reverse need --sort.")
+        contacts = (contact for directory in directories for contact in directory.contacts)
+        contacts = itertools.islice(contacts, arguments.offset, None if arguments.limit is None else arguments.offset + arguments.limit)
+    else:
+        stop = None if arguments.limit is None else arguments.offset + arguments.limit
+        contacts = store.sortedContacts(arguments.sort, None if arguments.directory is None else directories[0], arguments.low, arguments.high, arguments.offset, stop, arguments.reverse)[1]
+    printContacts(((contact, Contact.directoryNames(contact)) for contact in contacts), arguments.json)
+
+def commandSearch(store: object, arguments: object):
+    """
+    Prints the contacts matching a search.
+    """
+    printContacts(((contact, Contact.directoryNames(contact)) for contact in store.search(" ".join(arguments.query), arguments.limit)), arguments.json)
+
+def commandBirthdays(store: object, arguments: object):
+    """
+    Prints the contacts whose birthday is in the coming days, the nearest first.
+    """
+    birthdays = store.upcomingBirthdays(arguments.days)
+    if arguments.json:
+        import json
+
+        Stream(json.dumps(dict(contactDict(contact, Contact.directoryNames(contact)), nextBirthday=birthday.isoformat()), ensure_ascii=False) + "\n" for birthday, contact in birthdays)
+    else:
+        Contact.showUpcomingBirthdays(birthdays)
+
+def commandAdd(store: object, arguments: object):
+    """
+    Adds a contact to a directory, creating the directory if no directory has this name.
+    """
+    fields = {name: getattr(arguments, name) for name in contactFieldNames[:8]}
+    directoryIndex = store.update(lambda myPhone: addRecords(myPhone, arguments.directory, fields))[-1][1]
+    Render(f"Contact added to {store.load()[directoryIndex].directoryName}.")
+
+def commandEdit(store: object, arguments: object):
+    """
+    Changes the given fields of a contact, keeping the others.
+    """
+    fields = {name: getattr(arguments, name) for name in contactFieldNames[:8]}
+    store.update(lambda myPhone: editRecords(myPhone, arguments.directory, arguments.contact, fields))
+    Render("Contact edited.")
+
+def commandDelete(store: object, arguments: object):
+    """
+    Deletes a contact, or a whole directory when no contact is given.
+    """
+    store.update(lambda myPhone: deleteRecords(myPhone, arguments.directory, arguments.contact))
+    Render("Directory deleted." if arguments.contact is None else "Contact deleted.")
+
+def commandLink(store: object, arguments: object):
+    """
+    Adds a contact of a directory to another one, shared rather than copied.
+    """
+    store.update(lambda myPhone: linkRecords(myPhone, arguments.directory, arguments.source, arguments.contact))
+    Render("Contact shared.")
+
+def commandWhere(store: object, arguments: object):
+    """
+    Prints the directories holding a contact given by its id.
+    """
+    contact = store.contactById(arguments.id)
+    if contact is None:
+        raise ValueError(f"No contact with the id {arguments.id}.")
+    for directory in Contact.directories(contact):
+        print(directory.directoryName)
+
+def commandShare(store: object, arguments: object):
+    """
+    Turns the copies of a contact kept in several directories into a single shared contact.
+    """
+    result = shareContacts(store, arguments.dryRun)
+    verb = "would be" if arguments.dryRun else "were"
+    Render(f"{result['contacts']} contacts checked in {result['seconds']:.2f}s, {result['copies']} copies {verb} replaced by {result['shared']} shared contacts.")
+
+def commandImport(store: object, arguments: object):
+    """
+    Imports a CSV, vCard or JSONL file.
+    """
+    result = importContacts(store, arguments.file, arguments.directory, arguments.batchSize, arguments.processes)
+    Render(f"{result['contacts']} contacts imported in {result['seconds']:.2f}s ({result['perSecond']:.0f} contacts/s), {result['invalid']} invalid values kept as they were.")
+
+def commandNormalize(store: object, arguments: object):
+    """
+    Normalizes the phone, email, birthday and address of every existing contact.
+    """
+    result = normalizePhoneBook(store, arguments.processes, arguments.batchSize, arguments.country, arguments.dryRun)
+    verb = "would be" if arguments.dryRun else "were"
+    Render(f"{result['contacts']} contacts checked in {result['seconds']:.2f}s ({result['perSecond']:.0f} contacts/s), {result['normalized']} {verb} normalized, {result['invalid']} invalid values kept as they were.")
+
+def commandExport(store: object, arguments: object):
+    """
+    Exports every contact to a CSV, vCard or JSONL file.
+    """
+    result = exportContacts(store.load(), arguments.file, arguments.vCardVersion)
+    Render(f"{result['contacts']} contacts exported in {result['seconds']:.2f}s ({result['perSecond']:.0f} contacts/s).")
+
+def commandStats(store: object, arguments: object):
+    """
+    Prints the size of the phone book, the counters of the store and of the render cache, then the latencies of the operations when the
+    metrics are on.
+    """
+    myPhone = store.load()
+    statistics = {"directories": len(myPhone), "contacts": sum(map(Directory.contactCount, myPhone)), **store.stats(), **renderCache.stats()}
+    for key, value in statistics.items():
+        print(f"{key}: {value}")
+    if metricsEnabled:
+        print()
+        showMetrics()
+
+def commandDedup(store: object, arguments: object):
+    """
+    Finds and merges the duplicate contacts.
+    """
+    if arguments.dryRun:
+        groups = findDuplicates(store.load(), arguments.threshold)
+        for number, group in enumerate(groups, start=1):
+            Render(f"Duplicates {number}/{len(groups)}:")
+            printContacts(((contact, Contact.directoryNames(contact)) for contact in group), False)
+        return
+    result = mergeDuplicates(store, arguments.threshold, ask=not arguments.auto)
+    Render(f"{result['groups']} groups of duplicates found in {result['seconds']:.2f}s, {result['merged']} merged, {result['removed']} contacts removed.")
+
+def commandMigrate(store: object, arguments: object):
+    """
+    Copies the pickle phone book into a SQLite database.
+    """
+    Render(f"{migrateToSqlite(arguments.data, arguments.database)} contacts migrated.")
+
+def commandBenchmark(store: object, arguments: object):
+    """
+    Runs the core, memory, storage, durability, cold start, duplicate detection, normalization, sorted views,
+    sharing, render cache, metrics, concurrency and server benchmarks.
+    """
+    import json
+
+    if "all" in arguments.suites:
+        arguments.suites = ("core", "memory", "storage", "durability", "coldstart", "dedup", "normalize", "sorted", "sharing", "render", "metrics", "concurrency", "server")
+    results = {}
+    if "core" in arguments.suites:
+        results["core"] = benchmarkCore(tuple(int(size) for size in arguments.sizes.split(",")), arguments.directories, traceMemory=not arguments.noMemory)
+        for result in results["core"]:
+            peak = "" if result["peakBytes"] is None else f", peak {result['peakBytes'] / 1048576:.1f} MiB"
+            Render(f"core.{result['size']}.{result['operation']}: {result['seconds'] * 1000:.3f} ms{peak}")
+    if "memory" in arguments.suites:
+        results["memory"] = benchmarkMemory(arguments.contacts)
+        for key, value in results["memory"].items():
+            Render(f"memory.{key}: {value:.1f} bytes")
+    if "storage" in arguments.suites:
+        results["storage"] = benchmarkStorage(arguments.contacts)
+        for key, value in results["storage"].items():
+            Render(f"storage.{key}: {value * 1000:.3f} ms")
+    if "durability" in arguments.suites:
+        results["durability"] = benchmarkDurability(arguments.contacts)
+        for key, value in results["durability"].items():
+            Render(f"durability.{key}: {value * 1000:.3f} ms")
+    if "coldstart" in arguments.suites:
+        results["coldstart"] = benchmarkColdStart(tuple(int(size) for size in arguments.sizes.split(",")))
+        for size, result in results["coldstart"].items():
+            peak = "" if result["peakBytes"] is None else f", peak {result['peakBytes'] / 1048576:.1f} MiB"
+            Render(f"coldstart.{size}: load {result['load'] * 1000:.3f} ms, listDirectories {result['listDirectories'] * 1000:.3f} ms, firstPages {result['firstPages'] * 1000:.3f} ms{peak}")
+    if "dedup" in arguments.suites:
+        results["dedup"] = benchmarkDedup(arguments.contacts)
+        Render(f"dedup: {results['dedup']['groups']} groups in {results['dedup']['seconds']:.2f}s, recall {results['dedup']['recall']:.1%}")
+    if "normalize" in arguments.suites:
+        results["normalize"] = benchmarkNormalize(arguments.contacts)
+        normalize = results["normalize"]
+        Render(f"normalize: {normalize['serialPerSecond']:.0f} contacts/s in one process, {normalize['parallelPerSecond']:.0f} contacts/s over {normalize['processes']} processes, {normalize['normalized']} would change")
+    if "sorted" in arguments.suites:
+        results["sorted"] = benchmarkSorted(arguments.contacts)
+        for key, value in results["sorted"].items():
+            Render(f"sorted.{key}: {value * 1000:.3f} ms")
+    if "sharing" in arguments.suites:
+        results["sharing"] = benchmarkSharing(arguments.contacts)
+        for key, value in results["sharing"].items():
+            Render(f"sharing.{key}: {value:.1f} bytes" if key.endswith("Bytes") else f"sharing.{key}: {value * 1000:.3f} ms")
+    if "render" in arguments.suites:
+        results["render"] = benchmarkRender(arguments.contacts)
+        render = results["render"]
+        Render(f"render: {render['cold'] * 1000:.3f} ms per page, {render['warm'] * 1000:.3f} ms from the cache ({render['hitRate']:.0%} hits), {render['edited'] * 1000:.3f} ms after an edit per page")
+    if "metrics" in arguments.suites:
+        results["metrics"] = benchmarkMetrics(arguments.contacts)
+        for key, value in results["metrics"].items():
+            Render(f"metrics.search.{key}: {value * 1e6:.1f} µs")
+    if "concurrency" in arguments.suites:
+        results["concurrency"] = benchmarkConcurrency(arguments.processes)
+        concurrency = results["concurrency"]
+        Render(f"concurrency: {concurrency['operations']} mutations from {concurrency['processes']} processes in {concurrency['seconds']:.2f}s ({concurrency['perSecond']:.0f}/s), {concurrency['conflicts']} conflicts retried, {concurrency['rebases']} rebased, {concurrency['compactions']} compactions")
+        if concurrency["missing"] or concurrency["unexpected"]:
+            raise ValueError(f"{concurrency['missing']} contacts went missing and {concurrency['unexpected']} unexpected ones were found.")
+    if "server" in arguments.suites:
+        results["server"] = benchmarkServer(arguments.contacts)
+        server = results["server"]
+        Render(f"server: search from scratch {server['coldSearch'] * 1000:.1f} ms, {server['searchesPerSecond']:.0f} searches/s and {server['addsPerSecond']:.0f} additions/s served, {server['addsPerCommit']:.1f} additions per commit over {server['connections']} connections")
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump({"python": sys.version.split()[0], "platform": sys.platform, "date": date.today().isoformat(), "results": results}, file, indent=2)
+    if arguments.compare:
+        with open(arguments.compare, encoding="utf-8") as file:
+            previous = json.load(file)["results"]
+        for path, before, after, ratio in compareResults(previous, results):
+            (Error if ratio > 1 + arguments.tolerance else Render)(f"{path}: {before:.6g} -> {after:.6g} ({ratio:.2f}x)")
+
+def commandServe(store: object, arguments: object):
+    """
+    Serves the phone book to the clients of the local socket until interrupted.
+    """
+    try:
+        serve(store, arguments.address)
+    except KeyboardInterrupt:
+        Render("Server stopped.")
+
+def commandMenu(store: object, arguments: object):
+    """
+    Runs the interactive menu, showing it again after a change that conflicted with another process.
+    """
+    while True:
+        try:
+            interactiveMenu(store)
+            return
+        except ConflictError as error:
+            Error(f"{error} Your last change was not saved.")
 
-    This function attempts to open the file 'myPhone.pkl' in read binary mode. If the file is found, it loads the data using the pickle module and returns it. If the file is not found, it initializes an empty list and returns it.
+def buildParser():
+    """
+    Builds the parser of the command line.
 
     Returns:
-        list: The loaded data from the pickle file, or an empty list if the file is not found.
+        argparse.ArgumentParser: The parser, each subcommand setting the function to run as 'command'.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="contacthub", description="Manage the directories and contacts of a phone book.")
+    parser.add_argument("--data", default=os.environ.get("CONTACTHUB_DATA", "myPhone.pkl"), help="the phone book file, a .db file uses SQLite (default: $CONTACTHUB_DATA or myPhone.pkl)")
+    parser.add_argument("--durability", choices=durabilityModes, default=snapshotDurability, help=f"how hard the pickle snapshots are flushed to the disk (default: {snapshotDurability})")
+    parser.add_argument("--render-cache", dest="renderCache", type=int, default=renderCacheSize, metavar="MIB", help=f"the memory kept for the rendered contact cards, 0 to render them every time (default: {renderCacheSize})")
+    parser.add_argument("--metrics", action="store_true", help="time the operations, the latencies being shown by stats and the menu")
+    parser.add_argument("--metrics-file", dest="metricsFile", default=os.environ.get("CONTACTHUB_METRICS"), help="write the latencies to this JSON file on exit, implies --metrics (default: $CONTACTHUB_METRICS)")
+    parser.add_argument("--profile", choices=profileModes, help="also capture the functions (cprofile) or the peak memory (tracemalloc) of each operation, implies --metrics")
+    parser.set_defaults(command=commandMenu)
+    subparsers = parser.add_subparsers(title="commands")
+
+    subparser = subparsers.add_parser("menu", help="run the interactive menu (default)")
+    subparser.set_defaults(command=commandMenu)
+
+    subparser = subparsers.add_parser("list", help="print every contact, or those of one directory")
+    subparser.add_argument("--directory", help="the number or name of the directory")
+    subparser.add_argument("--sort", choices=sortOrders, help="sort by last name, creation date or update date")
+    subparser.add_argument("--from", dest="low", help="the first last name or date of the sorted range, e.g. k or 2024-05")
+    subparser.add_argument("--to", dest="high", help="the last last name or date of the sorted range, included as a prefix, e.g. m or 2024")
+    subparser.add_argument("--reverse", action="store_true", help="start from the end of the sorted range")
+    subparser.add_argument("--offset", type=int, default=0, help="the number of contacts skipped (default: 0)")
+    subparser.add_argument("--limit", type=int, help="the number of contacts printed (default: all)")
+    subparser.add_argument("--json", action="store_true", help="print one JSON object per line")
+    subparser.set_defaults(command=commandList)
+
+    subparser = subparsers.add_parser("search", help="print the contacts matching a name prefix, email, address or phone")
+    subparser.add_argument("query", nargs="+")
+    subparser.add_argument("--limit", type=int, help="the number of contacts printed, the first ones in order (default: all)")
+    subparser.add_argument("--json", action="store_true", help="print one JSON object per line")
+    subparser.set_defaults(command=commandSearch)
+
+    subparser = subparsers.add_parser("birthdays", help="print the contacts whose birthday is in the coming days")
+    subparser.add_argument("--days", type=int, default=14, help="number of days to look ahead, today included (default: 14)")
+    subparser.add_argument("--json", action="store_true", help="print one JSON object per line")
+    subparser.set_defaults(command=commandBirthdays)
+
+    for name, help in (("add", "add a contact to a directory, created if needed"), ("edit", "change some fields of a contact")):
+        subparser = subparsers.add_parser(name, help=help)
+        subparser.add_argument("directory", help="the number or name of the directory")
+        if name == "edit":
+            subparser.add_argument("contact", type=int, help="the number of the contact in the directory")
+        for field in contactFieldNames[:8]:
+            subparser.add_argument("--" + re.sub("([A-Z])", lambda match: "-" + match.group(1).lower(), field), dest=field)
+        subparser.set_defaults(command=commandAdd if name == "add" else commandEdit)
+
+    subparser = subparsers.add_parser("delete", help="delete a contact, or a whole directory")
+    subparser.add_argument("directory", help="the number or name of the directory")
+    subparser.add_argument("contact", type=int, nargs="?", help="the number of the contact, omit it to delete the directory")
+    subparser.set_defaults(command=commandDelete)
+
+    subparser = subparsers.add_parser("link", help="add a contact of a directory to another one, shared rather than copied")
+    subparser.add_argument("directory", help="the number or name of the directory to add the contact to")
+    subparser.add_argument("source", help="the number or name of the directory holding the contact")
+    subparser.add_argument("contact", type=int, help="the number of the contact in that directory")
+    subparser.set_defaults(command=commandLink)
+
+    subparser = subparsers.add_parser("where", help="print the directories holding a contact")
+    subparser.add_argument("id", type=int, help="the id of the contact, as printed by list --json")
+    subparser.set_defaults(command=commandWhere)
+
+    subparser = subparsers.add_parser("share", help="turn the copies of a contact in several directories into one shared contact")
+    subparser.add_argument("--dry-run", dest="dryRun", action="store_true", help="only count the copies")
+    subparser.set_defaults(command=commandShare)
+
+    subparser = subparsers.add_parser("import", help="import a CSV, vCard or JSONL file")
+    subparser.add_argument("file")
+    subparser.add_argument("--directory", help="the directory of the contacts the file does not put in one (default: Imported)")
+    subparser.add_argument("--processes", type=int, default=0, help="the number of processes parsing the file (default: 0)")
+    subparser.add_argument("--batch-size", dest="batchSize", type=int, default=5000, help="the number of contacts written at once (default: 5000)")
+    subparser.set_defaults(command=commandImport)
+
+    subparser = subparsers.add_parser("normalize", help="normalize the phone, email, birthday and address of every contact")
+    subparser.add_argument("--processes", type=int, default=0, help="the number of processes normalizing the contacts (default: 0)")
+    subparser.add_argument("--batch-size", dest="batchSize", type=int, default=5000, help="the number of contacts normalized and written at once (default: 5000)")
+    subparser.add_argument("--country", default=defaultCountryCode, help=f"the country code of the phone numbers in national format (default: {defaultCountryCode})")
+    subparser.add_argument("--dry-run", dest="dryRun", action="store_true", help="only count the contacts that would change")
+    subparser.set_defaults(command=commandNormalize)
+
+    subparser = subparsers.add_parser("export", help="export every contact to a CSV, vCard or JSONL file")
+    subparser.add_argument("file")
+    subparser.add_argument("--vcard-version", dest="vCardVersion", choices=("3.0", "4.0"), default="4.0")
+    subparser.set_defaults(command=commandExport)
+
+    subparser = subparsers.add_parser("dedup", help="find and merge the duplicate contacts")
+    subparser.add_argument("--auto", action="store_true", help="merge every group without asking")
+    subparser.add_argument("--dry-run", dest="dryRun", action="store_true", help="only print the groups of duplicates")
+    subparser.add_argument("--threshold", type=float, default=0.85, help="the similarity from which contacts are duplicates (default: 0.85)")
+    subparser.set_defaults(command=commandDedup)
+
+    subparser = subparsers.add_parser("stats", help="print the size of the phone book and the store counters")
+    subparser.set_defaults(command=commandStats)
+
+    subparser = subparsers.add_parser("serve", help="keep the phone book in memory and answer JSON line requests on a local socket")
+    subparser.add_argument("--address", default=os.environ.get("CONTACTHUB_SERVER", serverAddress), help=f"host:port or the path of a Unix socket (default: $CONTACTHUB_SERVER or {serverAddress})")
+    subparser.set_defaults(command=commandServe)
+
+    subparser = subparsers.add_parser("migrate", help="copy the pickle phone book into a SQLite database")
+    subparser.add_argument("database", nargs="?", default="myPhone.db")
+    subparser.set_defaults(command=commandMigrate, store=False)
+
+    subparser = subparsers.add_parser("benchmark", help="time the core operations, the memory and storage layouts, the snapshot durability, the cold start and the duplicate detection, and stress concurrent writers and the server")
+    subparser.add_argument("suites", nargs="*", choices=("all", "core", "memory", "storage", "durability", "coldstart", "dedup", "normalize", "sorted", "sharing", "render", "metrics", "concurrency", "server"), default="all")
+    subparser.add_argument("--contacts", type=int, default=100000, help="the number of contacts of the memory, storage, durability, dedup and server suites (default: 100000)")
+    subparser.add_argument("--sizes", default="1000,100000,1000000", help="the numbers of contacts of the core and cold start suites (default: 1000,100000,1000000)")
+    subparser.add_argument("--directories", type=int, default=10, help="the number of directories of the core suite (default: 10)")
+    subparser.add_argument("--no-memory", dest="noMemory", action="store_true", help="do not measure the peak memory of the core suite")
+    subparser.add_argument("--processes", type=int, default=8, help="the number of writer processes of the concurrency suite (default: 8)")
+    subparser.add_argument("--output", help="write the results to this JSON file")
+    subparser.add_argument("--compare", help="compare the results to those of a previous JSON file")
+    subparser.add_argument("--tolerance", type=float, default=0.1, help="the slowdown shown as a regression when comparing (default: 0.1)")
+    subparser.set_defaults(command=commandBenchmark, store=False)
+    return parser
+
+def main(argv: list = None):
+    """
+    Runs the command line, the interactive menu being the default command.
+
+    Args:
+        argv (list, optional): The arguments, without the program name. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit status, 0 on success and 1 on error.
     """
+    global snapshotDurability
+    arguments = buildParser().parse_args(argv)
+    snapshotDurability = arguments.durability
+    renderCache.resize(max(0, arguments.renderCache) << 20)
+    if arguments.metrics or arguments.metricsFile or arguments.profile:
+        enableMetrics(arguments.profile)
+    store = PhoneStore(arguments.data) if getattr(arguments, "store", True) else None
     try:
-        with open('myPhone.pkl', 'rb') as file:
-            myPhone = pickle.load(file)
-    except FileNotFoundError:
-        myPhone = []
-    return myPhone
+        arguments.command(store, arguments)
+    except (OSError, ValueError) as error:
+        Error(str(error))
+        return 1
+    finally:
+        if store is not None:
+            store.close()
+        if arguments.metricsFile:
+            size = {} if store is None or store.myPhone is None else {"directories": len(store.myPhone), "contacts": sum(map(Directory.contactCount, store.myPhone))}
+            try:
+                dumpMetrics(arguments.metricsFile, size)
+            except OSError as error:
+                Error(str(error))
+    return 0
 
 # ----------------------------------------------- MAIN PROGRAM ------------------------------------------------- #
 
-while True:
-    for key, action in listOfActions.items():
-        Menu(format_string.format(key, action))
+def interactiveMenu(store: object):
+    """
+    Runs the interactive menu, one frontend over the store.
+
+    Args:
+        store (PhoneStore): The store holding the phone book.
+
+    Returns:
+        None
+    """
+    while True:
+        for key, action in listOfActions.items():
+            Menu(format_string.format(key, action))
 
-    actionChoosed = Asking("What do you want to do?")
-    myPhone = loadData()
+        actionChoosed = Asking("What do you want to do?")
+        myPhone = store.load()
 
-    if actionChoosed == "0":
-        if not myPhone:
-            separator = "-" * 48
-            Error("You don't have any directory.")
-        else:
-            Directory.showAllDirectories(myPhone)
+        if actionChoosed == "0":
+            if not myPhone:
+                separator = "-" * 48
+                Error("You don't have any directory.")
+            else:
+                Directory.showAllDirectories(myPhone)
 
-            listOfActionsSubMenu = {
-                "0": "Show all directories content",
-                "1": "Show specific directory content",
-                "b": "Back to the main menu",
-                "q": "Quit the application"
-            }
+                listOfActionsSubMenu = {
+                    "0": "Show all directories content",
+                    "1": "Show specific directory content",
+                    "b": "Back to the main menu",
+                    "q": "Quit the application"
+                }
 
-            while True:
-                for key, action in listOfActionsSubMenu.items():
-                    print(f"{key}: {action}")
+                while True:
+                    for key, action in listOfActionsSubMenu.items():
+                        print(f"{key}: {action}")
 
-                actionChoosed = Asking("What do you want to do?")
+                    actionChoosed = Asking("What do you want to do?")
 
-                if actionChoosed == "0":
-                    Directory.showAllDirectoriesContent(myPhone)
-                elif actionChoosed == "1":
-                    Directory.showAllDirectories(myPhone)
-                    actionChoosed = input("Choose the directory id of the directory content you want to see: ")
-                    if actionChoosed in ["1", "2"]:
+                    if actionChoosed == "0":
+                        Directory.showAllDirectoriesContent(myPhone)
+                    elif actionChoosed == "1":
+                        Directory.showAllDirectories(myPhone)
+                        actionChoosed = input("Choose the directory id of the directory content you want to see: ")
+                        if actionChoosed in ["1", "2"]:
+                            print("\n")
+                            Directory.showDirectoryContent(myPhone[int(actionChoosed) - 1])
+                        else:
+                            Error("Invalid input.")
+                    elif actionChoosed == "b":
                         print("\n")
-                        Directory.showDirectoryContent(myPhone[int(actionChoosed) - 1])
+                        break
+                    elif actionChoosed == "q":
+                        return
                     else:
                         Error("Invalid input.")
-                elif actionChoosed == "b":
+        elif actionChoosed == "1":
+            Contact.showAllContacts(myPhone)
+        elif actionChoosed == "2":
+            directoryName = Asking("Enter the name of the directory:")
+            directoryName = Directory(directoryName, date.today(), date.today(), [])
+            myPhone.append(directoryName)
+            store.record(("createDirectory", directoryName.directoryName, directoryName.directoryCreatedAt, directoryName.directoryUpdatedAt))
+        elif actionChoosed == "3":
+            if not myPhone:
+                separator = "-" * 48
+                Error("You don't have any directory.")
+            else:
+                Directory.showAllDirectories(myPhone)
+                actionChoosed = Asking("Choose the directory id you want to edit:")
+                if actionChoosed in ["1", "2"]:
+                    directory = myPhone[int(actionChoosed) - 1]
+                    directory.editDirectory()
+                    store.record(("editDirectory", int(actionChoosed) - 1, directory.directoryName, directory.directoryUpdatedAt))
                     print("\n")
-                    break
-                elif actionChoosed == "q":
-                    exit()
                 else:
                     Error("Invalid input.")
-    elif actionChoosed == "1":
-        Contact.showAllContacts(myPhone)
-    elif actionChoosed == "2":
-        directoryName = Asking("Enter the name of the directory:")
-        directoryName = Directory(directoryName, date.today(), date.today())
-        myPhone.append(directoryName)
-        saveData(myPhone)
-    elif actionChoosed == "3":
-        if not myPhone:
-            separator = "-" * 48
-            Error("You don't have any directory.")
-        else:
-            Directory.showAllDirectories(myPhone)
-            actionChoosed = Asking("Choose the directory id you want to edit:")
-            if actionChoosed in ["1", "2"]:
-                myPhone[int(actionChoosed) - 1].editDirectory()
-                saveData(myPhone)
-                print("\n")
+        elif actionChoosed == "4":
+            if not myPhone:
+                separator = "-" * 48
+                Error("You don't have any directory.")
+            else:
+                Directory.showAllDirectories(myPhone)
+                actionChoosed = Asking("Choose the directory id you want to delete:")
+                if actionChoosed in ["1", "2"]:
+                    directory = myPhone.pop(int(actionChoosed) - 1)
+                    Directory.release(directory)
+                    renderCache.discard(directory)
+                    store.record(("deleteDirectory", int(actionChoosed) - 1), directory)
+                    print("\n")
+                else:
+                    Error("Invalid input.")
+        elif actionChoosed == "5":
+            if not myPhone:
+                separator = "-" * 48
+                Error("You don't have any directory.")
             else:
-                Error("Invalid input.")
-    elif actionChoosed == "4":
-        if not myPhone:
-            separator = "-" * 48
-            Error("You don't have any directory.")
-        else:
-            Directory.showAllDirectories(myPhone)
-            actionChoosed = Asking("Choose the directory id you want to delete:")
-            if actionChoosed in ["1", "2"]:
-                del myPhone[int(actionChoosed) - 1]
-                saveData(myPhone)
                 print("\n")
+                myPhone.clear()
+                renderCache.clear()
+                store.record(("deleteAllDirectories",))
+        elif actionChoosed == "6":
+            if not myPhone:
+                separator = "-" * 48
+                Error("You don't have any directory.")
             else:
-                Error("Invalid input.")
-    elif actionChoosed == "5":
-        if not myPhone:
-            separator = "-" * 48
-            Error("You don't have any directory.")
-        else:
-            print("\n")
-            myPhone = []
-            saveData(myPhone)
-    elif actionChoosed == "6":
-        if not myPhone:
-            separator = "-" * 48
-            Error("You don't have any directory.")
-        else:
-            Directory.showAllDirectories(myPhone)
-            contactDirectory = Asking("Enter the directory id you want to add the contact to:")
-            Directory.createContact(myPhone[int(contactDirectory) - 1])
-            saveData(myPhone)
-    elif actionChoosed == "7":
-        if not myPhone:
-            separator = "-" * 48
-            Error(f"You don't have any directory.")
-        else:
-            Directory.showAllDirectories(myPhone)
-            num_directories = len(myPhone)
-            actionChoosed = input(f"Choose the directory ID you want to edit a contact (1-{num_directories}): ")
-            if actionChoosed.isdigit():
-                actionChoosed = int(actionChoosed)
-                if 1 <= actionChoosed <= num_directories:
-                    Directory.showDirectoryContacts(myPhone[actionChoosed - 1])
-                    saveData(myPhone)
+                Directory.showAllDirectories(myPhone)
+                contactDirectory = Asking("Enter the directory id you want to add the contact to:")
+                directory = myPhone[int(contactDirectory) - 1]
+                Directory.createContact(directory)
+                store.record(("createContact", int(contactDirectory) - 1, contactRecord(directory.contacts[-1]), directory.contacts[-1].contactId))
+        elif actionChoosed == "7":
+            if not myPhone:
+                separator = "-" * 48
+                Error(f"You don't have any directory.")
+            else:
+                Directory.showAllDirectories(myPhone)
+                num_directories = len(myPhone)
+                actionChoosed = input(f"Choose the directory ID you want to edit a contact (1-{num_directories}): ")
+                if actionChoosed.isdigit():
+                    actionChoosed = int(actionChoosed)
+                    if 1 <= actionChoosed <= num_directories:
+                        contactIndex = Directory.showDirectoryContacts(myPhone[actionChoosed - 1])
+                        if contactIndex is not None:
+                            store.record(("editContact", actionChoosed - 1, contactIndex, contactRecord(myPhone[actionChoosed - 1].contacts[contactIndex])))
+                    else:
+                        Error("Invalid input.")
                 else:
                     Error("Invalid input.")
+        elif actionChoosed == "8":
+            if not myPhone:
+                separator = "-" * 48
+                Error(f"You don't have any directory.")
             else:
-                Error("Invalid input.")
-    elif actionChoosed == "8":
-        if not myPhone:
-            separator = "-" * 48
-            Error(f"You don't have any directory.")
-        else:
-            Directory.showAllDirectories(myPhone)
-            num_directories = len(myPhone)
-            actionChoosed = input(f"Choose the directory ID you want to delete a contact (1-{num_directories}): ")
-            if actionChoosed.isdigit():
-                actionChoosed = int(actionChoosed)
-                if 1 <= actionChoosed <= num_directories:
-                    Directory.deleteContact(myPhone[actionChoosed - 1])
-                    saveData(myPhone)
+                Directory.showAllDirectories(myPhone)
+                num_directories = len(myPhone)
+                actionChoosed = input(f"Choose the directory ID you want to delete a contact (1-{num_directories}): ")
+                if actionChoosed.isdigit():
+                    actionChoosed = int(actionChoosed)
+                    if 1 <= actionChoosed <= num_directories:
+                        deleted = Directory.deleteContact(myPhone[actionChoosed - 1])
+                        if deleted is not None:
+                            contactIndex, contact = deleted
+                            store.record(("deleteContact", actionChoosed - 1, contactIndex), contact)
+                    else:
+                        print("Invalid input.")
                 else:
                     print("Invalid input.")
+        elif actionChoosed == "9":
+            if not myPhone:
+                separator = "-" * 48
+                Error(f"You don't have any directory.")
+            else:
+                myPhone.clear()
+                renderCache.clear()
+                store.record(("deleteAllDirectories",))
+        elif actionChoosed == "s":
+            query = Asking("Enter a name, phone, email or address to search:")
+            Contact.showSearchResults(store.search(query))
+        elif actionChoosed == "b":
+            days = Asking("In how many days (default: 14)?")
+            Contact.showUpcomingBirthdays(store.upcomingBirthdays(int(days) if days.isdigit() else 14))
+        elif actionChoosed == "i":
+            path = Asking("Enter the CSV, vCard or JSONL file to import:")
+            directoryName = Asking("Enter the directory of the contacts the file does not put in one (default: Imported):")
+            try:
+                result = importContacts(store, path, directoryName or None)
+            except (OSError, ValueError) as error:
+                Error(str(error))
+            else:
+                Render(f"\n{result['contacts']} contacts imported in {result['seconds']:.2f}s ({result['perSecond']:.0f} contacts/s), {result['invalid']} invalid values kept as they were.\n")
+        elif actionChoosed == "e":
+            path = Asking("Enter the CSV, vCard or JSONL file to export to:")
+            try:
+                result = exportContacts(myPhone, path)
+            except (OSError, ValueError) as error:
+                Error(str(error))
+            else:
+                Render(f"\n{result['contacts']} contacts exported in {result['seconds']:.2f}s ({result['perSecond']:.0f} contacts/s).\n")
+        elif actionChoosed == "d":
+            result = mergeDuplicates(store)
+            Render(f"\n{result['groups']} groups of duplicates found, {result['merged']} merged, {result['removed']} contacts removed.\n")
+        elif actionChoosed == "o":
+            order = Asking(f"Sort by ({', '.join(sortOrders)}):").strip().lower()
+            reference = Asking("Enter the directory number or name (default: all):")
+            low = Asking("From (a last name or a date such as 2024-05, default: the start):") or None
+            high = Asking("To, included (default: the end):") or None
+            directoryIndex = findDirectory(myPhone, reference) if reference else None
+            if order not in sortOrders or (reference and directoryIndex is None):
+                Error("Invalid input.")
+            else:
+                directory = None if directoryIndex is None else myPhone[directoryIndex]
+                try:
+                    count = store.sortedContacts(order, directory, low, high, 0, 0)[0]
+                except ValueError as error:
+                    Error(str(error))
+                else:
+                    print("\n")
+                    Paginate(count, lambda start, stop: Contact.render(store.sortedContacts(order, directory, low, high, start, stop)[1], start))
+                    if count == 0:
+                        Error("No contact in this range")
+                    print("\n")
+        elif actionChoosed == "l":
+            if not myPhone:
+                separator = "-" * 48
+                Error("You don't have any directory.")
             else:
-                print("Invalid input.")
-    elif actionChoosed == "9":
-        if not myPhone:
-            separator = "-" * 48
-            Error(f"You don't have any directory.")
+                Directory.showAllDirectories(myPhone)
+                source = Asking("Enter the directory id holding the contact:")
+                sourceIndex = findDirectory(myPhone, source)
+                if sourceIndex is None:
+                    Error("Invalid input.")
+                else:
+                    for index, contact in enumerate(myPhone[sourceIndex].contacts, start=1):
+                        print(f"{index}: {contact.contactNickname}")
+                    print("\n")
+                    contactNumber = Asking("Enter the ID of the contact you want to share:")
+                    target = Asking("Enter the directory id to share it with:")
+                    if not contactNumber.isdigit():
+                        Error("Invalid input.")
+                    else:
+                        try:
+                            store.update(lambda myPhone: linkRecords(myPhone, target, source, int(contactNumber)))
+                        except ValueError as error:
+                            Error(str(error))
+                        print("\n")
+        elif actionChoosed == "m":
+            print("\n")
+            showMetrics()
+            cache = renderCache.stats()
+            Render(f"\nRendered cards: {cache['renderHits']} hits, {cache['renderMisses']} misses, {cache['renderEvictions']} evictions, {cache['renderEntries']} kept in {cache['renderBytes'] / 1048576:.1f} MiB.")
+            print("\n")
+        elif actionChoosed == "q":
+            return
         else:
-            myPhone = []
-            saveData(myPhone)
-    elif actionChoosed == "q":
-        exit()
-    else:
-        Error("Invalid input.")
+            Error("Invalid input.")
+
+if __name__ == "__main__":
+    sys.exit(main())
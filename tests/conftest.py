@@ -0,0 +1,26 @@
+# Lets the tests import main from the root of the repository, as contacthub.py does, and holds the helpers they share.
+
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+def createRecord(directory, nickname, **fields):
+    """
+    Returns the journal record creating a contact in the directory at the given position.
+
+    The fields not given are those of the first generated contact, see syntheticFields.
+    """
+    values = dict(zip(main.contactFieldNames, main.syntheticFields(0) + (date.today(), date.today())), nickname=nickname, **fields)
+    return ("createContact", directory, tuple(values[name] for name in main.contactFieldNames))
+
+
+def nicknames(myPhone):
+    """
+    Returns the nicknames of the contacts of each directory.
+    """
+    return [[contact.contactNickname for contact in directory.contacts] for directory in myPhone]
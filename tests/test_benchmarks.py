@@ -0,0 +1,40 @@
+import main
+
+
+def records(myPhone):
+    return [[main.contactRecord(contact) for contact in directory.contacts] for directory in myPhone]
+
+
+def test_generatedPhoneBookIsReproducible():
+    first, second = main.generatePhoneBook(5, 300, seed=4), main.generatePhoneBook(5, 300, seed=4)
+    assert records(first) == records(second)
+    assert [directory.directoryName for directory in first] == ["Family", "Work", "Friends", "School", "Sport"]
+    assert sum(len(directory.contacts) for directory in first) == 300
+    assert records(main.generatePhoneBook(5, 300, seed=5)) != records(first)
+
+
+def test_directorySizesAreSkewed():
+    sizes = [len(directory.contacts) for directory in main.generatePhoneBook(8, 5000)]
+    # The first directory gets about a third of the contacts, the last one about a twentieth
+    assert sizes[0] > 3 * sizes[-1]
+
+
+def test_generatedContactsAreValid():
+    for directory in main.generatePhoneBook(3, 200, seed=1):
+        for contact in directory.contacts:
+            assert contact.contactDirectory is directory
+            assert main.normalizePhone(contact.contactPhone) and main.normalizeEmail(contact.contactEmail)
+            assert contact.contactCreatedAt <= contact.contactUpdatedAt
+
+
+def test_coreBenchmarkTimesEveryOperation():
+    results = main.benchmarkCore(sizes=(200,), directoryCount=3, edits=5, traceMemory=False)
+    assert [result["operation"] for result in results] == ["saveData", "saveDataOneDirectory", "loadData", "showAllContacts", "Directory.__str__", "editContact"]
+    assert all(result["size"] == 200 and result["seconds"] >= 0 and result["peakBytes"] is None for result in results)
+
+
+def test_runsAreComparedPathByPath():
+    previous = {"core": [{"size": 10, "operation": "loadData", "seconds": 2.0, "peakBytes": None}], "storage": {"pickle.load": 1.0}, "only": 1}
+    current = {"core": [{"size": 10, "operation": "loadData", "seconds": 1.0, "peakBytes": 100}], "storage": {"pickle.load": 3.0}}
+    assert main.flattenResults(current) == {"core.10.loadData.seconds": 1.0, "core.10.loadData.peakBytes": 100, "storage.pickle.load": 3.0}
+    assert main.compareResults(previous, current) == [("core.10.loadData.seconds", 2.0, 1.0, 0.5), ("storage.pickle.load", 1.0, 3.0, 3.0)]
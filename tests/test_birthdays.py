@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+
+import main
+
+
+def birthdayIndex(*birthdays):
+    directory = main.Directory("Work", date.today(), date.today(), [])
+    directory.contacts.extend(main.Contact(f"c{index}", "", "", "", "", "", birthday, "", date.today(), date.today(), directory) for index, birthday in enumerate(birthdays))
+    index = main.BirthdayIndex()
+    index.build([directory])
+    return index, directory.contacts
+
+
+def upcoming(index, days, today):
+    return [(birthday, contact.contactNickname) for birthday, contact in index.upcoming(days, today)]
+
+
+@pytest.mark.parametrize("birthday", ["14/03/1990", "14-03", "1990-03-14", "19900314", "--0314", "14 mars 1990", "March 14", date(1990, 3, 14)])
+def test_usualFormatsAreRead(birthday):
+    assert main.parseBirthday(birthday) == (3, 14)
+
+
+@pytest.mark.parametrize("birthday", ["", "soon", "31/02", "13/13", "1990"])
+def test_unreadableBirthdaysAreLeftOut(birthday):
+    assert main.parseBirthday(birthday) is None
+    assert birthdayIndex(birthday)[0].days == []
+
+
+def test_rangeWrapsAroundTheEndOfTheYear():
+    index, _ = birthdayIndex("02/01", "30/12", "15/06", "31/12", "03/01")
+    assert upcoming(index, 5, date(2024, 12, 30)) == [(date(2024, 12, 30), "c1"), (date(2024, 12, 31), "c3"), (date(2025, 1, 2), "c0"), (date(2025, 1, 3), "c4")]
+    assert upcoming(index, 3, date(2024, 12, 30)) == [(date(2024, 12, 30), "c1"), (date(2024, 12, 31), "c3")]
+
+
+def test_leapDayBirthdays():
+    index, _ = birthdayIndex("29/02/2000", "01/03", "28/02")
+    assert upcoming(index, 2, date(2024, 2, 28)) == [(date(2024, 2, 28), "c2"), (date(2024, 2, 29), "c0")]
+    # Given on the 1st of March in the other years, whether the range starts before or on it
+    assert upcoming(index, 2, date(2023, 2, 28)) == [(date(2023, 2, 28), "c2"), (date(2023, 3, 1), "c0"), (date(2023, 3, 1), "c1")]
+    assert upcoming(index, 1, date(2023, 3, 1)) == [(date(2023, 3, 1), "c0"), (date(2023, 3, 1), "c1")]
+
+
+def test_wholeYearListsEveryBirthdayOnce():
+    index, contacts = birthdayIndex(*(f"{day:02d}/{month:02d}" for month in range(1, 13) for day in (1, 15)))
+    assert sorted(contact.contactNickname for _, contact in index.upcoming(400, date(2023, 7, 4))) == sorted(contact.contactNickname for contact in contacts)
+
+
+def test_contactEditedInPlaceIsRemovedByItsIndexedDay():
+    index, contacts = birthdayIndex("10/05", "10/05", "11/05")
+    contacts[1].contactBirthday = "01/01"
+    index.remove(contacts[1])
+    index.add(contacts[1])
+    assert upcoming(index, 2, date(2024, 5, 10)) == [(date(2024, 5, 10), "c0"), (date(2024, 5, 11), "c2")]
+    assert upcoming(index, 1, date(2025, 1, 1)) == [(date(2025, 1, 1), "c1")]
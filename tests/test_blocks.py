@@ -0,0 +1,70 @@
+import pickle
+from datetime import date
+
+import pytest
+
+import main
+
+
+def savedDirectory(tmp_path, count):
+    path = str(tmp_path / "myPhone.pkl")
+    directory = main.Directory("Work", date.today(), date.today(), [])
+    directory.contacts.extend(main.Contact(*main.syntheticFields(index), date.today(), date.today(), directory) for index in range(count))
+    main.saveData([directory], path)
+    return path, directory
+
+
+def decodedBlocks(monkeypatch, blocks):
+    numbers = []
+    records = main.ContactBlocks.records
+    monkeypatch.setattr(blocks, "records", lambda number: numbers.append(number) or records(blocks, number))
+    return numbers
+
+
+def test_directoryIsLoadedWithoutDecodingItsContacts(tmp_path, monkeypatch):
+    path, saved = savedDirectory(tmp_path, main.contactBlockSize * 3 + 10)
+    loaded = main.loadData(path)[0]
+    numbers = decodedBlocks(monkeypatch, loaded.contactBlocks)
+    assert "contacts" not in vars(loaded)
+    assert main.Directory.contactCount(loaded) == len(saved.contacts)
+    assert numbers == []
+
+
+def test_pageDecodesOnlyItsBlocks(tmp_path, monkeypatch):
+    path, saved = savedDirectory(tmp_path, main.contactBlockSize * 3 + 10)
+    loaded = main.loadData(path)[0]
+    numbers = decodedBlocks(monkeypatch, loaded.contactBlocks)
+    start = main.contactBlockSize * 2 - 5
+    page = main.Directory.contactSlice(loaded, start, start + 10)
+    assert numbers == [1, 2]
+    assert [main.contactRecord(contact) for contact in page] == [main.contactRecord(contact) for contact in saved.contacts[start:start + 10]]
+    assert [contact.contactId for contact in page] == [contact.contactId for contact in saved.contacts[start:start + 10]]
+    assert all(contact.contactDirectory is loaded for contact in page)
+    assert main.Directory.contactSlice(loaded, len(saved.contacts) - 3, None)[-1].contactId == saved.contacts[-1].contactId
+
+
+def test_contactsAreDecodedOnFirstUse(tmp_path):
+    path, saved = savedDirectory(tmp_path, 300)
+    loaded = main.loadData(path)[0]
+    assert [contact.contactId for contact in loaded.contacts] == [contact.contactId for contact in saved.contacts]
+    assert "contacts" in vars(loaded)
+
+
+def test_corruptedBlockIsOnlyFoundWhenDecoded(tmp_path):
+    path, saved = savedDirectory(tmp_path, main.contactBlockSize * 2)
+    loaded = main.loadData(path)[0]
+    blocks = loaded.contactBlocks
+    offset, length, _ = blocks.blocks[1]
+    with open(blocks.path, "r+b") as file:
+        file.seek(offset + length // 2)
+        file.write(b"\0" * 4)
+    reloaded = main.loadData(path)[0]
+    assert len(main.Directory.contactSlice(reloaded, 0, 10)) == 10
+    with pytest.raises(main.CorruptSnapshotError, match="Block 1"):
+        main.Directory.contactSlice(reloaded, main.contactBlockSize, main.contactBlockSize + 1)
+
+
+def test_blocksAreSmallerThanThePickledContacts(tmp_path):
+    path, saved = savedDirectory(tmp_path, 2000)
+    loaded = main.loadData(path)[0]
+    assert len(loaded.contactBlocks.data) < len(pickle.dumps(saved.contacts)) / 2
@@ -0,0 +1,146 @@
+from datetime import date
+
+import pytest
+
+import main
+from conftest import createRecord, nicknames
+
+
+def newPhoneBook(path, directories=2):
+    store = main.PhoneStore(str(path))
+    store.apply([("createDirectory", f"D{index}", date.today(), date.today()) for index in range(directories)])
+    store.close()
+
+
+def test_emptyCommitKeepsTheJournalPosition(tmp_path):
+    path = tmp_path / "myPhone.pkl"
+    newPhoneBook(path)
+    first, second = main.PhoneStore(str(path)), main.PhoneStore(str(path))
+    second.apply([createRecord(1, "x")])
+    first.apply([createRecord(0, "a")])
+    # Nothing to write, but the record of the other store is replayed on the way
+    second.update(lambda myPhone: [])
+    first.apply([createRecord(1, "b")])
+    second.apply([createRecord(0, "c")])
+    assert nicknames(second.load()) == [["a", "c"], ["x", "b"]]
+    assert nicknames(main.PickleStorage(str(path)).load()) == [["a", "c"], ["x", "b"]]
+    first.close()
+    second.close()
+
+
+def test_staleEditIsRebasedAfterAnotherDelete(tmp_path):
+    path = tmp_path / "myPhone.pkl"
+    newPhoneBook(path)
+    first, second = main.PhoneStore(str(path)), main.PhoneStore(str(path))
+    first.apply([createRecord(0, "a"), createRecord(0, "b")])
+    myPhone = second.load()
+    fields = list(main.contactRecord(myPhone[0].contacts[1]))
+    fields[5] = "edited"
+    first.apply([("deleteContact", 0, 0)])
+    # Made on a copy where "b" is still the second contact
+    second.apply([("editContact", 0, 1, tuple(fields))])
+    assert second.rebases == 1
+    loaded = main.PickleStorage(str(path)).load()
+    assert nicknames(loaded) == [["b"], []]
+    assert loaded[0].contacts[0].contactNotes == "edited"
+    first.close()
+    second.close()
+
+
+def test_editOfADeletedContactConflicts(tmp_path):
+    path = tmp_path / "myPhone.pkl"
+    newPhoneBook(path)
+    first, second = main.PhoneStore(str(path)), main.PhoneStore(str(path))
+    first.apply([createRecord(0, "a")])
+    fields = list(main.contactRecord(second.load()[0].contacts[0]))
+    first.apply([("deleteContact", 0, 0)])
+    with pytest.raises(main.ConflictError):
+        second.apply([("editContact", 0, 0, tuple(fields))])
+    assert second.conflicts == 1
+    # The resident copy was dropped, the next load reads what the other store wrote
+    assert nicknames(second.load()) == [[], []]
+    first.close()
+    second.close()
+
+
+def compactPastTheJournal(store, monkeypatch):
+    # Every append folds the journal, and enough generations are written for the unread segments to be removed
+    monkeypatch.setattr(main, "journalCompactSize", 1)
+    for number in range(main.snapshotGenerations + 1):
+        store.apply([createRecord(1, f"x{number}")])
+        store.storage.waitCompaction()
+    monkeypatch.undo()
+
+
+def test_staleEditIsMovedOntoACompactedPhoneBook(tmp_path, monkeypatch):
+    path = tmp_path / "myPhone.pkl"
+    newPhoneBook(path)
+    first, second = main.PhoneStore(str(path)), main.PhoneStore(str(path))
+    first.apply([createRecord(0, "a"), createRecord(0, "b")])
+    myPhone = second.load()
+    fields = list(main.contactRecord(myPhone[0].contacts[1]))
+    fields[5] = "edited"
+    first.apply([("deleteContact", 0, 0)])
+    compactPastTheJournal(first, monkeypatch)
+    assert second.storage.changes() is None
+    second.apply([("editContact", 0, 1, tuple(fields)), createRecord(1, "y")])
+    assert second.rebases == 1 and second.conflicts == 0
+    expected = [["b"], ["x0", "x1", "x2", "x3", "y"]]
+    assert nicknames(second.load()) == expected
+    loaded = main.PickleStorage(str(path)).load()
+    assert nicknames(loaded) == expected
+    assert loaded[0].contacts[0].contactNotes == "edited"
+    first.close()
+    second.close()
+
+
+def test_changesAreMovedOntoAPhoneBookSavedByAnotherStore(tmp_path):
+    path = tmp_path / "myPhone.pkl"
+    newPhoneBook(path)
+    first, second = main.PhoneStore(str(path)), main.PhoneStore(str(path))
+    first.apply([createRecord(0, "a")])
+    second.load()
+    myPhone = first.load()
+    myPhone.append(main.Directory("D2", date.today(), date.today(), []))
+    first.save(myPhone)
+    second.apply([("editDirectory", 1, "Renamed", date.today()), createRecord(1, "b"), ("createDirectory", "New", date.today(), date.today()), createRecord(2, "c")])
+    assert second.rebases == 1
+    loaded = main.PickleStorage(str(path)).load()
+    assert [directory.directoryName for directory in loaded] == ["D0", "Renamed", "D2", "New"]
+    assert nicknames(loaded) == [["a"], ["b"], [], ["c"]]
+    first.close()
+    second.close()
+
+
+def test_editOfAContactEditedInACompactedPhoneBookConflicts(tmp_path, monkeypatch):
+    path = tmp_path / "myPhone.pkl"
+    newPhoneBook(path)
+    first, second = main.PhoneStore(str(path)), main.PhoneStore(str(path))
+    first.apply([createRecord(0, "a")])
+    fields = list(main.contactRecord(second.load()[0].contacts[0]))
+    first.apply([("editContact", 0, 0, ("theirs",) + tuple(fields[1:]))])
+    compactPastTheJournal(first, monkeypatch)
+    with pytest.raises(main.ConflictError):
+        second.apply([("editContact", 0, 0, ("ours",) + tuple(fields[1:]))])
+    assert nicknames(second.load())[0] == ["theirs"]
+    first.close()
+    second.close()
+
+
+def test_sqliteCommitOfAnotherConnectionIsNoConflict(tmp_path):
+    path = str(tmp_path / "myPhone.db")
+    first, second = main.PhoneStore(path), main.PhoneStore(path)
+    first.apply([("createDirectory", "D0", date.today(), date.today()), createRecord(0, "a"), createRecord(0, "b")])
+    second.load()
+    first.apply([("deleteContact", 0, 0)])
+    second.apply([("deleteContact", 0, 1)])
+    assert nicknames(main.SqliteStorage(path).load()) == [[]]
+    first.close()
+    second.close()
+
+
+def test_concurrentWriterProcessesLoseNothing():
+    result = main.benchmarkConcurrency(processes=4, operations=60, compactSize=2048)
+    assert result["missing"] == 0
+    assert result["unexpected"] == 0
+    assert result["compactions"] > 0
@@ -0,0 +1,59 @@
+import os
+from datetime import date
+
+import main
+from conftest import createRecord, nicknames
+
+
+def phoneBook():
+    return main.generatePhoneBook(3, 600, seed=2)
+
+
+def shardFiles(path):
+    return set(os.listdir(main.shardFolder(path)))
+
+
+def test_onlyTheChangedDirectoriesAreWrittenAgain(tmp_path):
+    path = str(tmp_path / "myPhone.pkl")
+    myPhone, shards = phoneBook(), {}
+    main.saveData(myPhone, path, shards=shards)
+    before = dict(shards)
+    files = shardFiles(path)
+    main.saveData(myPhone, path, shards=shards)
+    assert shards == before and shardFiles(path) == files
+
+    main.applyRecord(myPhone, ("editContact", 1, 0, ("edited",) + main.contactRecord(myPhone[1].contacts[0])[1:]))
+    main.saveData(myPhone, path, shards=shards)
+    assert [shards[directory][1] == before[directory][1] for directory in myPhone] == [True, False, True]
+    assert len(shardFiles(path) - files) == 1
+    assert main.loadData(path)[1].contacts[0].contactNickname == "edited"
+
+
+def test_editsInPlaceMarkTheirDirectories(monkeypatch):
+    first, second = myPhone = [main.Directory(name, date.today(), date.today(), []) for name in ("A", "B")]
+    main.applyRecord(myPhone, createRecord(0, "a"))
+    versions = [directory.directoryVersion for directory in myPhone]
+    answers = ["a2", "", "", "", "", "", "", ""]
+    monkeypatch.setattr(main, "Asking", lambda message: answers.pop(0))
+    monkeypatch.setattr(main, "AskingValid", lambda message, normalizer: answers.pop(0))
+    main.Contact.editContact(first.contacts[0])
+    assert [directory.directoryVersion for directory in myPhone] == [versions[0] + 1, versions[1]]
+    # A shared contact marks every directory holding it
+    main.applyRecord(myPhone, ("linkContact", 1, 0, 0, 0))
+    versions = [directory.directoryVersion for directory in myPhone]
+    main.Contact.touch(first.contacts[0])
+    assert [directory.directoryVersion for directory in myPhone] == [versions[0] + 1, versions[1] + 1]
+
+
+def test_unchangedLazyDirectoriesAreNotDecodedToBeSaved(tmp_path):
+    path = str(tmp_path / "myPhone.pkl")
+    store = main.PhoneStore(path)
+    store.save(phoneBook())
+    store.close()
+    store = main.PhoneStore(path)
+    store.apply([createRecord(2, "new")])
+    store.storage.save(store.load())
+    myPhone = store.load()
+    assert ["contacts" in vars(directory) for directory in myPhone] == [False, False, True]
+    assert nicknames(main.loadData(path))[2][-1] == "new"
+    store.close()
@@ -0,0 +1,79 @@
+from datetime import date
+
+import main
+from conftest import nicknames
+
+
+def contact(directory, nickname, firstName="", lastName="", phone="", email="", notes="", updatedAt=date(2024, 1, 1), createdAt=date(2024, 1, 1)):
+    created = main.Contact(nickname, phone, firstName, lastName, email, notes, "", "", createdAt, updatedAt, directory)
+    directory.contacts.append(created)
+    return created
+
+
+def phoneBook():
+    work, family = (main.Directory(name, date.today(), date.today(), []) for name in ("Work", "Family"))
+    return [work, family]
+
+
+def test_sameContactIsFoundAcrossDirectoriesAndSpellings():
+    work, family = myPhone = phoneBook()
+    old = contact(work, "lea", "Léa", "Dupont", "+33 6 12 34 56 78", createdAt=date(2020, 1, 1))
+    new = contact(family, "leadu", "lea", "DUPONT", "06 12 34 56 78", "lea@example.com", updatedAt=date(2024, 6, 1))
+    contact(work, "other", "Paul", "Martin", "06 99 99 99 99")
+    assert main.findDuplicates(myPhone) == [[new, old]]
+
+
+def test_differentPeopleWithTheSameNameAreNotMerged():
+    work, family = myPhone = phoneBook()
+    contact(work, "a", "Jean", "Martin", "06 11 11 11 11", "jean@a.com")
+    contact(family, "b", "Jean", "Martin", "06 22 22 22 22", "jean@b.com")
+    assert main.findDuplicates(myPhone) == []
+
+
+def test_largeBlocksAreComparedByNeighbours():
+    work, family = myPhone = phoneBook()
+    for index in range(200):
+        contact(work, f"c{index}", "Jean", "Martin", f"06 00 00 {index // 100:02d} {index % 100:02d}")
+    twin = contact(family, "twin", "Jean", "Martin", "06 00 00 00 07")
+    groups = main.findDuplicates(myPhone, maxBlockSize=50)
+    assert [sorted(item.contactNickname for item in group) for group in groups] == [["c7", "twin"]]
+    assert twin in groups[0]
+
+
+def test_sharedContactIsNotItsOwnDuplicate():
+    work, family = myPhone = phoneBook()
+    shared = contact(work, "lea", "Léa", "Dupont", "06 12 34 56 78")
+    family.contacts.append(shared)
+    main.Contact.join(shared, family)
+    assert main.findDuplicates(myPhone) == []
+
+
+def test_mergeKeepsTheNewestValuesAndTheOldestCreation():
+    work, family = myPhone = phoneBook()
+    old = contact(work, "lea", "Léa", "Dupont", "06 12 34 56 78", notes="old notes", createdAt=date(2020, 1, 1))
+    contact(work, "x", "Paul", "Martin")
+    new = contact(family, "leadu", "lea", "DUPONT", "06 12 34 56 78", "lea@example.com", updatedAt=date(2024, 6, 1))
+    records = main.mergeRecords(myPhone, main.findDuplicates(myPhone))
+    assert records[0][:3] == ("editContact", 1, 0)
+    assert records[1:] == [("deleteContact", 0, 0)]
+    for record in records:
+        main.applyRecord(myPhone, record)
+    assert nicknames(myPhone) == [["x"], ["leadu"]]
+    merged = family.contacts[0]
+    assert (merged.contactEmail, merged.contactNotes, merged.contactCreatedAt) == ("lea@example.com", "old notes", date(2020, 1, 1))
+
+
+def test_mergeDuplicatesAsksBeforeEachGroup(tmp_path, monkeypatch):
+    store = main.PhoneStore(str(tmp_path / "myPhone.pkl"))
+    work, family = myPhone = phoneBook()
+    for name in ("Jean", "Paul"):
+        contact(work, name.lower(), name, "Martin", f"06 12 34 56 {len(name)}0")
+        contact(family, name.lower() + "2", name, "Martin", f"06 12 34 56 {len(name)}0")
+    store.save(myPhone)
+    answers = ["n", "y"]
+    monkeypatch.setattr(main, "Asking", lambda message: answers.pop(0))
+    monkeypatch.setattr(main, "Stream", lambda chunks: None)
+    result = main.mergeDuplicates(store)
+    assert (result["groups"], result["merged"], result["removed"]) == (2, 1, 1)
+    assert sorted(sum(nicknames(main.PickleStorage(store.storage.path).load()), [])) == ["jean", "jean2", "paul"]
+    store.close()
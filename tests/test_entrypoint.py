@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The classes of the original main.py, run as a script, so the phone book pickles them as __main__ ones
+baselineWriter = '''
+import pickle, sys
+from datetime import date
+
+class Contact:
+    def __init__(self, nickname, phone, firstName, lastName, email, notes, birthday, adress, createdAt, updatedAt, directory):
+        self.contactNickname = nickname
+        self.contactPhone = phone
+        self.contactFirstName = firstName
+        self.contactLastName = lastName
+        self.contactEmail = email
+        self.contactNotes = notes
+        self.contactBirthday = birthday
+        self.contactAddress = adress
+        self.contactCreatedAt = createdAt
+        self.contactUpdatedAt = updatedAt
+        self.contactDirectory = directory
+
+class Directory:
+    def __init__(self, name, date, update, contacts=[]):
+        self.directoryName = name
+        self.directoryCreatedAt = date
+        self.directoryUpdatedAt = update
+        self.contacts = contacts
+
+work = Directory("Work", date(2023, 1, 2), date(2023, 1, 2), [])
+work.contacts.append(Contact("bob", "0612345678", "Bob", "Martin", "bob@example.com", "", "01/02/1990", "1 rue de la Paix", date(2023, 1, 2), date(2023, 1, 2), work))
+with open(sys.argv[1], "wb") as file:
+    pickle.dump([work], file)
+'''
+
+
+def run(script, *arguments):
+    return subprocess.run([sys.executable, os.path.join(root, script), *arguments], capture_output=True, text=True, timeout=60)
+
+
+def listedNicknames(path):
+    result = run("contacthub.py", "--data", path, "list", "--json")
+    assert result.returncode == 0, result.stdout + result.stderr
+    return [json.loads(line)["nickname"] for line in result.stdout.splitlines() if line.strip()]
+
+
+def test_baselinePhoneBookLoadsThroughTheEntryPoint(tmp_path):
+    path = str(tmp_path / "myPhone.pkl")
+    writer = tmp_path / "baseline.py"
+    writer.write_text(baselineWriter)
+    subprocess.run([sys.executable, str(writer), path], check=True, timeout=60)
+    assert listedNicknames(path) == ["bob"]
+    # Upgraded by main.py run as a script, then read through contacthub.py again
+    result = run("main.py", "--data", path, "add", "Work", "--nickname", "amy")
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert listedNicknames(path) == ["bob", "amy"]
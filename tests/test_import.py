@@ -0,0 +1,52 @@
+from datetime import date
+
+import pytest
+
+import main
+
+contacts = [
+    ("ann", "+33612345678", "Anne-Laure", "Dupré", "ann@example.com", "Met at the \"Café\", then lunch; again", "1990-03-14", "1 rue de la Paix, 75002 Paris"),
+    ("bob", "+33700000000", "Bob", "Martin", "bob@example.com", "", "--12-25", "2 place Bellecour, 69002 Lyon"),
+    ("zoé", "", "Zoé", "", "", "two\nlines", "", ""),
+]
+
+
+def phoneBook(tmp_path, name):
+    store = main.PhoneStore(str(tmp_path / name))
+    store.apply([("createDirectory", "Work", date.today(), date.today()), ("createDirectory", "Family", date.today(), date.today())])
+    return store
+
+
+def fields(myPhone):
+    return sorted((directory.directoryName, *main.contactRecord(contact)[:8]) for directory in myPhone for contact in directory.contacts)
+
+
+@pytest.mark.parametrize("fileName, vCardVersion, processes", [
+    ("contacts.csv", "4.0", 0),
+    ("contacts.jsonl", "4.0", 0),
+    ("contacts.vcf", "4.0", 0),
+    ("contacts.vcf", "3.0", 0),
+    ("contacts.jsonl", "4.0", 2),
+])
+def test_exportedContactsImportTheSame(tmp_path, fileName, vCardVersion, processes):
+    source = phoneBook(tmp_path, "source.pkl")
+    source.apply([("createContact", index % 2, values + (date.today(), date.today())) for index, values in enumerate(contacts)])
+    path = str(tmp_path / fileName)
+    assert main.exportContacts(source.load(), path, vCardVersion)["contacts"] == len(contacts)
+
+    target = main.PhoneStore(str(tmp_path / "target.pkl"))
+    result = main.importContacts(target, path, batchSize=2, processes=processes)
+    assert result["contacts"] == len(contacts)
+    assert result["invalid"] == 0
+    assert fields(target.load()) == fields(source.load())
+    source.close()
+    target.close()
+
+
+def test_jsonLineThatIsNotAnObjectIsRejected(tmp_path):
+    path = tmp_path / "contacts.jsonl"
+    path.write_text('{"nickname": "ann"}\n\n[1, 2]\n', encoding="utf-8")
+    store = main.PhoneStore(str(tmp_path / "myPhone.pkl"))
+    with pytest.raises(ValueError, match="Line 3: expected a JSON object, not list"):
+        main.importContacts(store, str(path))
+    store.close()
@@ -0,0 +1,55 @@
+import os
+import threading
+from datetime import date
+
+import main
+from conftest import createRecord, nicknames
+
+
+class RecordingCache(main.RenderCache):
+    def __init__(self):
+        super().__init__(1 << 20)
+        self.threads = set()
+
+    def discard(self, key):
+        self.threads.add(threading.current_thread())
+        super().discard(key)
+
+    def clear(self):
+        self.threads.add(threading.current_thread())
+        super().clear()
+
+
+def test_compactionLeavesTheRenderCacheAlone(tmp_path, monkeypatch):
+    cache = RecordingCache()
+    monkeypatch.setattr(main, "renderCache", cache)
+    path = str(tmp_path / "myPhone.pkl")
+    storage = main.PickleStorage(path)
+    storage.applyMany([("createDirectory", name, date.today(), date.today()) for name in ("A", "B")])
+    storage.applyMany([createRecord(index % 2, f"c{index}") for index in range(10)])
+    storage.applyMany([("deleteContact", 0, 0), ("editContact", 1, 0, ("e",) + main.syntheticFields(1)[1:] + (date.today(), date.today())), ("deleteDirectory", 0), ("deleteAllDirectories",)])
+    # The next append folds every record above into a snapshot, in the background
+    monkeypatch.setattr(main, "journalCompactSize", 1)
+    storage.applyMany([("createDirectory", "C", date.today(), date.today())])
+    storage.waitCompaction()
+    assert main.PickleStorage(path).load()[0].directoryName == "C"
+    assert storage.compactions and not cache.threads - {threading.main_thread()}
+
+
+def test_tornTailIsIgnoredThenOverwritten(tmp_path):
+    path = str(tmp_path / "myPhone.pkl")
+    storage = main.PickleStorage(path)
+    storage.applyMany([("createDirectory", "A", date.today(), date.today()), createRecord(0, "a"), createRecord(0, "b")])
+    segment = main.journalPath(path, storage.segment)
+    storage.close()
+    # A crash in the middle of an append leaves part of a record behind
+    torn = main.journalEntry(createRecord(0, "torn"))
+    with open(segment, "ab") as file:
+        file.write(torn[:len(torn) // 2])
+    reopened = main.PickleStorage(path)
+    assert nicknames(reopened.load()) == [["a", "b"]]
+    reopened.applyMany([createRecord(0, "c")])
+    reopened.close()
+    records, offset = main.readJournal(segment)
+    assert offset == os.path.getsize(segment) and records[-1][2][0] == "c"
+    assert nicknames(main.loadData(path)) == [["a", "b", "c"]]
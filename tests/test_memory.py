@@ -0,0 +1,56 @@
+from datetime import date
+
+import main
+
+
+def answering(monkeypatch, answers):
+    answers = list(answers)
+    monkeypatch.setattr(main, "Asking", lambda message: answers.pop(0))
+    monkeypatch.setattr(main, "AskingValid", lambda message, normalizer: normalizer(answers.pop(0)))
+
+
+def test_editedContactSharesItsRepeatedValues(monkeypatch):
+    directory = main.Directory("Work", date.today(), date.today(), [])
+    # Built at run time, so they are equal to the stored values but not the same objects
+    notes, birthday = "".join(["call", " back"]), "".join(["1990-05", "-17"])
+    kept = main.Contact("kept", "", "", "", "", notes, birthday, "", date.today(), date.today(), directory)
+    edited = main.Contact("edited", "", "", "", "", "", "", "", date.today(), date.today(), directory)
+    answering(monkeypatch, ["edited", "", "", "", "", "".join(["call", " back"]), "".join(["1990-05", "-17"]), ""])
+    main.Contact.editContact(edited)
+    assert edited.contactNotes is kept.contactNotes
+    assert edited.contactBirthday is kept.contactBirthday
+    assert edited.contactUpdatedAt is kept.contactUpdatedAt
+
+
+def test_contactHasNoInstanceDictionary():
+    directory = main.Directory("Work", date.today(), date.today(), [])
+    contact = main.Contact(*main.syntheticFields(1), date.today(), date.today(), directory)
+    assert not hasattr(contact, "__dict__")
+
+
+def test_repeatedValuesAreSharedAcrossContacts():
+    directory = main.Directory("Work", date.today(), date.today(), [])
+    first, second = (main.Contact("a", "", "", "", "", "".join(["no", "tes"]), "".join(["--05", "-17"]), "", date(2024, 5, 17), date(2024, 5, 17), directory) for _ in range(2))
+    assert first.contactNotes is second.contactNotes
+    assert first.contactBirthday is second.contactBirthday
+    assert first.contactCreatedAt is second.contactUpdatedAt is second.contactCreatedAt
+
+
+def test_contactPickledWithADictionaryIsRestored():
+    # The state of the contacts pickled before __slots__
+    state = {"contactNickname": "old", "contactPhone": "0601020304", "contactNotes": "".join(["no", "tes"]), "contactCreatedAt": date(2020, 1, 1), "contactUpdatedAt": date(2020, 1, 1)}
+    contact = main.Contact.__new__(main.Contact)
+    contact.__setstate__(state)
+    assert contact.contactNickname == "old" and contact.contactEmail is None
+    assert contact.contactId is None and contact.contactDirectories is None and contact.contactVersion == 0
+    assert contact.contactNotes is main.internValue("notes")
+
+
+def test_stateRoundTripsWithoutTheProcessOnlyFields(tmp_path):
+    directory = main.Directory("Work", date.today(), date.today(), [])
+    contact = main.Contact(*main.syntheticFields(3), date.today(), date.today(), directory)
+    contact.contactVersion = 5
+    restored = main.Contact.__new__(main.Contact)
+    restored.__setstate__(contact.__getstate__())
+    assert main.contactRecord(restored) == main.contactRecord(contact) and restored.contactId == contact.contactId
+    assert restored.contactVersion == 0 and restored.contactDirectory is directory
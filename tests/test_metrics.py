@@ -0,0 +1,76 @@
+import json
+import time
+from datetime import date
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    monkeypatch.setattr(main, "operationMetrics", {})
+    monkeypatch.setattr(main, "metricsEnabled", False)
+    monkeypatch.setattr(main, "profileMode", None)
+    return main.operationMetrics
+
+
+def test_percentilesAreBucketBoundsCappedByTheMaximum():
+    histogram = main.LatencyHistogram()
+    assert histogram.percentile(0.5) == 0.0
+    for _ in range(100):
+        histogram.add(0.001)
+    histogram.add(0.5)
+    # 1000 microseconds fall in the bucket up to 1024
+    assert histogram.percentile(0.5) == histogram.percentile(0.99) == 1024 / 1e6
+    assert histogram.percentile(1.0) == 0.5
+    summary = histogram.summary()
+    assert (summary["count"], summary["max"]) == (101, 0.5)
+    assert summary["mean"] == pytest.approx((100 * 0.001 + 0.5) / 101)
+    assert "peakBytes" not in summary
+
+
+def test_timersCostNothingWhenOff(metrics):
+    assert main.timed("load") is main.noTimer
+    with main.timed("load"):
+        pass
+    assert metrics == {}
+
+
+def test_nestedOperationsAreTimedEach(metrics):
+    main.enableMetrics()
+    with main.timed("outer"):
+        with main.timed("inner"):
+            time.sleep(0.002)
+    report = main.metricsReport()
+    assert list(report) == ["inner", "outer"]
+    assert report["outer"]["total"] >= report["inner"]["total"] >= 0.002
+
+
+def test_unknownProfilingModeIsRejected(metrics):
+    with pytest.raises(ValueError, match="Unknown profiling mode"):
+        main.enableMetrics("perf")
+
+
+def test_tracemallocModeCapturesThePeakOfTheOutermostOperation(metrics):
+    main.enableMetrics("tracemalloc")
+    with main.timed("allocate"):
+        with main.timed("inner"):
+            data = bytearray(4 << 20)
+        del data
+    report = main.metricsReport()
+    assert report["allocate"]["peakBytes"] >= 4 << 20
+    assert "peakBytes" not in report["inner"]
+
+
+def test_cprofileModeDumpsTheSlowestFunctions(metrics, tmp_path):
+    main.enableMetrics("cprofile")
+    store = main.PhoneStore(str(tmp_path / "myPhone.pkl"))
+    store.apply([("createDirectory", "Work", date.today(), date.today())])
+    store.close()
+    path = tmp_path / "metrics.json"
+    main.dumpMetrics(str(path), {"contacts": 0})
+    dump = json.loads(path.read_text())
+    assert dump["profileMode"] == "cprofile" and dump["contacts"] == 0
+    assert dump["operations"]["commit"]["count"] == 1
+    assert any("profile" in summary for summary in dump["operations"].values())
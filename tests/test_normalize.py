@@ -0,0 +1,91 @@
+from datetime import date
+
+import pytest
+
+import main
+from conftest import createRecord
+
+
+@pytest.mark.parametrize("phone, expected", [
+    ("06 12 34 56 78", "+33612345678"),
+    ("0033 6 12 34 56 78", "+33612345678"),
+    ("+33 (0)6 12-34.56/78", "+33612345678"),
+    ("612345678", "+33612345678"),
+    ("+1 (415) 555-0100", "+14155550100"),
+    ("  ", ""),
+])
+def test_phoneIsCanonicalized(phone, expected):
+    assert main.normalizePhone(phone) == expected
+
+
+def test_nationalPhoneTakesTheGivenCountryCode():
+    assert main.normalizePhone("06 12 34 56 78", "32") == "+32612345678"
+
+
+@pytest.mark.parametrize("phone", ["06 12 AB 56 78", "123", "+1234567890123456"])
+def test_invalidPhoneIsRejected(phone):
+    with pytest.raises(ValueError, match="Invalid phone number"):
+        main.normalizePhone(phone)
+
+
+@pytest.mark.parametrize("email, expected", [(" Lea.Dupont@Example.COM ", "lea.dupont@example.com"), ("mailto:a@b.fr", "a@b.fr"), ("", "")])
+def test_emailIsTrimmedAndLowercased(email, expected):
+    assert main.normalizeEmail(email) == expected
+
+
+@pytest.mark.parametrize("email", ["lea", "lea@", "a@b", "a@@b.fr", "a b@c.fr"])
+def test_invalidEmailIsRejected(email):
+    with pytest.raises(ValueError, match="Invalid email"):
+        main.normalizeEmail(email)
+
+
+@pytest.mark.parametrize("birthday, expected", [
+    ("14/03/1990", "1990-03-14"),
+    ("19900314", "1990-03-14"),
+    ("14 mars 1990", "1990-03-14"),
+    ("14-03", "--03-14"),
+    ("--0314", "--03-14"),
+    ("29/02", "--02-29"),
+    (date(1990, 3, 14), "1990-03-14"),
+    ("", ""),
+])
+def test_birthdayIsCanonicalized(birthday, expected):
+    assert main.normalizeBirthday(birthday) == expected
+
+
+def test_twoDigitYearIsInTheLastHundredYears():
+    assert main.normalizeBirthday("14/03/90") == "1990-03-14"
+    assert main.normalizeBirthday(f"14/03/{date.today().year % 100:02d}") == f"{date.today().year}-03-14"
+
+
+@pytest.mark.parametrize("birthday", ["someday", "29/02/2023", "31/04/1990"])
+def test_invalidBirthdayIsRejected(birthday):
+    with pytest.raises(ValueError, match="Invalid birthday"):
+        main.normalizeBirthday(birthday)
+
+
+def test_addressIsPutOnOneLine():
+    assert main.normalizeAddress("  12 rue de la Paix ,\n 75002   Paris ") == "12 rue de la Paix, 75002 Paris"
+
+
+def test_invalidFieldsAreKeptWhenNotStrict():
+    fields = {"nickname": "lea", "phone": "06 12 34 56 78", "email": "nope", "birthday": "14/03/1990", "notes": None}
+    with pytest.raises(ValueError, match="Invalid email"):
+        main.normalizeFields(fields)
+    normalized, invalid = main.normalizeFields(fields, strict=False)
+    assert invalid == ["email"]
+    assert normalized == {"nickname": "lea", "phone": "+33612345678", "email": "nope", "birthday": "1990-03-14", "notes": None}
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_phoneBookIsNormalizedInChunks(tmp_path, processes):
+    store = main.PhoneStore(str(tmp_path / "myPhone.pkl"))
+    store.apply([("createDirectory", "Work", date.today(), date.today())] + [createRecord(0, f"c{index}", phone=f"06 12 34 56 {index:02d}") for index in range(7)] + [createRecord(0, "bad", email="nope")])
+    result = main.normalizePhoneBook(store, processes=processes, chunkSize=3)
+    assert (result["contacts"], result["invalid"]) == (8, 1)
+    assert result["normalized"] == 8
+    myPhone = main.PickleStorage(store.storage.path).load()
+    assert [contact.contactPhone for contact in myPhone[0].contacts[:3]] == ["+33612345600", "+33612345601", "+33612345602"]
+    assert myPhone[0].contacts[-1].contactEmail == "nope"
+    assert main.normalizePhoneBook(store, processes=processes)["normalized"] == 0
+    store.close()
@@ -0,0 +1,51 @@
+from datetime import date
+
+import main
+
+
+def paginate(monkeypatch, count, answers, size=20):
+    answers, pages = list(answers), []
+    monkeypatch.setattr(main, "pageSize", size)
+    monkeypatch.setattr(main, "Asking", lambda message: answers.pop(0))
+    monkeypatch.setattr(main, "Error", lambda message: pages.append("error"))
+    returned = main.Paginate(count, lambda start, stop: pages.append((start, stop)) or [])
+    assert not answers
+    return returned, pages
+
+
+def test_singlePageIsShownWithoutAsking(monkeypatch):
+    assert paginate(monkeypatch, 5, []) == (True, [(0, 5)])
+    assert paginate(monkeypatch, 0, []) == (True, [(0, 0)])
+
+
+def test_pagesStayWithinTheBounds(monkeypatch):
+    returned, pages = paginate(monkeypatch, 45, ["p", "n", "n", "j 4", "j 0", "p", "j 3", "n"])
+    assert returned
+    assert pages == [(0, 20), (0, 20), (20, 40), (40, 45), "error", (40, 45), "error", (40, 45), (20, 40), (40, 45)]
+
+
+def test_pageSizeChangeKeepsThePosition(monkeypatch):
+    returned, pages = paginate(monkeypatch, 100, ["n", "n", "s 7", "s 0", "b"])
+    assert not returned
+    assert pages == [(0, 20), (20, 40), (40, 60), (35, 42), "error", (35, 42)]
+    assert main.pageSize == 7
+
+
+def test_sliceCrossesTheDirectories():
+    directories = []
+    for name, count in (("A", 3), ("B", 0), ("C", 4)):
+        directory = main.Directory(name, date.today(), date.today(), [])
+        directory.contacts.extend(main.Contact(f"{name}{index}", "", "", "", "", "", "", "", date.today(), date.today(), directory) for index in range(count))
+        directories.append(directory)
+    nicknames = lambda start, stop: [contact.contactNickname for contact in main.sliceContacts(directories, start, stop)]
+    assert nicknames(2, 5) == ["A2", "C0", "C1"]
+    assert nicknames(0, 100) == ["A0", "A1", "A2", "C0", "C1", "C2", "C3"]
+    assert nicknames(6, 6) == [] and nicknames(10, 20) == []
+
+
+def test_directoryRendersOnlyThePage():
+    directory = main.Directory("Work", date.today(), date.today(), [])
+    directory.contacts.extend(main.Contact(f"c{index}", "", "", "", "", "", "", "", date.today(), date.today(), directory) for index in range(30))
+    page = "".join(main.Directory.render(directory, 10, 12))
+    assert "   11:\n" in page and "   12:\n" in page and "   10:\n" not in page and "   13:\n" not in page
+    assert "Nickname: c10" in page and "Nickname: c12" not in page
@@ -0,0 +1,102 @@
+from datetime import date
+
+import main
+from conftest import createRecord
+
+
+def phoneStore(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "renderCache", main.RenderCache(1 << 20))
+    store = main.PhoneStore(str(tmp_path / "myPhone.pkl"))
+    store.apply([("createDirectory", name, date.today(), date.today()) for name in ("Work", "Family")] + [createRecord(index % 2, f"c{index}") for index in range(6)])
+    return store
+
+
+def runMenu(monkeypatch, store, answers):
+    answers = list(answers)
+    monkeypatch.setattr(main, "Asking", lambda message: answers.pop(0))
+    main.interactiveMenu(store)
+
+
+def test_menuDeletingDirectoriesDropsTheirCards(tmp_path, monkeypatch, capsys):
+    store = phoneStore(tmp_path, monkeypatch)
+    work, family = store.load()
+    "".join(main.Directory.render(work))
+    "".join(main.Directory.render(family))
+    runMenu(monkeypatch, store, ["4", "1", "q"])
+    assert work not in main.renderCache.entries and family in main.renderCache.entries
+    runMenu(monkeypatch, store, ["5", "q"])
+    assert not main.renderCache.entries
+    store.close()
+
+
+def test_pageOfALazyDirectoryShownTwiceIsCached(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "renderCache", main.RenderCache(1 << 20))
+    path = str(tmp_path / "myPhone.pkl")
+    directory = main.Directory("Work", date.today(), date.today(), [])
+    directory.contacts.extend(main.Contact(*main.syntheticFields(index), date.today(), date.today(), directory) for index in range(600))
+    main.saveData([directory], path)
+    loaded = main.loadData(path)[0]
+    assert "contacts" not in vars(loaded)
+    first = "".join(main.Directory.render(loaded, 300, 320))
+    misses = main.renderCache.misses
+    assert "".join(main.Directory.render(loaded, 300, 320)) == first
+    assert main.renderCache.misses == misses and main.renderCache.hits >= 21
+    # Decoding the whole directory afterwards keeps the contacts of the page
+    page = main.Directory.contactSlice(loaded, 300, 320)
+    assert all(a is b for a, b in zip(loaded.contacts[300:320], page)) and not loaded.contactBlocks.decoded
+
+
+def test_onlyTheLastBlocksStayDecoded(tmp_path):
+    path = str(tmp_path / "myPhone.pkl")
+    directory = main.Directory("Work", date.today(), date.today(), [])
+    directory.contacts.extend(main.Contact(*main.syntheticFields(index), date.today(), date.today(), directory) for index in range(main.contactBlockSize * (main.decodedBlockCount + 2)))
+    main.saveData([directory], path)
+    loaded = main.loadData(path)[0]
+    first = main.Directory.contactSlice(loaded, 0, 1)[0]
+    for number in range(1, main.decodedBlockCount + 2):
+        main.Directory.contactSlice(loaded, number * main.contactBlockSize, number * main.contactBlockSize + 1)
+    assert len(loaded.contactBlocks.decoded) == main.decodedBlockCount
+    assert main.Directory.contactSlice(loaded, 0, 1)[0] is not first
+
+
+def test_cardIsRenderedAgainAfterAnEditOrRename(monkeypatch):
+    monkeypatch.setattr(main, "renderCache", main.RenderCache(1 << 20))
+    myPhone = [main.Directory("Work", date.today(), date.today(), [])]
+    main.applyRecord(myPhone, createRecord(0, "a"))
+    contact = myPhone[0].contacts[0]
+    assert "Nickname: a" in str(contact) and str(contact) is str(contact)
+    contact.contactNickname = "b"
+    main.Contact.touch(contact)
+    assert "Nickname: b" in str(contact)
+    main.applyRecord(myPhone, ("editDirectory", 0, "Office", date.today()))
+    assert "Directory: Office" in str(contact)
+    assert "Directory Name:\x1b[0m Office" in "".join(main.Directory.render(myPhone[0]))
+
+
+def test_replacedAndDeletedContactsLeaveTheCache(monkeypatch):
+    monkeypatch.setattr(main, "renderCache", main.RenderCache(1 << 20))
+    myPhone = [main.Directory("Work", date.today(), date.today(), [])]
+    main.applyRecord(myPhone, createRecord(0, "a"))
+    main.applyRecord(myPhone, createRecord(0, "b"))
+    edited, deleted = myPhone[0].contacts
+    "".join(main.Directory.render(myPhone[0]))
+    str(edited)
+    assert {edited, (edited, "indented"), deleted, (deleted, "indented")} <= set(main.renderCache.entries)
+    main.applyRecord(myPhone, ("editContact", 0, 0, ("c",) + main.contactRecord(edited)[1:]))
+    main.applyRecord(myPhone, ("deleteContact", 0, 1))
+    assert not {edited, (edited, "indented"), deleted, (deleted, "indented")} & set(main.renderCache.entries)
+    assert "Nickname: c" in "".join(main.Directory.render(myPhone[0]))
+
+
+def test_leastRecentlyUsedCardsAreEvictedBeyondTheLimit(monkeypatch):
+    cache = main.RenderCache(3 * (main.RenderCache.entryOverhead + 100))
+    for key in "abcd":
+        cache.get(key, 0, lambda: "x" * 40)
+    assert list(cache.entries) == ["b", "c", "d"] and cache.evictions == 1
+    cache.get("b", 0, lambda: "y")
+    cache.get("e", 0, lambda: "x" * 40)
+    assert list(cache.entries) == ["d", "b", "e"]
+    cache.resize(0)
+    assert not cache.entries and cache.size == 0
+    cache.get("a", 0, lambda: "x")
+    assert not cache.entries and cache.stats()["renderMisses"] == 6
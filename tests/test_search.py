@@ -0,0 +1,41 @@
+import main
+
+
+def nicknames(contacts):
+    return [contact.contactNickname for contact in contacts]
+
+
+def searchIndex(count=2000):
+    myPhone = main.generatePhoneBook(3, count)
+    index = main.SearchIndex()
+    index.build(myPhone)
+    return myPhone, index
+
+
+def test_shortQueryOnlyMatchesNamesAndPhones():
+    myPhone, index = searchIndex()
+    # Every address is in Lyon, but a query shorter than a trigram is not looked for in them
+    assert index.search("ly") == []
+    found = index.search("ma")
+    assert found
+    assert all(any(word.startswith("ma") for word in f"{contact.contactNickname} {contact.contactFirstName} {contact.contactLastName}".lower().split()) for contact in found)
+
+
+def test_limitReturnsTheFirstResultsInOrder():
+    myPhone, index = searchIndex()
+    everything = index.search("rue")
+    assert len(everything) > 100
+    assert nicknames(index.search("rue", 20)) == nicknames(everything[:20])
+    assert nicknames(index.search("ma", 5)) == nicknames(index.search("ma")[:5])
+
+
+def test_editedContactIsOrderedByItsNewName():
+    myPhone, index = searchIndex(50)
+    contact = myPhone[0].contacts[0]
+    values = list(main.contactRecord(contact))
+    values[3] = "Aaaa"
+    record = ("editContact", 0, 0, tuple(values))
+    removed = main.removedBy(myPhone, record)
+    main.applyRecord(myPhone, record)
+    index.update(myPhone, record, removed)
+    assert index.search("rue", 1)[0] is myPhone[0].contacts[0]
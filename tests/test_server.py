@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from datetime import date
+
+import pytest
+
+import main
+from conftest import createRecord, nicknames
+
+
+@pytest.fixture
+def server(tmp_path):
+    store = main.PhoneStore(str(tmp_path / "myPhone.pkl"))
+    store.apply([("createDirectory", "Work", date.today(), date.today())])
+    loop = asyncio.new_event_loop()
+    contactServer = main.ContactServer(store)
+    address = loop.run_until_complete(contactServer.start("127.0.0.1:0"))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield store, loop, contactServer, address
+    asyncio.run_coroutine_threadsafe(contactServer.close(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(10)
+    loop.close()
+    store.close()
+
+
+def test_fieldThatIsNotTextIsRejected(server):
+    store, loop, contactServer, address = server
+    with main.ContactClient(address, timeout=10) as client:
+        with pytest.raises(ValueError, match="lastName must be text"):
+            client.call("add", directory="Work", nickname="bad", lastName=["x"])
+        assert client.call("add", directory="Work", nickname="good") == {"records": 1}
+    assert nicknames(store.load()) == [["good"]]
+
+
+def test_failingUpdateLeavesTheWriterRunning(server):
+    store, loop, contactServer, address = server
+
+    def failing(myPhone):
+        raise TypeError("broken update")
+
+    with pytest.raises(TypeError):
+        asyncio.run_coroutine_threadsafe(contactServer.write(failing), loop).result(10)
+    with main.ContactClient(address, timeout=10) as client:
+        assert client.call("add", directory="Work", nickname="after") == {"records": 1}
+    assert nicknames(main.PickleStorage(store.storage.path).load()) == [["after"]]
+
+
+def test_builderFailingToStageIsRolledBackAlone(tmp_path):
+    store = main.PhoneStore(str(tmp_path / "myPhone.pkl"))
+    store.apply([("createDirectory", "Work", date.today(), date.today())])
+    store.sortedContacts("name")
+    results = store.updateMany([
+        lambda myPhone: [createRecord(0, "unsortable", lastName=["x"])],
+        lambda myPhone: [createRecord(0, "half"), ("deleteContact", 0, 99)],
+        lambda myPhone: [createRecord(0, "kept")],
+    ])
+    assert isinstance(results[0], TypeError)
+    assert isinstance(results[1], IndexError)
+    assert results[2] == [createRecord(0, "kept")]
+    assert nicknames(store.load()) == [["kept"]]
+    assert nicknames(main.PickleStorage(store.storage.path).load()) == [["kept"]]
+    assert [contact.contactNickname for contact in store.sortedContacts("name")[1]] == ["kept"]
+    store.close()
+
+
+def test_readsAreAnsweredWhileAnotherProcessHoldsTheWriteLock(server):
+    store, loop, contactServer, address = server
+    written = []
+    with main.ContactClient(address, timeout=10) as client:
+        # A lock of its own on the same file, as another process would hold it
+        with main.FileLock(main.lockPath(store.storage.path)):
+            adding = threading.Thread(target=lambda: written.append(client.call("add", directory="Work", nickname="late")))
+            adding.start()
+            # Long enough for the update to be waiting for the lock
+            time.sleep(0.2)
+            with main.ContactClient(address, timeout=2) as reader:
+                assert reader.call("directories")[0]["name"] == "Work"
+            assert not written
+        adding.join(10)
+        assert written == [{"records": 1}]
+    assert nicknames(store.load()) == [["late"]]
+
+
+def test_eventLoopIsNotHeldByACommitBeingFlushed(server, monkeypatch):
+    store, loop, contactServer, address = server
+    applyMany = store.storage.applyMany
+    flushing = threading.Event()
+
+    def slowApplyMany(records):
+        flushing.set()
+        # As long as a slow disk takes to flush
+        time.sleep(0.5)
+        applyMany(records)
+
+    monkeypatch.setattr(store.storage, "applyMany", slowApplyMany)
+    with main.ContactClient(address, timeout=10) as writer, main.ContactClient(address, timeout=10) as reader:
+        adding = threading.Thread(target=lambda: writer.call("add", directory="Work", nickname="slow"))
+        adding.start()
+        assert flushing.wait(5)
+        reading = threading.Thread(target=lambda: reader.call("directories"))
+        reading.start()
+        time.sleep(0.05)
+        # The read waits for the commit, the event loop does not
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(0.2)
+        adding.join(10)
+        reading.join(10)
+    assert nicknames(store.load()) == [["slow"]]
+
+
+def test_fileLockIsExclusiveAcrossThreads(tmp_path):
+    lock = main.FileLock(str(tmp_path / "myPhone.lock"))
+    acquired = threading.Event()
+
+    def acquire():
+        with lock:
+            acquired.set()
+
+    with lock, lock:
+        waiting = threading.Thread(target=acquire)
+        waiting.start()
+        assert not acquired.wait(0.2)
+    assert acquired.wait(5)
+    waiting.join(5)
+    assert lock.depth == 0 and lock.file is None
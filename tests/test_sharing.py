@@ -0,0 +1,79 @@
+from datetime import date
+
+import pytest
+
+import main
+from conftest import createRecord, nicknames
+
+
+def phoneBook(*names):
+    return [main.Directory(name, date.today(), date.today(), []) for name in names]
+
+
+def test_sharedContactKeepsItsIdentityAcrossASnapshot(tmp_path):
+    path = str(tmp_path / "myPhone.pkl")
+    myPhone = phoneBook("Work", "Family", "Sport")
+    main.applyRecord(myPhone, createRecord(0, "lea"))
+    main.applyRecord(myPhone, ("linkContact", 1, 0, 0, 0))
+    main.applyRecord(myPhone, ("linkContact", 2, 0, 0, 0))
+    main.saveData(myPhone, path)
+    work, family, sport = main.loadSnapshot(path)[0]
+    lea = work.contacts[0]
+    assert family.contacts[0] is lea and sport.contacts[0] is lea
+    assert list(main.Contact.directories(lea)) == [work, family, sport]
+    assert lea.contactDirectory is work
+    # Deleting it from the directory storing it leaves it in the others, saved from the next one
+    main.applyRecord([work, family, sport], ("deleteContact", 0, 0))
+    assert list(main.Contact.directories(lea)) == [family, sport] and lea.contactDirectory is family
+    main.saveData([work, family, sport], path)
+    myPhone = main.loadSnapshot(path)[0]
+    assert nicknames(myPhone) == [[], ["lea"], ["lea"]]
+    assert myPhone[1].contacts[0] is myPhone[2].contacts[0]
+    # Left in a single directory, it is no longer shared
+    main.applyRecord(myPhone, ("deleteContact", 2, 0))
+    assert myPhone[1].contacts[0].contactDirectories is None
+    main.saveData(myPhone, path)
+    assert nicknames(main.loadSnapshot(path)[0]) == [[], ["lea"], []]
+
+
+def test_linkingIntoADirectoryAlreadyHoldingTheContactFails():
+    myPhone = phoneBook("Work", "Family")
+    main.applyRecord(myPhone, createRecord(0, "lea"))
+    main.applyRecord(myPhone, ("linkContact", 1, 0, 0, 0))
+    with pytest.raises(ValueError):
+        main.linkRecords(myPhone, "Family", "Work", 1)
+    with pytest.raises(ValueError):
+        main.applyRecord(myPhone, ("linkContact", 0, 1, 1, 0))
+    assert nicknames(myPhone) == [["lea"], ["lea"]]
+
+
+def test_copiesAreMergedIntoASharedContact(tmp_path):
+    path = str(tmp_path / "myPhone.pkl")
+    store = main.PhoneStore(path)
+    store.save(phoneBook("Work", "Family", "Sport"))
+    store.apply([createRecord(0, "lea"), createRecord(0, "max"), createRecord(1, "bob"), createRecord(1, "lea"), createRecord(2, "lea")])
+    assert main.shareContacts(store, dryRun=True)["copies"] == 2
+    assert list(map(main.Directory.contactCount, store.load())) == [2, 2, 1]
+    summary = main.shareContacts(store)
+    assert (summary["contacts"], summary["shared"], summary["copies"]) == (5, 1, 2)
+    work, family, sport = store.load()
+    lea = work.contacts[0]
+    # The kept contact takes the place of each copy
+    assert family.contacts[1] is lea and sport.contacts[0] is lea
+    assert main.shareRecords(store.load()) == []
+    store.close()
+    assert nicknames(main.loadData(path)) == [["lea", "max"], ["bob", "lea"], ["lea"]]
+    store = main.PhoneStore(path)
+    work, family, sport = store.load()
+    assert family.contacts[1] is work.contacts[0] is sport.contacts[0]
+    store.close()
+
+
+def test_sqliteStorageRefusesToShare(tmp_path):
+    store = main.PhoneStore(storage=main.SqliteStorage(str(tmp_path / "myPhone.db")))
+    store.save(phoneBook("Work", "Family"))
+    store.apply([createRecord(0, "lea")])
+    with pytest.raises(ValueError):
+        store.apply([("linkContact", 1, 0, 0, 0)])
+    assert nicknames(store.load()) == [["lea"], []]
+    store.close()
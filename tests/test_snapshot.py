@@ -0,0 +1,46 @@
+from datetime import date
+
+import pytest
+
+import main
+
+
+def phoneBook(*names):
+    return [main.Directory(name, date.today(), date.today(), []) for name in names]
+
+
+def corrupt(path):
+    with open(path, "r+b") as file:
+        data = file.read()
+        file.seek(len(data) // 2)
+        file.write(bytes(byte ^ 0xFF for byte in data[len(data) // 2:len(data) // 2 + 8]))
+
+
+def directoryNames(myPhone):
+    return [directory.directoryName for directory in myPhone]
+
+
+def test_corruptedSnapshotFallsBackToThePreviousGeneration(tmp_path):
+    path = str(tmp_path / "myPhone.pkl")
+    main.saveData(phoneBook("old"), path)
+    main.saveData(phoneBook("new"), path)
+    assert directoryNames(main.loadData(path)) == ["new"]
+    corrupt(path)
+    info = {}
+    myPhone, _ = main.loadSnapshot(path, {}, info)
+    assert directoryNames(myPhone) == ["old"]
+    assert info["skipped"] == [path] and info["generation"] == f"{path}.1"
+    # The next snapshot replaces the corrupted one rather than pushing the good generation out
+    main.saveData(phoneBook("newer"), path)
+    corrupt(path)
+    assert directoryNames(main.loadData(path)) == ["old"]
+
+
+def test_everyGenerationCorrupted(tmp_path):
+    path = str(tmp_path / "myPhone.pkl")
+    for name in ("first", "second", "third"):
+        main.saveData(phoneBook(name), path)
+    for generation in main.snapshotPaths(path):
+        corrupt(generation)
+    with pytest.raises(main.CorruptSnapshotError, match="Every snapshot generation"):
+        main.loadData(path)
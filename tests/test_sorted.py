@@ -0,0 +1,100 @@
+import random
+from datetime import date
+
+import pytest
+
+import main
+
+
+def contact(directory, nickname, lastName, createdAt=date(2024, 5, 17)):
+    contact = main.Contact(nickname, "", "", lastName, "", "", "", "", createdAt, createdAt, directory)
+    directory.contacts.append(contact)
+    return contact
+
+
+def lastNames(contacts):
+    return [contact.contactLastName for contact in contacts]
+
+
+def test_chunksSplitAndMergeAwayWhenEmptied(monkeypatch):
+    monkeypatch.setattr(main.SortedChunks, "chunkSize", 4)
+    keys = list(range(100))
+    random.Random(7).shuffle(keys)
+    chunks = main.SortedChunks()
+    for key in keys:
+        chunks.insert((key,), key)
+    assert len(chunks) == 100 and chunks.slice(0, 100) == list(range(100))
+    assert len(chunks.maxes) > 1 and all(len(keys) < 8 for keys in chunks.keys)
+    assert chunks.maxes == [keys[-1] for keys in chunks.keys]
+    assert chunks.position((50,)) == 50 and chunks.position((100,)) == 100 and chunks.position((-1,)) == 0
+    for key in keys[:90]:
+        chunks.remove((key,))
+    remaining = sorted(keys[90:])
+    assert len(chunks) == 10 and chunks.slice(0, 10) == remaining
+    assert all(chunks.keys) and chunks.maxes == [keys[-1] for keys in chunks.keys]
+    with pytest.raises(KeyError):
+        chunks.remove((keys[0],))
+    assert chunks.slice(3, 6) == remaining[3:6] and chunks.slice(8, 20) == remaining[8:]
+
+
+def test_pageBoundsAreInclusivePrefixes():
+    directory = main.Directory("Work", date.today(), date.today(), [])
+    for lastName in ("Adams", "kane", "Lee", "Moore", "Murphy", "Nash", "Young"):
+        contact(directory, lastName.lower(), lastName)
+    index = main.LastNameIndex()
+    index.build([directory])
+    count, page = index.page(None, "k", "m")
+    assert count == 4 and lastNames(page) == ["kane", "Lee", "Moore", "Murphy"]
+    assert lastNames(index.page(None, "k", "m", 1, 3)[1]) == ["Lee", "Moore"]
+    assert lastNames(index.page(None, "k", "m", 0, 2, reverse=True)[1]) == ["Murphy", "Moore"]
+    assert index.page(None, "k", "m", 3, 100)[1][-1].contactLastName == "Murphy"
+    assert index.page(None, "z", "a") == (0, [])
+    assert lastNames(index.page(directory, "n")[1]) == ["Nash", "Young"]
+    assert index.page(main.Directory("Empty", date.today(), date.today(), [])) == (0, [])
+
+
+def test_datePagesAcceptPartialDates():
+    directory = main.Directory("Work", date.today(), date.today(), [])
+    for day, lastName in ((date(2023, 12, 31), "a"), (date(2024, 5, 1), "b"), (date(2024, 5, 17), "c"), (date(2024, 6, 1), "d")):
+        contact(directory, lastName, lastName, day)
+    index = main.CreatedIndex()
+    index.build([directory])
+    assert lastNames(index.page(None, "2024", "2024-05")[1]) == ["b", "c"]
+    assert lastNames(index.page(None, date(2024, 5, 17), "2024-05-17")[1]) == ["c"]
+    assert lastNames(index.page(None, "2024-06")[1]) == ["d"]
+    for bound in ("2024-13", "May 2024", "24-05-17"):
+        with pytest.raises(ValueError):
+            index.page(None, bound)
+
+
+def test_incrementalChangesMatchARebuild(monkeypatch):
+    monkeypatch.setattr(main.SortedChunks, "chunkSize", 3)
+    directories = [main.Directory(name, date.today(), date.today(), []) for name in ("Work", "Home")]
+    generator = random.Random(3)
+    index = main.LastNameIndex()
+    index.build(directories)
+    contacts = []
+    for number in range(60):
+        added = contact(directories[number % 2], f"c{number}", generator.choice("ABCDEFGH") + str(generator.randrange(5)))
+        index.add(added)
+        contacts.append(added)
+    shared = contacts[0]
+    directories[1].contacts.append(shared)
+    main.Contact.join(shared, directories[1])
+    index.join(shared, directories[1])
+    for removed in contacts[1:40:3]:
+        index.remove(removed)
+        removed.contactDirectory.contacts.remove(removed)
+    # An edit in place is removed with the key it was added with
+    edited = contacts[5]
+    index.remove(edited)
+    edited.contactLastName = "Zed"
+    index.add(edited)
+    rebuilt = main.LastNameIndex()
+    rebuilt.build(directories)
+    assert index.page() == rebuilt.page()
+    for directory in directories:
+        assert index.page(directory) == rebuilt.page(directory)
+    assert index.page()[1][-1] is edited
+    assert sum(shown is shared for shown in index.page()[1]) == 1
+    assert shared in index.page(directories[1])[1]
@@ -0,0 +1,63 @@
+from datetime import date
+
+import pytest
+
+import main
+from conftest import createRecord, nicknames
+
+
+def newDatabase(path):
+    storage = main.SqliteStorage(str(path))
+    storage.applyMany([("createDirectory", name, date.today(), date.today()) for name in ("A", "B", "C")])
+    storage.applyMany([createRecord(index % 3, f"c{index}") for index in range(30)])
+    return storage
+
+
+def test_positionalRecordsMatchTheInMemoryPhoneBook(tmp_path):
+    storage = newDatabase(tmp_path / "myPhone.db")
+    myPhone = storage.load()
+    records = [
+        ("deleteContact", 0, 3), ("editContact", 1, 9, ("e1",) + main.syntheticFields(1)[1:] + (date.today(), date.today())),
+        ("deleteDirectory", 0), ("deleteContact", 1, 0), createRecord(1, "new"), ("deleteContact", 1, 9),
+        ("createDirectory", "D", date.today(), date.today()), createRecord(2, "d0"), ("deleteContact", 0, 9),
+    ]
+    for record in records:
+        storage.applyMany([record])
+        main.applyRecord(myPhone, record)
+    assert nicknames(storage.load()) == nicknames(myPhone)
+    assert nicknames(main.SqliteStorage(storage.path).load()) == nicknames(myPhone)
+    with pytest.raises(IndexError, match="contact index out of range"):
+        storage.applyMany([("deleteContact", 0, 9)])
+    with pytest.raises(IndexError, match="directory index out of range"):
+        storage.applyMany([("deleteDirectory", -1)])
+
+
+def test_positionsFollowTheCommitsOfAnotherConnection(tmp_path):
+    storage = newDatabase(tmp_path / "myPhone.db")
+    storage.load()
+    other = main.SqliteStorage(storage.path)
+    other.applyMany([("deleteContact", 0, 0), ("deleteDirectory", 1), createRecord(0, "x")])
+    storage.applyMany([("deleteContact", 0, 0), ("editContact", 0, 8, ("e",) + main.syntheticFields(1)[1:] + (date.today(), date.today()))])
+    assert nicknames(storage.load()) == [["c6", "c9", "c12", "c15", "c18", "c21", "c24", "c27", "e"], ["c2", "c5", "c8", "c11", "c14", "c17", "c20", "c23", "c26", "c29"]]
+    assert [contact.contactNickname for contact in storage.pageContacts(1, 2, 3)] == ["c8", "c11", "c14"]
+    assert storage.pageContacts(1, 10, 5) == []
+
+
+def test_failedBatchLeavesThePositionsRight(tmp_path):
+    storage = newDatabase(tmp_path / "myPhone.db")
+    before = nicknames(storage.load())
+    with pytest.raises(IndexError):
+        storage.applyMany([("deleteContact", 0, 0), createRecord(2, "y"), ("deleteContact", 5, 0)])
+    storage.applyMany([("deleteContact", 0, 0)])
+    del before[0][0]
+    assert nicknames(storage.load()) == before
+
+
+def test_positionalRecordsDoNotSkipRows(tmp_path):
+    storage = newDatabase(tmp_path / "myPhone.db")
+    storage.load()
+    statements = []
+    storage.connection.set_trace_callback(statements.append)
+    storage.applyMany([("editContact", 2, 9, ("e",) + main.syntheticFields(1)[1:] + (date.today(), date.today())), ("deleteContact", 1, 5)])
+    storage.pageContacts(0, 5, 5)
+    assert statements and not [statement for statement in statements if "OFFSET" in statement]
@@ -0,0 +1,40 @@
+from datetime import date
+
+import main
+from conftest import createRecord, nicknames
+
+
+def test_residentCopyIsReusedUntilTheFilesChange(tmp_path):
+    path = str(tmp_path / "myPhone.pkl")
+    store = main.PhoneStore(path)
+    myPhone = store.load()
+    assert store.load() is myPhone and store.load() is myPhone
+    store.apply([("createDirectory", "Work", date.today(), date.today()), createRecord(0, "a")])
+    # Our own writes leave the copy resident
+    assert store.load() is myPhone
+    assert store.stats()["reloads"] == 1 and store.stats()["hits"] == 3 and store.stats()["records"] == 2
+    store.close()
+
+
+def test_recordsOfAnotherStoreAreReplayedRatherThanReloaded(tmp_path):
+    path = str(tmp_path / "myPhone.pkl")
+    first, second = main.PhoneStore(path), main.PhoneStore(path)
+    first.apply([("createDirectory", "Work", date.today(), date.today())])
+    myPhone = second.load()
+    first.apply([createRecord(0, "a")])
+    assert second.load() is myPhone and nicknames(myPhone) == [["a"]]
+    assert second.refreshes == 1 and second.reloads == 1
+    # A new content saved by another store can only be read again
+    first.save([main.Directory("Home", date.today(), date.today(), [])])
+    assert [directory.directoryName for directory in second.load()] == ["Home"]
+    assert second.reloads == 2
+    first.close()
+    second.close()
+
+
+def test_saveKeepsTheDirectoriesResident(tmp_path):
+    store = main.PhoneStore(str(tmp_path / "myPhone.pkl"))
+    myPhone = [main.Directory("Work", date.today(), date.today(), [])]
+    store.save(myPhone)
+    assert store.load() is myPhone and store.reloads == 0
+    store.close()